@@ -0,0 +1,43 @@
+import bcrypt
+import reflex as rx
+from sqlmodel import select
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from app.db_models import User
+from app.services.access_tokens import (
+    SECRET_KEY_ERROR,
+    issue_access_token,
+    read_access_token,
+    tokens_enabled,
+)
+
+TERMINAL_TOKEN_TTL_SECONDS = 12 * 60 * 60
+
+
+def request_user(request: Request) -> dict | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        return None
+    return read_access_token(token)
+
+
+async def issue_token(request: Request):
+    if not tokens_enabled():
+        return JSONResponse({"error": SECRET_KEY_ERROR}, status_code=503)
+    try:
+        credentials = await request.json()
+        username = credentials["username"]
+        password = credentials["password"]
+    except (ValueError, KeyError, TypeError):
+        return JSONResponse(
+            {"error": "username and password are required."}, status_code=400
+        )
+    with rx.session() as session:
+        user = session.exec(select(User).where(User.username == username)).first()
+    if not user or not bcrypt.checkpw(password.encode(), user.password_hash.encode()):
+        return JSONResponse({"error": "Invalid username or password."}, status_code=401)
+    token = issue_access_token(
+        {"id": user.id, "role": user.role, "branch_id": user.branch_id},
+        ttl=TERMINAL_TOKEN_TTL_SECONDS,
+    )
+    return JSONResponse({"token": token, "expires_in": TERMINAL_TOKEN_TTL_SECONDS})
\ No newline at end of file
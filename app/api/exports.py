@@ -0,0 +1,31 @@
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from app.api.auth import request_user
+from app.services.access_tokens import redeem_download_ticket
+from app.services.exports import (
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    XLSX_MEDIA_TYPE,
+    export_stream,
+)
+
+
+async def export_dataset(request: Request):
+    user = request_user(request) or redeem_download_ticket(
+        request.query_params.get("download")
+    )
+    if user is None:
+        return JSONResponse({"error": "Not authenticated."}, status_code=401)
+    dataset = request.path_params["dataset"]
+    fmt = request.query_params.get("format", "csv")
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        return JSONResponse({"error": "Unknown export."}, status_code=404)
+    try:
+        stream = export_stream(dataset, fmt, user, dict(request.query_params))
+    except ValueError as error:
+        return JSONResponse({"error": str(error)}, status_code=400)
+    return StreamingResponse(
+        stream,
+        media_type=XLSX_MEDIA_TYPE if fmt == "xlsx" else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'},
+    )
\ No newline at end of file
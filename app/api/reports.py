@@ -0,0 +1,86 @@
+import asyncio
+import gzip
+import hashlib
+import json
+from datetime import datetime, timedelta
+import reflex as rx
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from app.api.auth import request_user
+from app.services.data_versions import cached_data_version, data_version
+from app.services.reports import REPORTS
+
+REPORT_GZIP_MIN_BYTES = 1024
+
+
+def _report_etag(
+    report: str,
+    user: dict,
+    params: dict,
+    version: str,
+    as_of: datetime | None,
+    gzipped: bool,
+) -> str:
+    key = json.dumps(
+        [
+            report,
+            user["id"],
+            user["role"],
+            user["branch_id"],
+            sorted(params.items()),
+            version,
+            as_of.isoformat() if as_of else None,
+            gzipped,
+        ]
+    )
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    return any(
+        tag.strip().removeprefix("W/") in (etag, "*") for tag in header.split(",")
+    )
+
+
+def _build_report(build, user: dict, params: dict, now: datetime):
+    with rx.session() as session:
+        return build(session, user, params, now)
+
+
+async def report(request: Request):
+    user = request_user(request)
+    if user is None:
+        return JSONResponse({"error": "Not authenticated."}, status_code=401)
+    name = request.path_params["report"]
+    if name not in REPORTS:
+        return JSONResponse({"error": "Unknown report."}, status_code=404)
+    tables, build, refresh_seconds = REPORTS[name]
+    params = dict(request.query_params)
+    now = datetime.utcnow()
+    as_of = None
+    if refresh_seconds:
+        step = timedelta(seconds=refresh_seconds)
+        as_of = datetime.min + (now - datetime.min) // step * step
+    gzipped = "gzip" in request.headers.get("accept-encoding", "")
+    version = cached_data_version(tables) or await asyncio.to_thread(
+        data_version, tables
+    )
+    etag = _report_etag(name, user, params, version, as_of, gzipped)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding, Authorization",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    try:
+        payload = await asyncio.to_thread(
+            _build_report, build, user, params, as_of or now
+        )
+    except ValueError as error:
+        return JSONResponse({"error": str(error)}, status_code=400)
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    if gzipped and len(body) >= REPORT_GZIP_MIN_BYTES:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
\ No newline at end of file
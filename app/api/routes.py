@@ -0,0 +1,15 @@
+from starlette.applications import Starlette
+from starlette.routing import Route
+from app.api.auth import issue_token
+from app.api.exports import export_dataset
+from app.api.reports import report
+from app.api.sales import upload_sales_batch
+
+api = Starlette(
+    routes=[
+        Route("/api/auth/token", issue_token, methods=["POST"]),
+        Route("/api/exports/{dataset}", export_dataset, methods=["GET"]),
+        Route("/api/reports/{report}", report, methods=["GET"]),
+        Route("/api/sales/batch", upload_sales_batch, methods=["POST"]),
+    ]
+)
\ No newline at end of file
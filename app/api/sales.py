@@ -0,0 +1,39 @@
+import asyncio
+import reflex as rx
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from app.api.auth import request_user
+from app.services.sales import SALES_BATCH_MAX_SIZE, ingest_sales
+
+
+def _ingest(entries: list, user: dict) -> list[dict]:
+    with rx.session() as session:
+        return ingest_sales(session, entries, user)
+
+
+async def upload_sales_batch(request: Request):
+    user = request_user(request)
+    if user is None:
+        return JSONResponse({"error": "Not authenticated."}, status_code=401)
+    try:
+        entries = (await request.json())["sales"]
+    except (ValueError, KeyError, TypeError):
+        return JSONResponse(
+            {"error": 'Body must be {"sales": [...]}.'}, status_code=400
+        )
+    if not isinstance(entries, list):
+        return JSONResponse({"error": "sales must be a list."}, status_code=400)
+    if len(entries) > SALES_BATCH_MAX_SIZE:
+        return JSONResponse(
+            {"error": f"At most {SALES_BATCH_MAX_SIZE} sales per batch."},
+            status_code=413,
+        )
+    results = await asyncio.to_thread(_ingest, entries, user)
+    return JSONResponse(
+        {
+            "created": sum(r["status"] == "created" for r in results),
+            "duplicates": sum(r["status"] == "duplicate" for r in results),
+            "rejected": sum(r["status"] == "rejected" for r in results),
+            "results": results,
+        }
+    )
\ No newline at end of file
@@ -11,6 +11,21 @@ from app.pages.stock_page import stock_page
 from app.pages.sales_page import sales_page
 from app.pages.financial_page import financial_page
 from app.pages.cash_closing_page import cash_closing_page
+from app.pages.receivables_page import receivables_page
+from app.pages.worklist_page import worklist_page
+from app.services.replenishment import (
+    REPLENISHMENT_INTERVAL_SECONDS,
+    refresh_reorder_suggestions,
+)
+from app.services.receivables import (
+    OVERDUE_SWEEP_INTERVAL_SECONDS,
+    sweep_overdue_receivables,
+    sync_receivables_ledger,
+)
+from app.services.sales import sync_sales_list
+from app.services.scheduler import run_scheduled_jobs
+from app.services.schema import upgrade_schema
+from app.api.routes import api
 from sqlmodel import SQLModel
 from app import db_models
 
@@ -29,6 +44,7 @@ app = rx.App(
             rel="stylesheet",
         ),
     ],
+    api_transformer=api,
 )
 app.add_page(index, on_load=AuthState.check_login)
 app.add_page(login_page, route="/login")
@@ -41,11 +57,24 @@ app.add_page(stock_page, route="/stock", on_load=AuthState.check_login)
 app.add_page(sales_page, route="/sales", on_load=AuthState.check_login)
 app.add_page(financial_page, route="/financial", on_load=AuthState.check_login)
 app.add_page(cash_closing_page, route="/cash-closing", on_load=AuthState.check_login)
+app.add_page(receivables_page, route="/receivables", on_load=AuthState.check_login)
+app.add_page(worklist_page, route="/worklist", on_load=AuthState.check_login)
 app.add_page(protected_page, route="/protected", on_load=AuthState.check_login)
+app.register_lifespan_task(
+    run_scheduled_jobs,
+    jobs=[
+        (refresh_reorder_suggestions, REPLENISHMENT_INTERVAL_SECONDS),
+        (sweep_overdue_receivables, OVERDUE_SWEEP_INTERVAL_SECONDS),
+    ],
+)
 
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(rx.Model.get_db_engine())
+    engine = rx.Model.get_db_engine()
+    SQLModel.metadata.create_all(engine)
+    upgrade_schema(engine)
+    sync_receivables_ledger()
+    sync_sales_list()
 
 
 create_db_and_tables()
\ No newline at end of file
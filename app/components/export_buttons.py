@@ -0,0 +1,17 @@
+import reflex as rx
+from app.states.export_state import ExportState
+
+
+def export_buttons(dataset: str, customer_id: rx.Var | None = None) -> rx.Component:
+    return rx.el.div(
+        *[
+            rx.el.button(
+                rx.icon("download", class_name="w-4 h-4 mr-1"),
+                label,
+                on_click=ExportState.export(dataset, fmt, customer_id),
+                class_name="flex items-center px-3 py-1.5 text-sm bg-gray-100 text-gray-700 rounded-lg hover:bg-gray-200",
+            )
+            for fmt, label in (("csv", "CSV"), ("xlsx", "Excel"))
+        ],
+        class_name="flex gap-2",
+    )
\ No newline at end of file
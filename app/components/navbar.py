@@ -1,11 +1,24 @@
 import reflex as rx
 from app.states.auth_state import AuthState
+from app.states.product_state import ProductState
 
 
-def nav_item(text: str, href: str, is_active: rx.Var[bool]) -> rx.Component:
+def nav_item(
+    text: str, href: str, is_active: rx.Var[bool], badge: rx.Var[int] | None = None
+) -> rx.Component:
     return rx.el.a(
         rx.el.li(
             text,
+            rx.cond(
+                badge > 0,
+                rx.el.span(
+                    badge,
+                    class_name="ml-2 px-2 py-0.5 text-xs font-bold rounded-full bg-red-500 text-white",
+                ),
+                None,
+            )
+            if badge is not None
+            else None,
             class_name=rx.cond(
                 is_active,
                 "px-4 py-2 rounded-lg bg-blue-100 text-blue-700 font-semibold",
@@ -60,7 +73,12 @@ def navbar() -> rx.Component:
                     "/customers",
                     AuthState.router.page.path == "/customers",
                 ),
-                nav_item("Stock", "/stock", AuthState.router.page.path == "/stock"),
+                nav_item(
+                    "Stock",
+                    "/stock",
+                    AuthState.router.page.path == "/stock",
+                    badge=ProductState.low_stock_count,
+                ),
                 nav_item("Sales", "/sales", AuthState.router.page.path == "/sales"),
                 nav_item(
                     "Financial",
@@ -72,7 +90,18 @@ def navbar() -> rx.Component:
                     "/cash-closing",
                     AuthState.router.page.path == "/cash-closing",
                 ),
+                nav_item(
+                    "Receivables",
+                    "/receivables",
+                    AuthState.router.page.path == "/receivables",
+                ),
+                nav_item(
+                    "Worklist",
+                    "/worklist",
+                    AuthState.router.page.path == "/worklist",
+                ),
                 class_name="flex items-center gap-2",
+                on_mount=ProductState.load_low_stock,
             ),
             rx.el.div(
                 rx.cond(
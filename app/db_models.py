@@ -38,32 +38,67 @@ class Customer(SQLModel, table=True):
     address: Optional[str] = Field(default=None)
     branch_id: int = Field(foreign_key="branches.id")
     credit_balance: float = Field(default=0.0)
+    credit_limit: Optional[float] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
     branch: Branch = Relationship()
 
 
 class Product(SQLModel, table=True):
     __tablename__ = "products"
+    __table_args__ = (sql.Index("ix_products_name_lower", sql.text("lower(name)")),)
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True)
     description: Optional[str] = Field(default=None)
     category: Optional[str] = Field(default=None, index=True)
     price: float = Field(gt=0)
+    reorder_point: int = Field(default=10)
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
 
 
 class Stock(SQLModel, table=True):
     __tablename__ = "stock"
+    __table_args__ = (
+        sql.Index("ix_stock_product_branch", "product_id", "branch_id", unique=True),
+        sql.Index(
+            "ix_stock_low",
+            "branch_id",
+            "quantity",
+            sqlite_where=sql.text("quantity < reorder_point"),
+            postgresql_where=sql.text("quantity < reorder_point"),
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     product_id: int = Field(foreign_key="products.id")
     branch_id: int = Field(foreign_key="branches.id")
     quantity: int = Field(default=0)
+    reorder_point: int = Field(default=10)
     product: Product = Relationship()
     branch: Branch = Relationship()
 
 
+class ReorderSuggestion(SQLModel, table=True):
+    __tablename__ = "reorder_suggestions"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    product_id: int = Field(foreign_key="products.id")
+    branch_id: int = Field(foreign_key="branches.id", index=True)
+    on_hand: int
+    daily_velocity: float
+    days_of_cover: Optional[float] = Field(default=None)
+    reorder_quantity: int = Field(default=0)
+    transfer_quantity: int = Field(default=0)
+    transfer_from_branch_id: Optional[int] = Field(
+        default=None, foreign_key="branches.id"
+    )
+    computed_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
 class Sale(SQLModel, table=True):
     __tablename__ = "sales"
+    __table_args__ = (
+        sql.Index("ix_sales_branch_created", "branch_id", "created_at"),
+        sql.Index("ix_sales_customer_created", "customer_id", "created_at"),
+        sql.Index("ix_sales_external_id", "external_id", unique=True),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     customer_id: int = Field(foreign_key="customers.id")
     user_id: int = Field(foreign_key="users.id")
@@ -71,7 +106,10 @@ class Sale(SQLModel, table=True):
     total_amount: float
     payment_method: str
     status: str = Field(default="Paid")
-    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    external_id: Optional[str] = Field(default=None)
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, nullable=False, index=True
+    )
     customer: Customer = Relationship()
     user: User = Relationship()
     branch: Branch = Relationship()
@@ -79,10 +117,26 @@ class Sale(SQLModel, table=True):
     installments: list["Installment"] = Relationship(back_populates="sale")
 
 
+class SaleListEntry(SQLModel, table=True):
+    __tablename__ = "sales_list"
+    __table_args__ = (sql.Index("ix_sales_list_user_created", "user_id", "created_at"),)
+    sale_id: int = Field(primary_key=True, foreign_key="sales.id")
+    customer_id: int = Field(index=True)
+    user_id: int
+    branch_id: int = Field(index=True)
+    customer_name: str
+    user_username: str
+    branch_name: str
+    total_amount: float
+    payment_method: str
+    status: str
+    created_at: datetime = Field(nullable=False, index=True)
+
+
 class SaleDetail(SQLModel, table=True):
     __tablename__ = "sale_details"
     id: Optional[int] = Field(default=None, primary_key=True)
-    sale_id: int = Field(foreign_key="sales.id")
+    sale_id: int = Field(foreign_key="sales.id", index=True)
     product_id: int = Field(foreign_key="products.id")
     quantity: int
     unit_price: float
@@ -104,6 +158,11 @@ class Installment(SQLModel, table=True):
 
 class FinancialPayment(SQLModel, table=True):
     __tablename__ = "financial_payments"
+    __table_args__ = (
+        sql.Index(
+            "ix_financial_payments_customer_created", "customer_id", "created_at"
+        ),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     customer_id: int = Field(foreign_key="customers.id")
     user_id: int = Field(foreign_key="users.id")
@@ -112,8 +171,13 @@ class FinancialPayment(SQLModel, table=True):
     interest_rate: float
     total_amount: float
     installment_type: str
+    amortization_method: str = Field(default="flat")
+    rate_basis: str = Field(default="annual")
     num_installments: int
     installment_amount: float
+    paid_count: int = Field(default=0)
+    amount_paid: float = Field(default=0.0)
+    outstanding: float = Field(default=0.0)
     status: str = Field(default="Active")
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
     customer: Customer = Relationship()
@@ -125,7 +189,7 @@ class FinancialPayment(SQLModel, table=True):
 class FinancialInstallment(SQLModel, table=True):
     __tablename__ = "financial_installments"
     id: Optional[int] = Field(default=None, primary_key=True)
-    payment_id: int = Field(foreign_key="financial_payments.id")
+    payment_id: int = Field(foreign_key="financial_payments.id", index=True)
     installment_number: int
     due_date: datetime
     amount_due: float
@@ -135,6 +199,76 @@ class FinancialInstallment(SQLModel, table=True):
     payment: FinancialPayment = Relationship(back_populates="installments")
 
 
+class Receivable(SQLModel, table=True):
+    __tablename__ = "receivables"
+    __table_args__ = (
+        sql.Index("ix_receivables_source", "source", "source_id", unique=True),
+        sql.Index("ix_receivables_status_due", "status", "due_date"),
+        sql.Index("ix_receivables_customer_status", "customer_id", "status"),
+        sql.Index("ix_receivables_paid_at", "paid_at"),
+        sql.Index("ix_receivables_collector_due", "user_id", "due_date"),
+        sql.Index("ix_receivables_branch_paid", "branch_id", "paid_at"),
+        sql.Index("ix_receivables_branch_due", "branch_id", "due_date"),
+        sql.Index("ix_receivables_due_date", "due_date"),
+        sql.Index("ix_receivables_customer_paid", "customer_id", "paid_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str
+    source_id: int
+    sale_id: Optional[int] = Field(default=None, foreign_key="sales.id")
+    financial_payment_id: Optional[int] = Field(
+        default=None, foreign_key="financial_payments.id"
+    )
+    customer_id: int = Field(foreign_key="customers.id")
+    user_id: int = Field(foreign_key="users.id")
+    branch_id: int = Field(foreign_key="branches.id")
+    installment_number: int
+    due_date: datetime
+    amount_due: float
+    amount_paid: float = Field(default=0.0)
+    status: str = Field(default="Pending")
+    paid_at: Optional[datetime] = Field(default=None)
+    customer: Customer = Relationship()
+
+
+class ReceivablePayment(SQLModel, table=True):
+    __tablename__ = "receivable_payments"
+    __table_args__ = (
+        sql.Index("ix_receivable_payments_paid_at", "paid_at"),
+        sql.Index("ix_receivable_payments_user_paid", "user_id", "paid_at"),
+        sql.Index("ix_receivable_payments_branch_paid", "branch_id", "paid_at"),
+        sql.Index("ix_receivable_payments_customer_paid", "customer_id", "paid_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    receivable_id: int = Field(foreign_key="receivables.id", index=True)
+    customer_id: int = Field(foreign_key="customers.id")
+    user_id: int = Field(foreign_key="users.id")
+    branch_id: int = Field(foreign_key="branches.id")
+    amount: float
+    paid_at: datetime
+
+
+class DownloadTicket(SQLModel, table=True):
+    __tablename__ = "download_tickets"
+    id: str = Field(primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    role: str
+    branch_id: Optional[int] = Field(default=None)
+    expires_at: datetime = Field(index=True)
+
+
+class DataVersion(SQLModel, table=True):
+    __tablename__ = "data_versions"
+    name: str = Field(primary_key=True)
+    version: int = Field(default=0)
+
+
+class JobCheckpoint(SQLModel, table=True):
+    __tablename__ = "job_checkpoints"
+    name: str = Field(primary_key=True)
+    last_run_at: Optional[datetime] = Field(default=None)
+
+
 class CashClosing(SQLModel, table=True):
     __tablename__ = "cash_closings"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -145,6 +279,9 @@ class CashClosing(SQLModel, table=True):
     end_date: datetime
     total_collected: float
     status: str = Field(default="Closed")
+    parent_id: Optional[int] = Field(
+        default=None, foreign_key="cash_closings.id", index=True
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
     user: User = Relationship()
     branch: Branch = Relationship()
@@ -153,8 +290,12 @@ class CashClosing(SQLModel, table=True):
 
 class CashClosingDetail(SQLModel, table=True):
     __tablename__ = "cash_closing_details"
+    __table_args__ = (
+        sql.Index("ix_closing_details_receipt", "source", "payment_id", unique=True),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
-    closing_id: int = Field(foreign_key="cash_closings.id")
+    closing_id: int = Field(foreign_key="cash_closings.id", index=True)
+    source: str
     payment_type: str
     payment_id: int
     amount: float
@@ -184,6 +325,7 @@ class CustomerDict(TypedDict):
     address: str | None
     branch_id: int
     credit_balance: float
+    credit_limit: float | None
     created_at: str
     branch_name: str
 
@@ -194,6 +336,7 @@ class ProductDict(TypedDict):
     description: str | None
     category: str | None
     price: float
+    reorder_point: int
     created_at: str
 
 
@@ -206,6 +349,45 @@ class StockDict(TypedDict):
     branch_name: str
 
 
+class StockMatrixCellDict(TypedDict):
+    quantity: int
+    is_low: bool
+
+
+class StockMatrixRowDict(TypedDict):
+    product_id: int
+    product_name: str
+    category: str | None
+    cells: list[StockMatrixCellDict]
+    total: int
+
+
+class LowStockDict(TypedDict):
+    stock_id: int
+    product_name: str
+    branch_name: str
+    quantity: int
+    reorder_point: int
+
+
+class ReorderSuggestionDict(TypedDict):
+    product_name: str
+    branch_name: str
+    on_hand: int
+    daily_velocity: float
+    days_of_cover: float | None
+    reorder_quantity: int
+    transfer_quantity: int
+    transfer_from_branch_name: str | None
+
+
+class StockCountResultDict(TypedDict):
+    rows_read: int
+    rows_applied: int
+    rows_unmatched: int
+    net_variance: int
+
+
 class SaleDict(TypedDict):
     id: int
     customer_name: str
@@ -224,11 +406,14 @@ class FinancialPaymentDict(TypedDict):
     interest_rate: float
     total_amount: float
     installment_type: str
+    amortization_method: str
     num_installments: int
     installment_amount: float
+    paid_count: int
+    amount_paid: float
+    outstanding: float
     status: str
     created_at: str
-    installments: list["FinancialInstallmentDict"]
 
 
 class FinancialInstallmentDict(TypedDict):
@@ -242,6 +427,62 @@ class FinancialInstallmentDict(TypedDict):
     paid_at: str | None
 
 
+class AmortizationRowDict(TypedDict):
+    number: int
+    payment: float
+    interest: float
+    principal: float
+    balance: float
+
+
+class PaymentPostingResultDict(TypedDict):
+    reference: str
+    amount: float
+    applied: float
+    installments_paid: int
+    error: str | None
+
+
+class AgingRowDict(TypedDict):
+    branch_id: int
+    branch_name: str
+    user_id: int
+    collector_name: str
+    current: float
+    days_1_30: float
+    days_31_60: float
+    days_61_90: float
+    days_over_90: float
+    total: float
+
+
+class AgingItemDict(TypedDict):
+    id: int
+    customer_name: str
+    source: str
+    installment_number: int
+    due_date: str
+    days_past_due: int
+    outstanding: float
+    status: str
+
+
+class WorklistItemDict(TypedDict):
+    id: int
+    customer_name: str
+    phone: str | None
+    address: str | None
+    due_date: str
+    days_overdue: int
+    outstanding: float
+    status: str
+
+
+class CashInWeekDict(TypedDict):
+    week_start: str
+    expected: float
+
+
 class CashClosingDict(TypedDict):
     id: int
     user_name: str
@@ -251,9 +492,60 @@ class CashClosingDict(TypedDict):
     end_date: str
     total_collected: float
     status: str
+    parent_id: int | None
     created_at: str
 
 
+class ComposedClosingDict(TypedDict):
+    id: int
+    user_name: str
+    period_type: str
+    start_date: str
+    end_date: str
+    total_collected: float
+
+
+class ClosingTypeTotalDict(TypedDict):
+    payment_type: str
+    count: int
+    amount: float
+
+
+class ClosingCustomerTotalDict(TypedDict):
+    customer_id: int
+    customer_name: str
+    count: int
+    amount: float
+
+
+class ReconciliationRowDict(TypedDict):
+    user_name: str
+    customer_name: str
+    due_count: int
+    expected: float
+    collected_on_schedule: float
+    collected: float
+    shortfall: float
+
+
+class StatementRowDict(TypedDict):
+    date: str
+    description: str
+    charge: float
+    credit: float
+    balance: float
+
+
+class BranchClosingDict(TypedDict):
+    branch_id: int
+    branch_name: str
+    receipt_count: int
+    closings_count: int
+    remainder_total: float
+    composed_total: float
+    total: float
+
+
 class CollectedPaymentDict(TypedDict):
     customer_name: str
     payment_type: str
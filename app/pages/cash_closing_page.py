@@ -1,7 +1,263 @@
 import reflex as rx
-from app.states.auth_state import require_auth
+from app.states.auth_state import AuthState, require_auth
 from app.states.cash_closing_state import CashClosingState
 from app.components.base_layout import base_layout
+from app.components.export_buttons import export_buttons
+
+
+def composed_closings_table() -> rx.Component:
+    return rx.cond(
+        CashClosingState.composed_closings.length() > 0,
+        rx.el.div(
+            rx.el.h4(
+                "Included Closings", class_name="font-semibold text-gray-600 mb-2"
+            ),
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Collector"),
+                        rx.el.th("Period"),
+                        rx.el.th("Date Range"),
+                        rx.el.th("Total"),
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        CashClosingState.composed_closings,
+                        lambda closing: rx.el.tr(
+                            rx.el.td(closing["user_name"]),
+                            rx.el.td(closing["period_type"].to_string().capitalize()),
+                            rx.el.td(
+                                f"{closing['start_date'].to_string().split('T')[0]} - {closing['end_date'].to_string().split('T')[0]}"
+                            ),
+                            rx.el.td(f"${closing['total_collected'].to_string()}"),
+                            class_name="text-sm",
+                        ),
+                    )
+                ),
+                class_name="min-w-full divide-y divide-gray-200 text-left",
+            ),
+            rx.el.p(
+                f"${CashClosingState.composed_total.to_string()} from closed periods + "
+                f"${CashClosingState.remainder_total.to_string()} not yet closed",
+                class_name="text-sm text-gray-500 mt-2",
+            ),
+            class_name="mb-6",
+        ),
+        None,
+    )
+
+
+def branch_breakdown_table() -> rx.Component:
+    return rx.cond(
+        CashClosingState.consolidated,
+        rx.el.div(
+            rx.el.h4("By Branch", class_name="font-semibold text-gray-600 mb-2"),
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Branch"),
+                        rx.el.th("Receipts"),
+                        rx.el.th("Closings"),
+                        rx.el.th("Not Yet Closed"),
+                        rx.el.th("From Closings"),
+                        rx.el.th("Total"),
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        CashClosingState.branch_breakdown,
+                        lambda branch: rx.el.tr(
+                            rx.el.td(branch["branch_name"]),
+                            rx.el.td(branch["receipt_count"]),
+                            rx.el.td(branch["closings_count"]),
+                            rx.el.td(f"${branch['remainder_total'].to_string()}"),
+                            rx.el.td(f"${branch['composed_total'].to_string()}"),
+                            rx.el.td(
+                                f"${branch['total'].to_string()}",
+                                class_name="font-semibold",
+                            ),
+                            class_name="text-sm",
+                        ),
+                    )
+                ),
+                class_name="min-w-full divide-y divide-gray-200 text-left",
+            ),
+            class_name="mb-6",
+        ),
+        None,
+    )
+
+
+def reconciliation_table() -> rx.Component:
+    return rx.el.details(
+        rx.el.summary(
+            f"Expected vs Collected: ${CashClosingState.reconciliation_on_schedule.to_string()} "
+            f"of ${CashClosingState.reconciliation_expected.to_string()} due collected, "
+            f"${CashClosingState.reconciliation_collected.to_string()} received in period",
+            class_name="font-semibold text-gray-600 cursor-pointer mb-2",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Collector"),
+                        rx.el.th("Customer"),
+                        rx.el.th("Due"),
+                        rx.el.th("Expected"),
+                        rx.el.th("Collected on Schedule"),
+                        rx.el.th("Received in Period"),
+                        rx.el.th("Shortfall"),
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        CashClosingState.reconciliation,
+                        lambda row: rx.el.tr(
+                            rx.el.td(row["user_name"]),
+                            rx.el.td(row["customer_name"]),
+                            rx.el.td(row["due_count"]),
+                            rx.el.td(f"${row['expected'].to_string()}"),
+                            rx.el.td(f"${row['collected_on_schedule'].to_string()}"),
+                            rx.el.td(f"${row['collected'].to_string()}"),
+                            rx.el.td(
+                                f"${row['shortfall'].to_string()}",
+                                class_name=rx.cond(
+                                    row["shortfall"] > 0,
+                                    "text-red-600 font-semibold",
+                                    "text-green-600",
+                                ),
+                            ),
+                            class_name="text-sm",
+                        ),
+                    )
+                ),
+                class_name="min-w-full divide-y divide-gray-200 text-left",
+            ),
+            class_name="max-h-96 overflow-y-auto",
+        ),
+        class_name="mb-6",
+    )
+
+
+def closing_type_totals() -> rx.Component:
+    return rx.el.div(
+        rx.el.h4("By Payment Type", class_name="font-semibold text-gray-600 mb-2"),
+        rx.el.table(
+            rx.el.thead(
+                rx.el.tr(
+                    rx.el.th("Payment Type"), rx.el.th("Receipts"), rx.el.th("Amount")
+                )
+            ),
+            rx.el.tbody(
+                rx.foreach(
+                    CashClosingState.type_totals,
+                    lambda total: rx.el.tr(
+                        rx.el.td(total["payment_type"]),
+                        rx.el.td(total["count"]),
+                        rx.el.td(f"${total['amount'].to_string()}"),
+                        on_click=lambda: CashClosingState.filter_receipts_by_type(
+                            total["payment_type"]
+                        ),
+                        class_name=rx.cond(
+                            CashClosingState.receipts_type_filter
+                            == total["payment_type"],
+                            "text-sm bg-blue-50 cursor-pointer",
+                            "text-sm hover:bg-gray-50 cursor-pointer",
+                        ),
+                    ),
+                )
+            ),
+            class_name="min-w-full divide-y divide-gray-200 text-left",
+        ),
+    )
+
+
+def closing_customer_totals() -> rx.Component:
+    return rx.el.div(
+        rx.el.h4("Top Customers", class_name="font-semibold text-gray-600 mb-2"),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Customer"), rx.el.th("Receipts"), rx.el.th("Amount")
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        CashClosingState.customer_totals,
+                        lambda total: rx.el.tr(
+                            rx.el.td(total["customer_name"]),
+                            rx.el.td(total["count"]),
+                            rx.el.td(f"${total['amount'].to_string()}"),
+                            class_name="text-sm",
+                        ),
+                    )
+                ),
+                class_name="min-w-full divide-y divide-gray-200 text-left",
+            ),
+            class_name="max-h-64 overflow-y-auto",
+        ),
+    )
+
+
+def receipts_drilldown() -> rx.Component:
+    return rx.el.details(
+        rx.el.summary(
+            rx.cond(
+                CashClosingState.receipts_type_filter != "",
+                f"Receipts: {CashClosingState.receipts_type_filter}",
+                f"All Receipts ({CashClosingState.receipt_count})",
+            ),
+            class_name="font-semibold text-gray-600 cursor-pointer mb-2",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Customer"),
+                        rx.el.th("Payment Type"),
+                        rx.el.th("Amount"),
+                        rx.el.th("Paid At"),
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        CashClosingState.collected_payments,
+                        lambda payment: rx.el.tr(
+                            rx.el.td(payment["customer_name"]),
+                            rx.el.td(payment["payment_type"]),
+                            rx.el.td(f"${payment['amount'].to_string()}"),
+                            rx.el.td(payment["paid_at"].to_string().split("T")[0]),
+                            class_name="text-sm",
+                        ),
+                    )
+                ),
+                class_name="min-w-full divide-y divide-gray-200 text-left",
+            ),
+            class_name="shadow overflow-hidden border-b border-gray-200 sm:rounded-lg",
+        ),
+        rx.el.div(
+            rx.el.button(
+                rx.icon("chevron-left", class_name="w-4 h-4"),
+                on_click=CashClosingState.previous_receipts_page,
+                disabled=CashClosingState.receipts_page == 0,
+                class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+            ),
+            rx.el.span(
+                f"Page {CashClosingState.receipts_page + 1}",
+                class_name="text-sm text-gray-600",
+            ),
+            rx.el.button(
+                rx.icon("chevron-right", class_name="w-4 h-4"),
+                on_click=CashClosingState.next_receipts_page,
+                disabled=~CashClosingState.receipts_has_next,
+                class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+            ),
+            class_name="flex items-center justify-end gap-3 mt-4",
+        ),
+        class_name="mb-6",
+    )
 
 
 def cash_closing_form() -> rx.Component:
@@ -54,44 +310,46 @@ def cash_closing_form() -> rx.Component:
                     class_name="w-full px-4 py-2 bg-gray-100 rounded-lg border-gray-200 mt-2",
                 ),
             ),
+            rx.cond(
+                AuthState.is_admin,
+                rx.el.div(
+                    rx.el.label("Branch", class_name="font-medium text-gray-600"),
+                    rx.el.select(
+                        rx.el.option("All Branches", value=""),
+                        rx.foreach(
+                            AuthState.all_branches,
+                            lambda b: rx.el.option(
+                                b["name"], value=b["id"].to_string()
+                            ),
+                        ),
+                        value=CashClosingState.closing_branch_id,
+                        on_change=CashClosingState.set_closing_branch,
+                        class_name="w-full px-4 py-2 bg-gray-100 rounded-lg border-gray-200 mt-2",
+                    ),
+                ),
+                None,
+            ),
             rx.el.button(
                 "Fetch Payments",
                 on_click=CashClosingState.fetch_collected_payments,
                 class_name="self-end px-6 py-2 bg-blue-600 text-white font-semibold rounded-lg shadow-md hover:bg-blue-700",
             ),
-            class_name="grid md:grid-cols-4 gap-6 items-center mb-8",
+            class_name="grid md:grid-cols-5 gap-6 items-center mb-8",
         ),
         rx.el.div(
             rx.el.h3(
                 "Collected Payments",
                 class_name="text-2xl font-semibold text-gray-700 mb-4",
             ),
+            branch_breakdown_table(),
+            composed_closings_table(),
             rx.el.div(
-                rx.el.table(
-                    rx.el.thead(
-                        rx.el.tr(
-                            rx.el.th("Customer"),
-                            rx.el.th("Payment Type"),
-                            rx.el.th("Amount"),
-                            rx.el.th("Paid At"),
-                        )
-                    ),
-                    rx.el.tbody(
-                        rx.foreach(
-                            CashClosingState.collected_payments,
-                            lambda payment: rx.el.tr(
-                                rx.el.td(payment["customer_name"]),
-                                rx.el.td(payment["payment_type"]),
-                                rx.el.td(f"${payment['amount'].to_string()}"),
-                                rx.el.td(payment["paid_at"].to_string().split("T")[0]),
-                                class_name="text-sm",
-                            ),
-                        )
-                    ),
-                    class_name="min-w-full divide-y divide-gray-200 text-left",
-                ),
-                class_name="shadow overflow-hidden border-b border-gray-200 sm:rounded-lg mb-6",
+                closing_type_totals(),
+                closing_customer_totals(),
+                class_name="grid md:grid-cols-2 gap-6 mb-6",
             ),
+            receipts_drilldown(),
+            reconciliation_table(),
             rx.el.div(
                 rx.el.p(
                     f"Total Collected: ${CashClosingState.total_collected.to_string()}",
@@ -101,7 +359,7 @@ def cash_closing_form() -> rx.Component:
                     "Perform Cash Closing",
                     on_click=CashClosingState.perform_cash_closing,
                     class_name="px-8 py-3 bg-green-600 text-white font-bold rounded-lg shadow-lg hover:bg-green-700 text-lg",
-                    disabled=CashClosingState.collected_payments.length() == 0,
+                    disabled=CashClosingState.receipt_count == 0,
                 ),
                 class_name="flex justify-between items-center mt-6",
             ),
@@ -112,9 +370,13 @@ def cash_closing_form() -> rx.Component:
 
 def closings_history_table() -> rx.Component:
     return rx.el.div(
-        rx.el.h2(
-            "Cash Closing History",
-            class_name="text-2xl font-semibold text-gray-700 my-8",
+        rx.el.div(
+            rx.el.h2(
+                "Cash Closing History",
+                class_name="text-2xl font-semibold text-gray-700",
+            ),
+            export_buttons("closings"),
+            class_name="flex items-center justify-between my-8",
         ),
         rx.el.div(
             rx.el.div(
@@ -127,6 +389,7 @@ def closings_history_table() -> rx.Component:
                             rx.el.th("Date Range"),
                             rx.el.th("Total Collected"),
                             rx.el.th("Status"),
+                            rx.el.th("Included In"),
                             rx.el.th("Closed At"),
                         )
                     ),
@@ -147,6 +410,13 @@ def closings_history_table() -> rx.Component:
                                         class_name="px-3 py-1 text-xs font-semibold rounded-full bg-green-100 text-green-800",
                                     )
                                 ),
+                                rx.el.td(
+                                    rx.cond(
+                                        item["parent_id"],
+                                        f"#{item['parent_id']}",
+                                        "-",
+                                    )
+                                ),
                                 rx.el.td(item["created_at"].to_string().split("T")[0]),
                                 class_name="hover:bg-gray-50 text-sm",
                             ),
@@ -171,6 +441,6 @@ def cash_closing_page() -> rx.Component:
             ),
             cash_closing_form(),
             closings_history_table(),
-            on_mount=CashClosingState.on_page_load,
+            on_mount=[CashClosingState.on_page_load, AuthState.load_all_data],
         )
     )
\ No newline at end of file
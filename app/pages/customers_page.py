@@ -2,6 +2,7 @@ import reflex as rx
 from app.states.auth_state import AuthState, require_auth
 from app.states.customer_state import CustomerState
 from app.components.base_layout import base_layout
+from app.components.export_buttons import export_buttons
 
 
 def customer_row(customer: rx.Var[dict]) -> rx.Component:
@@ -26,7 +27,36 @@ def customer_row(customer: rx.Var[dict]) -> rx.Component:
             f"${customer['credit_balance'].to_string()}",
             class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
         ),
+        rx.el.td(
+            rx.cond(
+                AuthState.is_admin,
+                rx.el.input(
+                    default_value=rx.cond(
+                        customer["credit_limit"],
+                        customer["credit_limit"].to_string(),
+                        "",
+                    ),
+                    placeholder="No limit",
+                    type="number",
+                    on_blur=lambda value: CustomerState.update_credit_limit(
+                        customer["id"], value
+                    ),
+                    class_name="px-2 py-1 border rounded-lg w-28",
+                ),
+                rx.cond(
+                    customer["credit_limit"],
+                    f"${customer['credit_limit'].to_string()}",
+                    "No limit",
+                ),
+            ),
+            class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+        ),
         rx.el.td(
+            rx.el.button(
+                rx.icon("file-text", class_name="w-4 h-4"),
+                on_click=lambda: CustomerState.open_statement(customer["id"]),
+                class_name="text-blue-600 hover:text-blue-900 mr-4",
+            ),
             rx.el.button(
                 rx.icon("trash-2", class_name="w-4 h-4"),
                 on_click=lambda: CustomerState.delete_customer(customer["id"]),
@@ -67,6 +97,12 @@ def add_customer_form() -> rx.Component:
                     placeholder="Address",
                     class_name="px-4 py-2 border rounded-lg w-full",
                 ),
+                rx.el.input(
+                    name="credit_limit",
+                    placeholder="Credit Limit (optional)",
+                    type="number",
+                    class_name="px-4 py-2 border rounded-lg w-full",
+                ),
                 rx.cond(
                     AuthState.is_admin,
                     rx.el.select(
@@ -97,6 +133,81 @@ def add_customer_form() -> rx.Component:
 
 
 @require_auth
+def customer_statement() -> rx.Component:
+    return rx.cond(
+        CustomerState.statement_customer_id,
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    f"Statement: {CustomerState.statement_customer_name}",
+                    class_name="text-xl font-semibold text-gray-700",
+                ),
+                rx.el.div(
+                    rx.el.span(
+                        f"Balance: ${CustomerState.statement_balance.to_string()}",
+                        class_name="font-bold text-gray-800 mr-4",
+                    ),
+                    export_buttons("statement", CustomerState.statement_customer_id),
+                    rx.el.button(
+                        rx.icon("x", class_name="w-4 h-4"),
+                        on_click=CustomerState.close_statement,
+                        class_name="p-2 rounded-lg hover:bg-gray-100",
+                    ),
+                    class_name="flex items-center",
+                ),
+                class_name="flex items-center justify-between mb-4",
+            ),
+            rx.el.div(
+                rx.el.table(
+                    rx.el.thead(
+                        rx.el.tr(
+                            rx.el.th("Date"),
+                            rx.el.th("Description"),
+                            rx.el.th("Charge"),
+                            rx.el.th("Credit"),
+                            rx.el.th("Balance"),
+                        )
+                    ),
+                    rx.el.tbody(
+                        rx.foreach(
+                            CustomerState.statement_rows,
+                            lambda row: rx.el.tr(
+                                rx.el.td(row["date"].to_string().split("T")[0]),
+                                rx.el.td(row["description"]),
+                                rx.el.td(
+                                    rx.cond(
+                                        row["charge"] > 0,
+                                        f"${row['charge'].to_string()}",
+                                        "",
+                                    )
+                                ),
+                                rx.el.td(
+                                    rx.cond(
+                                        row["credit"] > 0,
+                                        f"${row['credit'].to_string()}",
+                                        "",
+                                    )
+                                ),
+                                rx.el.td(f"${row['balance'].to_string()}"),
+                                class_name="text-sm",
+                            ),
+                        )
+                    ),
+                    class_name="min-w-full divide-y divide-gray-200 text-left",
+                ),
+                class_name="max-h-96 overflow-y-auto",
+            ),
+            rx.cond(
+                CustomerState.statement_loading,
+                rx.el.p("Loading...", class_name="text-sm text-gray-500 mt-2"),
+                None,
+            ),
+            class_name="p-8 bg-white rounded-xl shadow-lg border w-full mt-8",
+        ),
+        None,
+    )
+
+
 def customers_page() -> rx.Component:
     return base_layout(
         rx.el.div(
@@ -138,6 +249,10 @@ def customers_page() -> rx.Component:
                                     "Credit Balance",
                                     class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
                                 ),
+                                rx.el.th(
+                                    "Credit Limit",
+                                    class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                                ),
                                 rx.el.th(class_name="relative px-6 py-3"),
                             )
                         ),
@@ -151,6 +266,7 @@ def customers_page() -> rx.Component:
                 ),
                 class_name="overflow-x-auto mt-8",
             ),
+            customer_statement(),
             class_name="w-full",
             on_mount=[CustomerState.load_customers, AuthState.load_all_data],
         )
@@ -3,6 +3,42 @@ from app.states.auth_state import AuthState, require_auth
 from app.states.customer_state import CustomerState
 from app.states.financial_state import FinancialState
 from app.components.base_layout import base_layout
+from app.components.export_buttons import export_buttons
+
+
+def plan_preview_table() -> rx.Component:
+    return rx.el.details(
+        rx.el.summary(
+            "Amortization Schedule Preview",
+            class_name="font-semibold text-gray-600 cursor-pointer mb-2",
+        ),
+        rx.el.table(
+            rx.el.thead(
+                rx.el.tr(
+                    rx.el.th("#"),
+                    rx.el.th("Payment"),
+                    rx.el.th("Interest"),
+                    rx.el.th("Principal"),
+                    rx.el.th("Balance"),
+                )
+            ),
+            rx.el.tbody(
+                rx.foreach(
+                    FinancialState.plan_preview,
+                    lambda row: rx.el.tr(
+                        rx.el.td(row["number"]),
+                        rx.el.td(f"${row['payment'].to_string()}"),
+                        rx.el.td(f"${row['interest'].to_string()}"),
+                        rx.el.td(f"${row['principal'].to_string()}"),
+                        rx.el.td(f"${row['balance'].to_string()}"),
+                        class_name="text-sm",
+                    ),
+                )
+            ),
+            class_name="min-w-full divide-y divide-gray-200 text-left",
+        ),
+        class_name="mb-6 max-h-80 overflow-y-auto",
+    )
 
 
 def new_financial_payment_form() -> rx.Component:
@@ -30,7 +66,7 @@ def new_financial_payment_form() -> rx.Component:
                 class_name="w-full px-4 py-3 bg-gray-100 rounded-lg border-gray-200",
             ),
             rx.el.input(
-                placeholder="Interest Rate (%)",
+                placeholder="Annual Interest Rate (%)",
                 type="number",
                 on_change=FinancialState.set_interest_rate,
                 default_value=FinancialState.interest_rate.to_string(),
@@ -66,6 +102,20 @@ def new_financial_payment_form() -> rx.Component:
                     class_name="flex items-center mt-2",
                 ),
             ),
+            rx.el.div(
+                rx.el.label(
+                    "Amortization Method", class_name="font-medium text-gray-600"
+                ),
+                rx.el.select(
+                    rx.el.option("Flat (interest on original principal)", value="flat"),
+                    rx.el.option(
+                        "French (interest on declining balance)", value="french"
+                    ),
+                    value=FinancialState.amortization_method,
+                    on_change=FinancialState.set_amortization_method,
+                    class_name="w-full px-4 py-3 bg-gray-100 rounded-lg border-gray-200 mt-2",
+                ),
+            ),
             rx.el.div(
                 rx.el.label(
                     "Number of Installments", class_name="font-medium text-gray-600"
@@ -78,7 +128,7 @@ def new_financial_payment_form() -> rx.Component:
                     class_name="w-full px-4 py-3 bg-gray-100 rounded-lg border-gray-200 mt-2",
                 ),
             ),
-            class_name="grid md:grid-cols-2 gap-4 mb-6 items-center",
+            class_name="grid md:grid-cols-3 gap-4 mb-6 items-center",
         ),
         rx.el.div(
             rx.el.div(
@@ -99,6 +149,7 @@ def new_financial_payment_form() -> rx.Component:
             ),
             class_name="grid md:grid-cols-2 gap-4 mb-6",
         ),
+        plan_preview_table(),
         rx.el.button(
             "Create Payment Plan",
             on_click=FinancialState.create_financial_payment,
@@ -133,11 +184,45 @@ def status_badge(status: rx.Var[str]) -> rx.Component:
                 "Pending",
                 "px-3 py-1 text-xs font-semibold rounded-full bg-yellow-100 text-yellow-800",
             ),
+            (
+                "Partial",
+                "px-3 py-1 text-xs font-semibold rounded-full bg-orange-100 text-orange-800",
+            ),
             "px-3 py-1 text-xs font-semibold rounded-full bg-gray-100 text-gray-800",
         ),
     )
 
 
+def plan_what_if() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p("Early payoff today", class_name="text-sm text-gray-500"),
+            rx.el.p(
+                f"${FinancialState.early_payoff_amount.to_string()}",
+                class_name="text-lg font-bold text-blue-600",
+            ),
+        ),
+        rx.el.div(
+            rx.el.p("Reschedule balance over", class_name="text-sm text-gray-500"),
+            rx.el.div(
+                rx.el.input(
+                    type="number",
+                    min=1,
+                    default_value=FinancialState.reschedule_installments.to_string(),
+                    on_change=FinancialState.set_reschedule_installments,
+                    class_name="w-20 px-2 py-1 bg-white rounded-md border-gray-200",
+                ),
+                rx.el.span(
+                    f"installments of ${FinancialState.rescheduled_installment_amount.to_string()}",
+                    class_name="text-sm font-semibold text-gray-700",
+                ),
+                class_name="flex items-center gap-2",
+            ),
+        ),
+        class_name="flex flex-wrap gap-8 mt-6 pt-4 border-t",
+    )
+
+
 def installment_details_view() -> rx.Component:
     return rx.el.tr(
         rx.el.td(
@@ -151,6 +236,7 @@ def installment_details_view() -> rx.Component:
                             rx.el.th("#"),
                             rx.el.th("Due Date"),
                             rx.el.th("Amount Due"),
+                            rx.el.th("Amount Paid"),
                             rx.el.th("Status"),
                             rx.el.th("Action"),
                         )
@@ -162,10 +248,11 @@ def installment_details_view() -> rx.Component:
                                 rx.el.td(inst["installment_number"]),
                                 rx.el.td(inst["due_date"].to_string().split("T")[0]),
                                 rx.el.td(f"${inst['amount_due'].to_string()}"),
+                                rx.el.td(f"${inst['amount_paid'].to_string()}"),
                                 rx.el.td(status_badge(inst["status"])),
                                 rx.el.td(
                                     rx.cond(
-                                        inst["status"] == "Pending",
+                                        inst["status"] != "Paid",
                                         rx.el.button(
                                             "Mark as Paid",
                                             on_click=lambda: FinancialState.mark_installment_paid(
@@ -182,9 +269,10 @@ def installment_details_view() -> rx.Component:
                     ),
                     class_name="min-w-full divide-y divide-gray-200",
                 ),
+                plan_what_if(),
                 class_name="p-6 bg-gray-50 rounded-lg",
             ),
-            col_span=8,
+            col_span=10,
             class_name="p-0",
         )
     )
@@ -192,9 +280,13 @@ def installment_details_view() -> rx.Component:
 
 def financial_history_table() -> rx.Component:
     return rx.el.div(
-        rx.el.h2(
-            "Financial Payments History",
-            class_name="text-2xl font-semibold text-gray-700 my-8",
+        rx.el.div(
+            rx.el.h2(
+                "Financial Payments History",
+                class_name="text-2xl font-semibold text-gray-700",
+            ),
+            export_buttons("financial_plans"),
+            class_name="flex items-center justify-between my-8",
         ),
         rx.el.div(
             rx.el.div(
@@ -206,6 +298,8 @@ def financial_history_table() -> rx.Component:
                             rx.el.th("Interest"),
                             rx.el.th("Total"),
                             rx.el.th("Plan"),
+                            rx.el.th("Paid"),
+                            rx.el.th("Outstanding"),
                             rx.el.th("Status"),
                             rx.el.th("Date"),
                             rx.el.th(""),
@@ -221,12 +315,16 @@ def financial_history_table() -> rx.Component:
                                         f"${payment['principal_amount'].to_string()}"
                                     ),
                                     rx.el.td(
-                                        f"{payment['interest_rate'].to_string()}%"
+                                        f"{payment['interest_rate'].to_string()}% p.a."
                                     ),
                                     rx.el.td(f"${payment['total_amount'].to_string()}"),
                                     rx.el.td(
                                         f"{payment['num_installments']} {payment['installment_type']}"
                                     ),
+                                    rx.el.td(
+                                        f"{payment['paid_count']}/{payment['num_installments']}"
+                                    ),
+                                    rx.el.td(f"${payment['outstanding'].to_string()}"),
                                     rx.el.td(status_badge(payment["status"])),
                                     rx.el.td(
                                         payment["created_at"].to_string().split("T")[0]
@@ -260,10 +358,99 @@ def financial_history_table() -> rx.Component:
             ),
             class_name="overflow-x-auto",
         ),
+        payments_pagination(),
         class_name="w-full",
     )
 
 
+def payments_pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.button(
+            rx.icon("chevron-left", class_name="w-4 h-4"),
+            on_click=FinancialState.previous_payments_page,
+            disabled=FinancialState.payments_page == 0,
+            class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+        ),
+        rx.el.span(
+            f"Page {FinancialState.payments_page + 1} of {FinancialState.payments_page_count}",
+            class_name="text-sm text-gray-600",
+        ),
+        rx.el.button(
+            rx.icon("chevron-right", class_name="w-4 h-4"),
+            on_click=FinancialState.next_payments_page,
+            disabled=FinancialState.payments_page + 1
+            >= FinancialState.payments_page_count,
+            class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+        ),
+        class_name="flex items-center justify-end gap-3 mt-4",
+    )
+
+
+def batch_posting_result_row(result: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(result["reference"], class_name="px-4 py-2"),
+        rx.el.td(f"${result['amount'].to_string()}", class_name="px-4 py-2"),
+        rx.el.td(f"${result['applied'].to_string()}", class_name="px-4 py-2"),
+        rx.el.td(result["installments_paid"], class_name="px-4 py-2"),
+        rx.el.td(
+            rx.cond(result["error"], result["error"], "OK"),
+            class_name=rx.cond(
+                result["error"], "px-4 py-2 text-red-600", "px-4 py-2 text-green-600"
+            ),
+        ),
+        class_name="text-sm border-b",
+    )
+
+
+def batch_posting_form() -> rx.Component:
+    return rx.el.div(
+        rx.el.h2(
+            "Batch Payment Posting",
+            class_name="text-2xl font-semibold text-gray-700 mb-2",
+        ),
+        rx.el.p(
+            "One payment per line: '#<installment id>, amount' or 'Customer Name, amount'. "
+            "Amounts are applied to the oldest open installments first.",
+            class_name="text-sm text-gray-500 mb-4",
+        ),
+        rx.el.textarea(
+            placeholder="#42, 150.00\nJane Doe, 300",
+            on_change=FinancialState.set_batch_postings_text,
+            value=FinancialState.batch_postings_text,
+            rows="6",
+            class_name="w-full px-4 py-3 bg-gray-100 rounded-lg border-gray-200 font-mono text-sm mb-4",
+        ),
+        rx.el.button(
+            "Post Payments",
+            on_click=FinancialState.post_payment_batch,
+            class_name="px-6 py-3 bg-green-600 text-white font-bold rounded-lg hover:bg-green-700",
+        ),
+        rx.cond(
+            FinancialState.batch_posting_results.length() > 0,
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Reference", class_name="px-4 py-2 text-left"),
+                        rx.el.th("Amount", class_name="px-4 py-2 text-left"),
+                        rx.el.th("Applied", class_name="px-4 py-2 text-left"),
+                        rx.el.th("Installments Paid", class_name="px-4 py-2 text-left"),
+                        rx.el.th("Result", class_name="px-4 py-2 text-left"),
+                    ),
+                    class_name="bg-gray-50 text-xs uppercase text-gray-500",
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        FinancialState.batch_posting_results, batch_posting_result_row
+                    )
+                ),
+                class_name="min-w-full mt-6",
+            ),
+            None,
+        ),
+        class_name="p-8 bg-white rounded-xl shadow-lg border w-full mb-12",
+    )
+
+
 @require_auth
 def financial_page() -> rx.Component:
     return base_layout(
@@ -273,6 +460,7 @@ def financial_page() -> rx.Component:
                 class_name="text-4xl font-bold text-gray-800 mb-8",
             ),
             new_financial_payment_form(),
+            batch_posting_form(),
             financial_history_table(),
             on_mount=[
                 FinancialState.load_financial_payments,
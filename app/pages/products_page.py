@@ -18,6 +18,10 @@ def product_row(product: rx.Var[dict]) -> rx.Component:
             f"${product['price'].to_string()}",
             class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
         ),
+        rx.el.td(
+            product["reorder_point"],
+            class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+        ),
         rx.el.td(
             product["created_at"].to_string().split("T")[0],
             class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
@@ -59,6 +63,14 @@ def add_product_form() -> rx.Component:
                 default_value=ProductState.new_product_price,
                 class_name="px-4 py-2 border rounded-lg",
             ),
+            rx.el.input(
+                placeholder="Reorder Point",
+                type="number",
+                min=0,
+                on_change=ProductState.set_new_product_reorder_point,
+                default_value=ProductState.new_product_reorder_point,
+                class_name="px-4 py-2 border rounded-lg",
+            ),
             rx.el.input(
                 placeholder="Description",
                 on_change=ProductState.set_new_product_description,
@@ -75,6 +87,61 @@ def add_product_form() -> rx.Component:
     )
 
 
+def catalog_filters() -> rx.Component:
+    return rx.el.div(
+        rx.debounce_input(
+            rx.el.input(
+                placeholder="Search by name...",
+                value=ProductState.catalog_search,
+                on_change=ProductState.set_catalog_search,
+                class_name="px-4 py-2 border rounded-lg w-full",
+            ),
+            debounce_timeout=300,
+        ),
+        rx.el.select(
+            rx.el.option("All Categories", value=""),
+            rx.foreach(
+                ProductState.product_categories,
+                lambda c: rx.el.option(c, value=c),
+            ),
+            value=ProductState.catalog_category,
+            on_change=ProductState.set_catalog_category,
+            class_name="px-4 py-2 border rounded-lg w-full",
+        ),
+        rx.el.label(
+            rx.el.input(
+                type="checkbox",
+                checked=ProductState.catalog_in_stock_only,
+                on_change=ProductState.set_catalog_in_stock_only,
+                class_name="mr-2",
+            ),
+            "In stock at my branch",
+            class_name="flex items-center text-sm text-gray-600",
+        ),
+        class_name="grid grid-cols-1 md:grid-cols-3 gap-4 items-center mt-8",
+    )
+
+
+def catalog_pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.button(
+            rx.icon("chevron-left", class_name="w-4 h-4"),
+            "Previous",
+            on_click=ProductState.previous_catalog_page,
+            disabled=ProductState.catalog_cursors.length() == 0,
+            class_name="flex items-center gap-1 px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200 text-sm",
+        ),
+        rx.el.button(
+            "Next",
+            rx.icon("chevron-right", class_name="w-4 h-4"),
+            on_click=ProductState.next_catalog_page,
+            disabled=~ProductState.catalog_has_next,
+            class_name="flex items-center gap-1 px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200 text-sm",
+        ),
+        class_name="flex justify-end gap-3 mt-4",
+    )
+
+
 @require_auth
 @admin_only
 def products_page() -> rx.Component:
@@ -84,6 +151,7 @@ def products_page() -> rx.Component:
                 "Product Management", class_name="text-4xl font-bold text-gray-800 mb-8"
             ),
             add_product_form(),
+            catalog_filters(),
             rx.el.div(
                 rx.el.div(
                     rx.el.table(
@@ -101,6 +169,10 @@ def products_page() -> rx.Component:
                                     "Price",
                                     class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
                                 ),
+                                rx.el.th(
+                                    "Reorder Point",
+                                    class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                                ),
                                 rx.el.th(
                                     "Created At",
                                     class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
@@ -109,16 +181,17 @@ def products_page() -> rx.Component:
                             )
                         ),
                         rx.el.tbody(
-                            rx.foreach(ProductState.products, product_row),
+                            rx.foreach(ProductState.catalog_products, product_row),
                             class_name="bg-white divide-y divide-gray-200",
                         ),
                         class_name="min-w-full divide-y divide-gray-200",
                     ),
                     class_name="shadow overflow-hidden border-b border-gray-200 sm:rounded-lg",
                 ),
-                class_name="overflow-x-auto mt-8",
+                class_name="overflow-x-auto mt-4",
             ),
+            catalog_pagination(),
             class_name="w-full",
-            on_mount=ProductState.load_products_and_stock,
+            on_mount=ProductState.load_catalog,
         )
     )
\ No newline at end of file
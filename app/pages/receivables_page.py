@@ -0,0 +1,194 @@
+import reflex as rx
+from app.states.auth_state import require_auth
+from app.states.receivables_state import ReceivablesState, AGING_BUCKETS
+from app.components.base_layout import base_layout
+
+
+def aging_cell(row: rx.Var[dict], bucket: str) -> rx.Component:
+    return rx.el.td(
+        rx.el.button(
+            f"${row[bucket].to_string()}",
+            on_click=lambda: ReceivablesState.drill_down(
+                row["branch_id"], row["user_id"], bucket
+            ),
+            disabled=row[bucket] == 0,
+            class_name=rx.cond(
+                (ReceivablesState.aging_bucket == bucket)
+                & (ReceivablesState.aging_branch_id == row["branch_id"])
+                & (ReceivablesState.aging_user_id == row["user_id"]),
+                "px-2 py-1 rounded-md bg-blue-100 text-blue-700 font-semibold",
+                "px-2 py-1 rounded-md hover:bg-gray-100 disabled:text-gray-400",
+            ),
+        )
+    )
+
+
+def aging_table() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h2(
+                "Portfolio Aging", class_name="text-2xl font-semibold text-gray-700"
+            ),
+            rx.el.button(
+                rx.icon("refresh-cw", class_name="w-4 h-4 mr-2"),
+                "Refresh",
+                on_click=ReceivablesState.load_aging_report,
+                class_name="flex items-center px-4 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+            ),
+            class_name="flex items-center justify-between mb-6",
+        ),
+        rx.el.table(
+            rx.el.thead(
+                rx.el.tr(
+                    rx.el.th("Branch"),
+                    rx.el.th("Collector"),
+                    *[rx.el.th(label) for label in AGING_BUCKETS.values()],
+                    rx.el.th("Total"),
+                )
+            ),
+            rx.el.tbody(
+                rx.foreach(
+                    ReceivablesState.aging_rows,
+                    lambda row: rx.el.tr(
+                        rx.el.td(row["branch_name"]),
+                        rx.el.td(row["collector_name"]),
+                        *[aging_cell(row, bucket) for bucket in AGING_BUCKETS],
+                        rx.el.td(
+                            f"${row['total'].to_string()}", class_name="font-semibold"
+                        ),
+                        class_name="text-sm",
+                    ),
+                ),
+                rx.el.tr(
+                    rx.el.td("Total", col_span=2),
+                    *[
+                        rx.el.td(
+                            f"${ReceivablesState.aging_totals[bucket].to_string()}"
+                        )
+                        for bucket in [*AGING_BUCKETS, "total"]
+                    ],
+                    class_name="text-sm font-bold bg-gray-50",
+                ),
+            ),
+            class_name="min-w-full divide-y divide-gray-200 text-left",
+        ),
+        class_name="p-8 bg-white rounded-xl shadow-lg border w-full mb-12 overflow-x-auto",
+    )
+
+
+def aging_items_table() -> rx.Component:
+    return rx.cond(
+        ReceivablesState.aging_bucket != "",
+        rx.el.div(
+            rx.el.div(
+                rx.el.h3(
+                    f"Open Installments: {ReceivablesState.aging_bucket_label} days",
+                    class_name="text-xl font-semibold text-gray-700",
+                ),
+                rx.el.button(
+                    rx.icon("x", class_name="w-4 h-4"),
+                    on_click=ReceivablesState.close_drill_down,
+                    class_name="p-2 rounded-lg hover:bg-gray-100",
+                ),
+                class_name="flex items-center justify-between mb-4",
+            ),
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th("Customer"),
+                        rx.el.th("Source"),
+                        rx.el.th("#"),
+                        rx.el.th("Due Date"),
+                        rx.el.th("Days Past Due"),
+                        rx.el.th("Outstanding"),
+                        rx.el.th("Status"),
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        ReceivablesState.aging_items,
+                        lambda item: rx.el.tr(
+                            rx.el.td(item["customer_name"]),
+                            rx.el.td(item["source"].to_string().capitalize()),
+                            rx.el.td(item["installment_number"]),
+                            rx.el.td(item["due_date"].to_string().split("T")[0]),
+                            rx.el.td(item["days_past_due"]),
+                            rx.el.td(f"${item['outstanding'].to_string()}"),
+                            rx.el.td(item["status"]),
+                            class_name="text-sm",
+                        ),
+                    )
+                ),
+                class_name="min-w-full divide-y divide-gray-200 text-left",
+            ),
+            rx.el.div(
+                rx.el.button(
+                    rx.icon("chevron-left", class_name="w-4 h-4"),
+                    on_click=ReceivablesState.previous_aging_items_page,
+                    disabled=ReceivablesState.aging_items_page == 0,
+                    class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+                ),
+                rx.el.span(
+                    f"Page {ReceivablesState.aging_items_page + 1}",
+                    class_name="text-sm text-gray-600",
+                ),
+                rx.el.button(
+                    rx.icon("chevron-right", class_name="w-4 h-4"),
+                    on_click=ReceivablesState.next_aging_items_page,
+                    disabled=~ReceivablesState.aging_items_has_next,
+                    class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+                ),
+                class_name="flex items-center justify-end gap-3 mt-4",
+            ),
+            class_name="p-8 bg-white rounded-xl shadow-lg border w-full mb-12",
+        ),
+        None,
+    )
+
+
+def cash_in_projection() -> rx.Component:
+    return rx.el.div(
+        rx.el.h2(
+            "Expected Cash-In by Week",
+            class_name="text-2xl font-semibold text-gray-700 mb-2",
+        ),
+        rx.el.p(
+            "Projected from the amortization schedules of active financial plans. "
+            "Past-due installments are counted in the current week.",
+            class_name="text-sm text-gray-500 mb-6",
+        ),
+        rx.el.table(
+            rx.el.thead(rx.el.tr(rx.el.th("Week Starting"), rx.el.th("Expected"))),
+            rx.el.tbody(
+                rx.foreach(
+                    ReceivablesState.cash_in_projection,
+                    lambda week: rx.el.tr(
+                        rx.el.td(week["week_start"]),
+                        rx.el.td(f"${week['expected'].to_string()}"),
+                        class_name="text-sm",
+                    ),
+                )
+            ),
+            class_name="min-w-full divide-y divide-gray-200 text-left",
+        ),
+        class_name="p-8 bg-white rounded-xl shadow-lg border w-full mb-12",
+    )
+
+
+@require_auth
+def receivables_page() -> rx.Component:
+    return base_layout(
+        rx.el.div(
+            rx.el.h1(
+                "Receivables",
+                class_name="text-4xl font-bold text-gray-800 mb-8",
+            ),
+            aging_table(),
+            aging_items_table(),
+            cash_in_projection(),
+            on_mount=[
+                ReceivablesState.load_aging_report,
+                ReceivablesState.load_cash_in_projection,
+            ],
+        )
+    )
\ No newline at end of file
@@ -4,6 +4,7 @@ from app.states.customer_state import CustomerState
 from app.states.product_state import ProductState
 from app.states.sales_state import SalesState
 from app.components.base_layout import base_layout
+from app.components.export_buttons import export_buttons
 
 
 def sale_entry_form() -> rx.Component:
@@ -138,8 +139,12 @@ def sale_entry_form() -> rx.Component:
 
 def sales_history_table() -> rx.Component:
     return rx.el.div(
-        rx.el.h2(
-            "Sales History", class_name="text-2xl font-semibold text-gray-700 my-8"
+        rx.el.div(
+            rx.el.h2(
+                "Sales History", class_name="text-2xl font-semibold text-gray-700"
+            ),
+            export_buttons("sales"),
+            class_name="flex items-center justify-between my-8",
         ),
         rx.el.div(
             rx.el.div(
@@ -174,6 +179,10 @@ def sales_history_table() -> rx.Component:
                                 "Date",
                                 class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
                             ),
+                            rx.el.th(
+                                "",
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            ),
                         )
                     ),
                     rx.el.tbody(
@@ -215,6 +224,21 @@ def sales_history_table() -> rx.Component:
                                     sale["created_at"].to_string().split("T")[0],
                                     class_name="px-6 py-4 whitespace-nowrap",
                                 ),
+                                rx.el.td(
+                                    rx.cond(
+                                        AuthState.is_admin
+                                        & (sale["status"] == "Pending"),
+                                        rx.el.button(
+                                            "Cancel",
+                                            on_click=lambda: SalesState.cancel_credit_sale(
+                                                sale["id"]
+                                            ),
+                                            class_name="px-3 py-1 bg-red-500 text-white text-xs rounded-md hover:bg-red-600",
+                                        ),
+                                        None,
+                                    ),
+                                    class_name="px-6 py-4 whitespace-nowrap",
+                                ),
                             ),
                         ),
                         class_name="bg-white divide-y divide-gray-200",
@@ -1,34 +1,217 @@
 import reflex as rx
 from app.states.auth_state import AuthState, require_auth
-from app.states.product_state import ProductState
+from app.states.product_state import ProductState, STOCK_COUNT_UPLOAD_ID
 from app.components.base_layout import base_layout
+from app.components.export_buttons import export_buttons
 
 
-def stock_row(stock: rx.Var[dict]) -> rx.Component:
+def quantity_cell(cell: rx.Var[dict]) -> rx.Component:
+    return rx.el.td(
+        rx.el.span(
+            cell["quantity"],
+            class_name=rx.cond(
+                cell["is_low"],
+                "px-3 py-1 text-xs font-semibold rounded-full bg-red-100 text-red-800",
+                "px-3 py-1 text-xs font-semibold rounded-full bg-green-100 text-green-800",
+            ),
+        ),
+        class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+    )
+
+
+def stock_matrix_row(row: rx.Var[dict]) -> rx.Component:
     return rx.el.tr(
         rx.el.td(
-            stock["product_name"],
+            row["product_name"],
             class_name="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900",
         ),
+        rx.foreach(row["cells"], quantity_cell),
         rx.el.td(
-            stock["branch_name"],
-            class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+            row["total"],
+            class_name="px-6 py-4 whitespace-nowrap text-sm font-semibold text-gray-700",
         ),
-        rx.el.td(
+        class_name="hover:bg-gray-50",
+    )
+
+
+def stock_matrix_controls() -> rx.Component:
+    return rx.el.div(
+        rx.el.select(
+            rx.el.option("All Categories", value=""),
+            rx.foreach(
+                ProductState.product_categories,
+                lambda c: rx.el.option(c, value=c),
+            ),
+            value=ProductState.stock_matrix_category,
+            on_change=ProductState.set_stock_matrix_category,
+            class_name="px-4 py-2 border rounded-lg",
+        ),
+        rx.el.div(
+            rx.el.button(
+                rx.icon("chevron-left", class_name="w-4 h-4"),
+                on_click=ProductState.previous_stock_matrix_page,
+                disabled=ProductState.stock_matrix_page == 0,
+                class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+            ),
             rx.el.span(
-                stock["quantity"],
-                class_name=rx.cond(
-                    stock["quantity"] < 10,
-                    "px-3 py-1 text-xs font-semibold rounded-full bg-red-100 text-red-800",
-                    "px-3 py-1 text-xs font-semibold rounded-full bg-green-100 text-green-800",
+                f"Page {ProductState.stock_matrix_page + 1} of {ProductState.stock_matrix_page_count}",
+                class_name="text-sm text-gray-600",
+            ),
+            rx.el.button(
+                rx.icon("chevron-right", class_name="w-4 h-4"),
+                on_click=ProductState.next_stock_matrix_page,
+                disabled=ProductState.stock_matrix_page + 1
+                >= ProductState.stock_matrix_page_count,
+                class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+            ),
+            class_name="flex items-center gap-3",
+        ),
+        class_name="flex items-center justify-between mt-8",
+    )
+
+
+def low_stock_alerts() -> rx.Component:
+    return rx.cond(
+        ProductState.low_stock_count > 0,
+        rx.el.div(
+            rx.el.div(
+                rx.icon("triangle-alert", class_name="w-5 h-5 text-red-600"),
+                rx.el.h2(
+                    f"Low Stock ({ProductState.low_stock_count})",
+                    class_name="text-lg font-semibold text-red-800",
                 ),
+                class_name="flex items-center gap-2 mb-3",
+            ),
+            rx.el.ul(
+                rx.foreach(
+                    ProductState.low_stock_items,
+                    lambda item: rx.el.li(
+                        rx.el.span(
+                            f"{item['product_name']} @ {item['branch_name']}",
+                            class_name="font-medium text-gray-800",
+                        ),
+                        rx.el.span(
+                            f"{item['quantity']} / reorder at {item['reorder_point']}",
+                            class_name="text-red-700",
+                        ),
+                        class_name="flex justify-between text-sm py-1",
+                    ),
+                ),
+                class_name="divide-y divide-red-100",
+            ),
+            class_name="p-4 mb-8 bg-red-50 border border-red-200 rounded-xl",
+        ),
+        None,
+    )
+
+
+def reorder_suggestion_row(item: rx.Var[dict]) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            item["product_name"],
+            class_name="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900",
+        ),
+        rx.el.td(
+            item["branch_name"],
+            class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+        ),
+        rx.el.td(
+            item["on_hand"],
+            class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+        ),
+        rx.el.td(
+            item["daily_velocity"],
+            class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+        ),
+        rx.el.td(
+            rx.cond(
+                item["days_of_cover"],
+                item["days_of_cover"].to_string(),
+                "-",
+            ),
+            class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
+        ),
+        rx.el.td(
+            rx.cond(
+                item["transfer_quantity"] > 0,
+                f"{item['transfer_quantity']} from {item['transfer_from_branch_name']}",
+                "-",
             ),
             class_name="px-6 py-4 whitespace-nowrap text-sm text-gray-500",
         ),
+        rx.el.td(
+            item["reorder_quantity"],
+            class_name="px-6 py-4 whitespace-nowrap text-sm font-semibold text-gray-700",
+        ),
         class_name="hover:bg-gray-50",
     )
 
 
+def reorder_suggestions_table() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h2(
+                "Reorder Suggestions",
+                class_name="text-2xl font-semibold text-gray-700",
+            ),
+            rx.el.div(
+                rx.cond(
+                    ProductState.reorder_suggestions_computed_at != "",
+                    rx.el.span(
+                        f"Computed {ProductState.reorder_suggestions_computed_at.split('T')[0]}",
+                        class_name="text-sm text-gray-500",
+                    ),
+                    None,
+                ),
+                rx.cond(
+                    AuthState.is_admin,
+                    rx.el.button(
+                        rx.icon("refresh-cw", class_name="w-4 h-4 mr-2"),
+                        "Recompute",
+                        on_click=ProductState.recompute_reorder_suggestions,
+                        class_name="flex items-center px-4 py-2 bg-gray-100 text-gray-700 rounded-lg hover:bg-gray-200 text-sm",
+                    ),
+                    None,
+                ),
+                class_name="flex items-center gap-4",
+            ),
+            class_name="flex items-center justify-between mb-4 mt-8",
+        ),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        *[
+                            rx.el.th(
+                                header,
+                                class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                            )
+                            for header in (
+                                "Product",
+                                "Branch",
+                                "On Hand",
+                                "Units/Day",
+                                "Days of Cover",
+                                "Transfer",
+                                "Reorder",
+                            )
+                        ]
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(
+                        ProductState.reorder_suggestions, reorder_suggestion_row
+                    ),
+                    class_name="bg-white divide-y divide-gray-200",
+                ),
+                class_name="min-w-full divide-y divide-gray-200",
+            ),
+            class_name="shadow overflow-hidden border-b border-gray-200 sm:rounded-lg",
+        ),
+        class_name="overflow-x-auto",
+    )
+
+
 def update_stock_form() -> rx.Component:
     return rx.el.div(
         rx.el.h2(
@@ -60,12 +243,19 @@ def update_stock_form() -> rx.Component:
                 on_change=ProductState.set_stock_quantity,
                 class_name="px-4 py-2 border rounded-lg",
             ),
+            rx.el.input(
+                placeholder="Reorder Point (optional)",
+                type="number",
+                min=0,
+                on_change=ProductState.set_stock_reorder_point,
+                class_name="px-4 py-2 border rounded-lg",
+            ),
             rx.el.button(
                 "Update Stock",
                 on_click=ProductState.update_stock,
                 class_name="px-6 py-2 bg-blue-600 text-white font-semibold rounded-lg shadow-md hover:bg-blue-700",
             ),
-            class_name="grid grid-cols-1 md:grid-cols-4 gap-4 items-center p-6 bg-white rounded-xl shadow",
+            class_name="grid grid-cols-1 md:grid-cols-5 gap-4 items-center p-6 bg-white rounded-xl shadow",
         ),
     )
 
@@ -122,18 +312,79 @@ def transfer_stock_form() -> rx.Component:
     )
 
 
+def stock_count_upload_form() -> rx.Component:
+    return rx.el.div(
+        rx.el.h2(
+            "Import Stock Count",
+            class_name="text-2xl font-semibold text-gray-700 mb-4 mt-8",
+        ),
+        rx.el.div(
+            rx.upload.root(
+                rx.el.div(
+                    rx.icon("upload", class_name="w-8 h-8 text-gray-400 mb-2"),
+                    rx.el.p(
+                        "Drop a CSV of product, branch, counted quantity or click to select",
+                        class_name="text-sm text-gray-500",
+                    ),
+                    rx.foreach(
+                        rx.selected_files(STOCK_COUNT_UPLOAD_ID),
+                        lambda file: rx.el.p(
+                            file, class_name="text-sm font-medium text-gray-700 mt-2"
+                        ),
+                    ),
+                    class_name="flex flex-col items-center justify-center p-6",
+                ),
+                id=STOCK_COUNT_UPLOAD_ID,
+                accept={"text/csv": [".csv"]},
+                multiple=False,
+                max_files=1,
+                class_name="w-full border-2 border-dashed border-gray-300 rounded-lg cursor-pointer hover:bg-gray-50",
+            ),
+            rx.el.button(
+                "Apply Stock Count",
+                on_click=ProductState.handle_stock_count_upload(
+                    rx.upload_files(upload_id=STOCK_COUNT_UPLOAD_ID)
+                ),
+                class_name="px-6 py-2 bg-blue-600 text-white font-semibold rounded-lg shadow-md hover:bg-blue-700",
+            ),
+            rx.cond(
+                ProductState.stock_count_result,
+                rx.el.p(
+                    f"Read {ProductState.stock_count_result['rows_read']} rows, "
+                    f"applied {ProductState.stock_count_result['rows_applied']} adjustments "
+                    f"(net {ProductState.stock_count_result['net_variance']} units), "
+                    f"{ProductState.stock_count_result['rows_unmatched']} rows skipped.",
+                    class_name="text-sm text-gray-600",
+                ),
+                None,
+            ),
+            class_name="flex flex-col gap-4 p-6 bg-white rounded-xl shadow",
+        ),
+    )
+
+
 @require_auth
 def stock_page() -> rx.Component:
     return base_layout(
         rx.el.div(
-            rx.el.h1(
-                "Stock Management", class_name="text-4xl font-bold text-gray-800 mb-8"
+            rx.el.div(
+                rx.el.h1(
+                    "Stock Management", class_name="text-4xl font-bold text-gray-800"
+                ),
+                export_buttons("stock"),
+                class_name="flex items-center justify-between mb-8",
             ),
+            low_stock_alerts(),
             rx.cond(
                 AuthState.is_admin,
-                rx.fragment(update_stock_form(), transfer_stock_form()),
+                rx.fragment(
+                    update_stock_form(),
+                    transfer_stock_form(),
+                    stock_count_upload_form(),
+                ),
                 None,
             ),
+            stock_matrix_controls(),
             rx.el.div(
                 rx.el.div(
                     rx.el.table(
@@ -143,27 +394,37 @@ def stock_page() -> rx.Component:
                                     "Product",
                                     class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
                                 ),
-                                rx.el.th(
-                                    "Branch",
-                                    class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                                rx.foreach(
+                                    ProductState.stock_matrix_branches,
+                                    lambda branch_name: rx.el.th(
+                                        branch_name,
+                                        class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
+                                    ),
                                 ),
                                 rx.el.th(
-                                    "Quantity",
+                                    "Total",
                                     class_name="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider",
                                 ),
                             )
                         ),
                         rx.el.tbody(
-                            rx.foreach(ProductState.stocks, stock_row),
+                            rx.foreach(
+                                ProductState.stock_matrix_rows, stock_matrix_row
+                            ),
                             class_name="bg-white divide-y divide-gray-200",
                         ),
                         class_name="min-w-full divide-y divide-gray-200",
                     ),
                     class_name="shadow overflow-hidden border-b border-gray-200 sm:rounded-lg",
                 ),
-                class_name="overflow-x-auto mt-8",
+                class_name="overflow-x-auto mt-4",
             ),
+            reorder_suggestions_table(),
             class_name="w-full",
-            on_mount=[ProductState.load_products_and_stock, AuthState.load_all_data],
+            on_mount=[
+                ProductState.load_products_and_stock,
+                ProductState.load_reorder_suggestions,
+                AuthState.load_all_data,
+            ],
         )
     )
\ No newline at end of file
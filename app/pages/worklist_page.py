@@ -0,0 +1,130 @@
+import reflex as rx
+from app.states.auth_state import AuthState, require_auth
+from app.states.worklist_state import WorklistState
+from app.components.base_layout import base_layout
+
+
+def worklist_filters() -> rx.Component:
+    return rx.cond(
+        AuthState.is_admin,
+        rx.el.div(
+            rx.el.select(
+                rx.el.option("All Branches", value=""),
+                rx.foreach(
+                    AuthState.all_branches,
+                    lambda b: rx.el.option(b["name"], value=b["id"].to_string()),
+                ),
+                value=WorklistState.branch_filter,
+                on_change=WorklistState.set_branch_filter,
+                class_name="w-full px-4 py-2 bg-gray-100 rounded-lg border-gray-200",
+            ),
+            rx.el.select(
+                rx.el.option("All Collectors", value=""),
+                rx.foreach(
+                    AuthState.all_users,
+                    lambda u: rx.el.option(u["username"], value=u["id"].to_string()),
+                ),
+                value=WorklistState.collector_filter,
+                on_change=WorklistState.set_collector_filter,
+                class_name="w-full px-4 py-2 bg-gray-100 rounded-lg border-gray-200",
+            ),
+            class_name="grid grid-cols-2 gap-3 mb-4",
+        ),
+        None,
+    )
+
+
+def worklist_card(item: rx.Var[dict]) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p(item["customer_name"], class_name="font-semibold text-gray-800"),
+            rx.el.p(
+                f"${item['outstanding'].to_string()}",
+                class_name="font-bold text-gray-800",
+            ),
+            class_name="flex justify-between",
+        ),
+        rx.el.div(
+            rx.el.span(f"Due {item['due_date']}"),
+            rx.cond(
+                item["days_overdue"] > 0,
+                rx.el.span(
+                    f"{item['days_overdue']} days overdue",
+                    class_name="text-red-600 font-medium",
+                ),
+                rx.el.span("Due today", class_name="text-yellow-700 font-medium"),
+            ),
+            class_name="flex justify-between text-sm text-gray-500 mt-1",
+        ),
+        rx.cond(
+            item["phone"],
+            rx.el.a(
+                rx.icon("phone", class_name="w-4 h-4 mr-1"),
+                item["phone"],
+                href=f"tel:{item['phone']}",
+                class_name="flex items-center text-sm text-blue-600 mt-2",
+            ),
+            None,
+        ),
+        rx.cond(
+            item["address"],
+            rx.el.p(
+                rx.icon("map-pin", class_name="w-4 h-4 mr-1"),
+                item["address"],
+                class_name="flex items-center text-sm text-gray-600 mt-1",
+            ),
+            None,
+        ),
+        rx.el.button(
+            "Collect",
+            on_click=lambda: WorklistState.collect_item(item["id"]),
+            class_name="w-full mt-3 px-3 py-2 bg-green-500 text-white text-sm rounded-md hover:bg-green-600",
+        ),
+        class_name="p-4 bg-white rounded-lg border shadow-sm",
+    )
+
+
+@require_auth
+def worklist_page() -> rx.Component:
+    return base_layout(
+        rx.el.div(
+            rx.el.div(
+                rx.el.h1(
+                    "Collections Worklist",
+                    class_name="text-2xl md:text-4xl font-bold text-gray-800",
+                ),
+                rx.el.button(
+                    rx.icon("refresh-cw", class_name="w-4 h-4"),
+                    on_click=WorklistState.refresh_worklist,
+                    class_name="p-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+                ),
+                class_name="flex items-center justify-between mb-2",
+            ),
+            rx.el.p(
+                f"Due today and overdue - ${WorklistState.total_due.to_string()} in total",
+                class_name="text-sm text-gray-500 mb-4",
+            ),
+            worklist_filters(),
+            rx.el.div(
+                rx.foreach(WorklistState.items, worklist_card),
+                class_name="flex flex-col gap-3",
+            ),
+            rx.el.div(
+                rx.el.button(
+                    rx.icon("chevron-left", class_name="w-4 h-4"),
+                    on_click=WorklistState.previous_page,
+                    disabled=WorklistState.cursors.length() == 0,
+                    class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+                ),
+                rx.el.button(
+                    rx.icon("chevron-right", class_name="w-4 h-4"),
+                    on_click=WorklistState.next_page,
+                    disabled=~WorklistState.has_next,
+                    class_name="px-3 py-2 bg-gray-100 rounded-lg hover:bg-gray-200",
+                ),
+                class_name="flex items-center justify-center gap-3 mt-4",
+            ),
+            on_mount=[WorklistState.refresh_worklist, AuthState.load_all_data],
+            class_name="max-w-xl mx-auto",
+        )
+    )
\ No newline at end of file
@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import reflex as rx
+import sqlalchemy as sa
+from datetime import datetime, timedelta
+from app.db_models import DownloadTicket
+
+ACCESS_TOKEN_TTL_SECONDS = 5 * 60
+DOWNLOAD_TICKET_TTL_SECONDS = 60
+SECRET_KEY_ERROR = "APP_SECRET_KEY must be set to sign API access tokens."
+
+
+def _sign(payload: str) -> str:
+    secret_key = os.environ.get("APP_SECRET_KEY", "").encode()
+    if not secret_key:
+        raise RuntimeError(SECRET_KEY_ERROR)
+    return hmac.new(secret_key, payload.encode(), hashlib.sha256).hexdigest()
+
+
+def tokens_enabled() -> bool:
+    return bool(os.environ.get("APP_SECRET_KEY"))
+
+
+def issue_access_token(user: dict, ttl: int = ACCESS_TOKEN_TTL_SECONDS) -> str:
+    payload = (
+        base64.urlsafe_b64encode(
+            json.dumps(
+                {
+                    "id": user["id"],
+                    "role": user["role"],
+                    "branch_id": user["branch_id"],
+                    "exp": int(time.time()) + ttl,
+                }
+            ).encode()
+        )
+        .decode()
+        .rstrip("=")
+    )
+    return f"{payload}.{_sign(payload)}"
+
+
+def read_access_token(token: str | None) -> dict | None:
+    if not token or "." not in token or not tokens_enabled():
+        return None
+    payload, _, signature = token.rpartition(".")
+    if not hmac.compare_digest(_sign(payload), signature):
+        return None
+    try:
+        user = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        return None
+    if user.get("exp", 0) < time.time():
+        return None
+    return user
+
+
+def issue_download_ticket(user: dict, ttl: int = DOWNLOAD_TICKET_TTL_SECONDS) -> str:
+    ticket = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    with rx.session() as session:
+        session.execute(
+            sa.delete(DownloadTicket).where(DownloadTicket.expires_at < now)
+        )
+        session.add(
+            DownloadTicket(
+                id=_sign(ticket),
+                user_id=user["id"],
+                role=user["role"],
+                branch_id=user["branch_id"],
+                expires_at=now + timedelta(seconds=ttl),
+            )
+        )
+        session.commit()
+    return ticket
+
+
+def redeem_download_ticket(ticket: str | None) -> dict | None:
+    if not ticket or not tokens_enabled():
+        return None
+    with rx.session() as session:
+        row = session.get(DownloadTicket, _sign(ticket))
+        if row is None or row.expires_at < datetime.utcnow():
+            return None
+        user = {"id": row.user_id, "role": row.role, "branch_id": row.branch_id}
+        redeemed = session.execute(
+            sa.delete(DownloadTicket).where(DownloadTicket.id == row.id)
+        ).rowcount
+        session.commit()
+    return user if redeemed else None
\ No newline at end of file
@@ -0,0 +1,200 @@
+import math
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+METHODS = ("flat", "french")
+PERIODS_PER_YEAR = {"weekly": 52, "monthly": 12}
+PERIOD_DAYS = {"weekly": 7, "monthly": 30}
+SCHEDULE_COLUMNS = ("payment", "interest", "principal", "balance")
+
+
+def periodic_rate(rate: float, frequency: str) -> float:
+    return rate / 100 / PERIODS_PER_YEAR.get(frequency, 12)
+
+
+def annual_rate(rate: float, basis: str, periods: int, frequency: str) -> float:
+    if basis != "term" or periods <= 0:
+        return rate
+    return rate * PERIODS_PER_YEAR.get(frequency, 12) / periods
+
+
+def _python_schedules(principals, rates, periods, methods, frequencies) -> dict:
+    width = max(periods, default=0)
+    matrices = {column: [] for column in SCHEDULE_COLUMNS}
+    for principal, rate, count, method, frequency in zip(
+        principals, rates, periods, methods, frequencies
+    ):
+        rows = {column: [0.0] * width for column in SCHEDULE_COLUMNS}
+        count = max(int(count), 0)
+        r = periodic_rate(rate, frequency)
+        if count and method == "french":
+            payment = (
+                principal * r / (1 - (1 + r) ** -count) if r > 0 else principal / count
+            )
+        elif count:
+            payment = principal * (1 + r * count) / count
+        balance = principal
+        for k in range(count):
+            interest = (
+                balance * r if method == "french" else payment - principal / count
+            )
+            rows["payment"][k] = payment
+            rows["interest"][k] = interest
+            rows["principal"][k] = payment - interest
+            balance = max(balance - (payment - interest), 0.0)
+            rows["balance"][k] = balance
+        for column in SCHEDULE_COLUMNS:
+            matrices[column].append(rows[column])
+    return matrices
+
+
+def _numpy_schedules(principals, rates, periods, methods, frequencies) -> dict:
+    principal = np.asarray(principals, dtype=float)
+    rate = np.asarray(rates, dtype=float)
+    count = np.maximum(np.asarray(periods, dtype=int), 0)
+    french = np.asarray(methods) == "french"
+    per_year = np.where(np.asarray(frequencies) == "weekly", 52, 12)
+    flat_r = rate / 100 / per_year
+    r = np.where(french, flat_r, 0.0)
+    safe_r = np.where(r > 0, r, 1.0)
+    safe_count = np.maximum(count, 1)
+    annuity = np.where(
+        r > 0,
+        principal * safe_r / (1 - (1 + safe_r) ** -safe_count),
+        principal / safe_count,
+    )
+    payment = np.where(
+        french, annuity, principal * (1 + flat_r * safe_count) / safe_count
+    )
+    k = np.arange(count.max(initial=0))
+    growth = (1 + r)[:, None] ** k
+    opening = np.where(
+        (r > 0)[:, None],
+        principal[:, None] * growth - annuity[:, None] * (growth - 1) / safe_r[:, None],
+        principal[:, None] - (principal / safe_count)[:, None] * k,
+    )
+    interest = np.where(
+        french[:, None],
+        opening * r[:, None],
+        (payment - principal / safe_count)[:, None],
+    )
+    principal_part = payment[:, None] - interest
+    balance = np.maximum(opening - principal_part, 0.0)
+    active = k[None, :] < count[:, None]
+    return {
+        "payment": np.where(active, payment[:, None], 0.0),
+        "interest": np.where(active, interest, 0.0),
+        "principal": np.where(active, principal_part, 0.0),
+        "balance": np.where(active, balance, 0.0),
+    }
+
+
+def schedule_matrices(principals, rates, periods, methods, frequencies) -> dict:
+    if np is not None:
+        return _numpy_schedules(principals, rates, periods, methods, frequencies)
+    return _python_schedules(principals, rates, periods, methods, frequencies)
+
+
+def installment_payment(
+    principal: float,
+    rate: float,
+    periods: int,
+    method: str = "flat",
+    frequency: str = "monthly",
+) -> float:
+    if periods <= 0:
+        return 0.0
+    return float(
+        schedule_matrices([principal], [rate], [periods], [method], [frequency])[
+            "payment"
+        ][0][0]
+    )
+
+
+def amortization_schedule(
+    principal: float,
+    rate: float,
+    periods: int,
+    method: str = "flat",
+    frequency: str = "monthly",
+) -> list[dict]:
+    if periods <= 0:
+        return []
+    matrices = schedule_matrices([principal], [rate], [periods], [method], [frequency])
+    return [
+        {
+            "number": k + 1,
+            **{
+                column: round(float(matrices[column][0][k]), 2)
+                for column in SCHEDULE_COLUMNS
+            },
+        }
+        for k in range(periods)
+    ]
+
+
+def payoff_amount(
+    principal: float,
+    rate: float,
+    periods: int,
+    method: str,
+    frequency: str,
+    paid_count: int,
+    partial_paid: float = 0.0,
+) -> float:
+    if paid_count >= periods:
+        return 0.0
+    balance = principal
+    if paid_count > 0:
+        matrices = schedule_matrices(
+            [principal], [rate], [periods], [method], [frequency]
+        )
+        balance = float(matrices["balance"][0][paid_count - 1])
+    return round(max(balance - partial_paid, 0.0), 2)
+
+
+def reschedule(
+    principal: float,
+    rate: float,
+    periods: int,
+    method: str,
+    frequency: str,
+    paid_count: int,
+    new_periods: int,
+    partial_paid: float = 0.0,
+) -> list[dict]:
+    balance = payoff_amount(
+        principal, rate, periods, method, frequency, paid_count, partial_paid
+    )
+    return amortization_schedule(balance, rate, new_periods, method, frequency)
+
+
+def project_cash_in(plans: list[tuple], now: datetime, weeks: int) -> list[float]:
+    if not plans:
+        return [0.0] * weeks
+    principals, rates, periods, methods, frequencies, created, paid = zip(*plans)
+    matrices = schedule_matrices(principals, rates, periods, methods, frequencies)
+    if np is None:
+        totals = [0.0] * weeks
+        for i, row in enumerate(matrices["payment"]):
+            step = PERIOD_DAYS.get(frequencies[i], 30)
+            for k in range(paid[i], periods[i]):
+                due = created[i] + timedelta(days=step * (k + 1))
+                week = max(math.floor((due - now).total_seconds() / 604800), 0)
+                if week < weeks:
+                    totals[week] += row[k]
+        return [round(total, 2) for total in totals]
+    payment = matrices["payment"]
+    k = np.arange(payment.shape[1])
+    step = np.where(np.asarray(frequencies) == "weekly", 7, 30)
+    start = np.array([(c - now).total_seconds() for c in created]) / 86400
+    due_in_days = start[:, None] + step[:, None] * (k + 1)
+    week = np.maximum(np.floor(due_in_days / 7), 0).astype(int)
+    pending = (k[None, :] >= np.asarray(paid)[:, None]) & (payment > 0) & (week < weeks)
+    totals = np.zeros(weeks)
+    np.add.at(totals, week[pending], payment[pending])
+    return [round(float(total), 2) for total in totals]
\ No newline at end of file
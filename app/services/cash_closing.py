@@ -0,0 +1,501 @@
+import reflex as rx
+import sqlalchemy as sa
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from sqlmodel import select
+from app.db_models import (
+    Branch,
+    CashClosing,
+    CashClosingDetail,
+    Customer,
+    Receivable,
+    ReceivablePayment,
+    Sale,
+    User,
+)
+from app.services.receivables import FINANCIAL_SOURCE, PAYMENT_RECEIPT
+
+DIRECT_SALE_METHODS = ("cash", "card")
+TOP_CUSTOMERS = 50
+CONSOLIDATION_WORKERS = 8
+RECONCILIATION_ROWS = 200
+SALE_RECEIPT = "sale"
+
+
+def _unclosed(source: str, receipt_id):
+    return ~sa.exists().where(
+        CashClosingDetail.source == source, CashClosingDetail.payment_id == receipt_id
+    )
+
+
+def receipts_subquery(
+    start: datetime,
+    end: datetime,
+    user_id: int | None = None,
+    branch_id: int | None = None,
+):
+    credit = (
+        select(
+            sa.literal(PAYMENT_RECEIPT).label("source"),
+            ReceivablePayment.id.label("receipt_id"),
+            ReceivablePayment.customer_id.label("customer_id"),
+            sa.case(
+                (Receivable.source == FINANCIAL_SOURCE, "Credit Payment"),
+                else_="Sale Installment",
+            ).label("payment_type"),
+            ReceivablePayment.amount.label("amount"),
+            ReceivablePayment.paid_at.label("paid_at"),
+        )
+        .join(Receivable, Receivable.id == ReceivablePayment.receivable_id)
+        .where(
+            ReceivablePayment.paid_at >= start,
+            ReceivablePayment.paid_at < end,
+            _unclosed(PAYMENT_RECEIPT, ReceivablePayment.id),
+        )
+    )
+    sales = select(
+        sa.literal(SALE_RECEIPT),
+        Sale.id,
+        Sale.customer_id,
+        sa.case(
+            (Sale.payment_method == "cash", "Direct Sale (Cash)"),
+            else_="Direct Sale (Card)",
+        ),
+        Sale.total_amount,
+        Sale.created_at,
+    ).where(
+        Sale.created_at >= start,
+        Sale.created_at < end,
+        Sale.payment_method.in_(DIRECT_SALE_METHODS),
+        _unclosed(SALE_RECEIPT, Sale.id),
+    )
+    if user_id is not None:
+        credit = credit.where(ReceivablePayment.user_id == user_id)
+        sales = sales.where(Sale.user_id == user_id)
+    if branch_id is not None:
+        credit = credit.where(ReceivablePayment.branch_id == branch_id)
+        sales = sales.where(Sale.branch_id == branch_id)
+    return sa.union_all(credit, sales).subquery("receipts")
+
+
+def totals_by_type(session, receipts) -> list[dict]:
+    rows = session.exec(
+        select(
+            receipts.c.payment_type,
+            sa.func.count(),
+            sa.func.sum(receipts.c.amount),
+        )
+        .group_by(receipts.c.payment_type)
+        .order_by(receipts.c.payment_type)
+    ).all()
+    return [
+        {"payment_type": payment_type, "count": count, "amount": round(amount, 2)}
+        for payment_type, count, amount in rows
+    ]
+
+
+def totals_by_customer(session, receipts, limit: int = TOP_CUSTOMERS) -> list[dict]:
+    amount = sa.func.sum(receipts.c.amount)
+    rows = session.exec(
+        select(receipts.c.customer_id, Customer.name, sa.func.count(), amount)
+        .join(Customer, Customer.id == receipts.c.customer_id)
+        .group_by(receipts.c.customer_id, Customer.name)
+        .order_by(amount.desc(), receipts.c.customer_id)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "customer_id": customer_id,
+            "customer_name": name,
+            "count": count,
+            "amount": round(total, 2),
+        }
+        for customer_id, name, count, total in rows
+    ]
+
+
+def receipt_rows(
+    session, receipts, offset: int, limit: int, payment_type: str = ""
+) -> list[dict]:
+    query = select(
+        Customer.name,
+        receipts.c.payment_type,
+        receipts.c.amount,
+        receipts.c.paid_at,
+    ).join(Customer, Customer.id == receipts.c.customer_id)
+    if payment_type:
+        query = query.where(receipts.c.payment_type == payment_type)
+    rows = session.exec(
+        query.order_by(
+            receipts.c.paid_at.desc(), receipts.c.source, receipts.c.receipt_id
+        )
+        .offset(offset)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "customer_name": name,
+            "payment_type": payment_type,
+            "amount": amount,
+            "paid_at": paid_at.isoformat(),
+        }
+        for name, payment_type, amount, paid_at in rows
+    ]
+
+
+def record_closing_details(session, closing_id: int, receipts) -> tuple[int, float]:
+    session.execute(
+        sa.insert(CashClosingDetail).from_select(
+            ["closing_id", "source", "payment_type", "payment_id", "amount"],
+            select(
+                sa.literal(closing_id),
+                receipts.c.source,
+                receipts.c.payment_type,
+                receipts.c.receipt_id,
+                receipts.c.amount,
+            ),
+        )
+    )
+    count, total = session.exec(
+        select(
+            sa.func.count(CashClosingDetail.id),
+            sa.func.coalesce(sa.func.sum(CashClosingDetail.amount), 0.0),
+        ).where(CashClosingDetail.closing_id == closing_id)
+    ).one()
+    return count, round(total, 2)
+
+
+def composed_amounts(
+    session, closing_ids: list[int], start: datetime, end: datetime
+) -> dict[int, float]:
+    if not closing_ids:
+        return {}
+    tree = (
+        select(CashClosing.id.label("root_id"), CashClosing.id.label("closing_id"))
+        .where(CashClosing.id.in_(closing_ids))
+        .cte("closing_tree", recursive=True)
+    )
+    tree = tree.union_all(
+        select(tree.c.root_id, CashClosing.id).where(
+            CashClosing.parent_id == tree.c.closing_id
+        )
+    )
+    paid_at = sa.func.coalesce(ReceivablePayment.paid_at, Sale.created_at)
+    rows = session.exec(
+        select(tree.c.root_id, sa.func.sum(CashClosingDetail.amount))
+        .select_from(tree)
+        .join(CashClosingDetail, CashClosingDetail.closing_id == tree.c.closing_id)
+        .outerjoin(
+            ReceivablePayment,
+            sa.and_(
+                CashClosingDetail.source == PAYMENT_RECEIPT,
+                ReceivablePayment.id == CashClosingDetail.payment_id,
+            ),
+        )
+        .outerjoin(
+            Sale,
+            sa.and_(
+                CashClosingDetail.source == SALE_RECEIPT,
+                Sale.id == CashClosingDetail.payment_id,
+            ),
+        )
+        .where(paid_at >= start, paid_at < end)
+        .group_by(tree.c.root_id)
+    ).all()
+    return {root_id: round(total, 2) for root_id, total in rows}
+
+
+def child_closings(
+    session,
+    start: datetime,
+    end_date: datetime,
+    closer_id: int,
+    user_id: int | None = None,
+    branch_id: int | None = None,
+) -> list[dict]:
+    query = (
+        select(
+            CashClosing.id,
+            User.username,
+            CashClosing.period_type,
+            CashClosing.start_date,
+            CashClosing.end_date,
+        )
+        .join(User, User.id == CashClosing.user_id)
+        .where(
+            CashClosing.parent_id.is_(None),
+            CashClosing.start_date <= end_date,
+            CashClosing.end_date >= start,
+            sa.or_(CashClosing.start_date >= start, CashClosing.end_date <= end_date),
+            sa.or_(
+                CashClosing.user_id != closer_id,
+                CashClosing.start_date != start,
+                CashClosing.end_date != end_date,
+            ),
+        )
+        .order_by(CashClosing.start_date, CashClosing.id)
+    )
+    if user_id is not None:
+        query = query.where(CashClosing.user_id == user_id)
+    if branch_id is not None:
+        query = query.where(CashClosing.branch_id == branch_id)
+    rows = session.exec(query).all()
+    amounts = composed_amounts(
+        session, [row[0] for row in rows], start, end_date + timedelta(days=1)
+    )
+    return [
+        {
+            "id": closing_id,
+            "user_name": username,
+            "period_type": period_type,
+            "start_date": child_start.isoformat(),
+            "end_date": child_end.isoformat(),
+            "total_collected": amounts.get(closing_id, 0.0),
+        }
+        for closing_id, username, period_type, child_start, child_end in rows
+        if closing_id in amounts or (child_start >= start and child_end <= end_date)
+    ]
+
+
+def adopt_child_closings(
+    session,
+    parent_id: int,
+    child_ids: list[int],
+    start: datetime,
+    end_date: datetime,
+) -> float | None:
+    if not child_ids:
+        return 0.0
+    open_children = session.exec(
+        select(sa.func.count(CashClosing.id)).where(
+            CashClosing.id.in_(child_ids), CashClosing.parent_id.is_(None)
+        )
+    ).one()
+    if open_children != len(child_ids):
+        return None
+    session.execute(
+        sa.update(CashClosing)
+        .where(
+            CashClosing.id.in_(child_ids),
+            CashClosing.start_date >= start,
+            CashClosing.end_date <= end_date,
+        )
+        .values(parent_id=parent_id)
+    )
+    return round(
+        sum(
+            composed_amounts(
+                session, child_ids, start, end_date + timedelta(days=1)
+            ).values()
+        ),
+        2,
+    )
+
+
+def closing_preview(
+    session,
+    start: datetime,
+    end: datetime,
+    closer_id: int,
+    user_id: int | None = None,
+    branch_id: int | None = None,
+) -> dict:
+    receipts = receipts_subquery(start, end, user_id=user_id, branch_id=branch_id)
+    return {
+        "composed_closings": child_closings(
+            session,
+            start,
+            end - timedelta(days=1),
+            closer_id,
+            user_id=user_id,
+            branch_id=branch_id,
+        ),
+        "type_totals": totals_by_type(session, receipts),
+        "customer_totals": totals_by_customer(session, receipts),
+    }
+
+
+def _branch_preview(
+    branch: tuple[int, str], start: datetime, end: datetime, closer_id: int
+) -> dict:
+    branch_id, branch_name = branch
+    with rx.session() as session:
+        preview = closing_preview(session, start, end, closer_id, branch_id=branch_id)
+    remainder = round(sum(t["amount"] for t in preview["type_totals"]), 2)
+    composed = round(sum(c["total_collected"] for c in preview["composed_closings"]), 2)
+    return {
+        **preview,
+        "branch_id": branch_id,
+        "branch_name": branch_name,
+        "receipt_count": sum(t["count"] for t in preview["type_totals"]),
+        "closings_count": len(preview["composed_closings"]),
+        "remainder_total": remainder,
+        "composed_total": composed,
+        "total": round(remainder + composed, 2),
+    }
+
+
+def consolidated_preview(
+    start: datetime,
+    end: datetime,
+    closer_id: int,
+    max_workers: int = CONSOLIDATION_WORKERS,
+) -> list[dict]:
+    with rx.session() as session:
+        branches = session.exec(
+            select(Branch.id, Branch.name).order_by(Branch.name)
+        ).all()
+    if not branches:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(branches))) as pool:
+        return list(
+            pool.map(
+                partial(_branch_preview, start=start, end=end, closer_id=closer_id),
+                branches,
+            )
+        )
+
+
+def merge_type_totals(previews: list[dict]) -> list[dict]:
+    merged: dict[str, dict] = {}
+    for preview in previews:
+        for total in preview["type_totals"]:
+            row = merged.setdefault(
+                total["payment_type"],
+                {"payment_type": total["payment_type"], "count": 0, "amount": 0.0},
+            )
+            row["count"] += total["count"]
+            row["amount"] = round(row["amount"] + total["amount"], 2)
+    return [merged[payment_type] for payment_type in sorted(merged)]
+
+
+def merge_customer_totals(
+    previews: list[dict], limit: int = TOP_CUSTOMERS
+) -> list[dict]:
+    merged: dict[int, dict] = {}
+    for preview in previews:
+        for total in preview["customer_totals"]:
+            row = merged.setdefault(
+                total["customer_id"], {**total, "count": 0, "amount": 0.0}
+            )
+            row["count"] += total["count"]
+            row["amount"] = round(row["amount"] + total["amount"], 2)
+    return sorted(merged.values(), key=lambda r: (-r["amount"], r["customer_id"]))[
+        :limit
+    ]
+
+
+def close_period(
+    session,
+    user_id: int,
+    branch_id: int,
+    period_type: str,
+    start: datetime,
+    end_date: datetime,
+    receipts,
+    child_ids: list[int],
+) -> tuple[int, float] | None:
+    closing = CashClosing(
+        user_id=user_id,
+        branch_id=branch_id,
+        period_type=period_type,
+        start_date=start,
+        end_date=end_date,
+        total_collected=0.0,
+        status="Closed",
+    )
+    session.add(closing)
+    session.flush()
+    count, remainder = record_closing_details(session, closing.id, receipts)
+    composed = adopt_child_closings(session, closing.id, child_ids, start, end_date)
+    if composed is None:
+        return None
+    closing.total_collected = round(remainder + composed, 2)
+    session.add(closing)
+    return count, closing.total_collected
+
+
+def reconciliation_rows(
+    session,
+    start: datetime,
+    end: datetime,
+    user_id: int | None = None,
+    branch_id: int | None = None,
+    limit: int = RECONCILIATION_ROWS,
+) -> dict:
+    due = select(
+        Receivable.user_id.label("user_id"),
+        Receivable.customer_id.label("customer_id"),
+        sa.literal(1).label("due_count"),
+        Receivable.amount_due.label("expected"),
+        Receivable.amount_paid.label("on_schedule"),
+        sa.literal(0.0).label("collected"),
+    ).where(Receivable.due_date >= start, Receivable.due_date < end)
+    paid = select(
+        ReceivablePayment.user_id,
+        ReceivablePayment.customer_id,
+        sa.literal(0),
+        sa.literal(0.0),
+        sa.literal(0.0),
+        ReceivablePayment.amount,
+    ).where(
+        ReceivablePayment.paid_at >= start,
+        ReceivablePayment.paid_at < end,
+    )
+    if user_id is not None:
+        due = due.where(Receivable.user_id == user_id)
+        paid = paid.where(ReceivablePayment.user_id == user_id)
+    if branch_id is not None:
+        due = due.where(Receivable.branch_id == branch_id)
+        paid = paid.where(ReceivablePayment.branch_id == branch_id)
+    rows = sa.union_all(due, paid).subquery("reconciliation")
+    expected = sa.func.sum(rows.c.expected)
+    on_schedule = sa.func.sum(rows.c.on_schedule)
+    collected = sa.func.sum(rows.c.collected)
+    shortfall = expected - on_schedule
+    query = (
+        select(
+            User.username,
+            Customer.name,
+            sa.func.sum(rows.c.due_count),
+            expected,
+            on_schedule,
+            collected,
+            sa.func.sum(expected).over(),
+            sa.func.sum(on_schedule).over(),
+            sa.func.sum(collected).over(),
+        )
+        .join(User, User.id == rows.c.user_id)
+        .join(Customer, Customer.id == rows.c.customer_id)
+        .group_by(rows.c.user_id, rows.c.customer_id, User.username, Customer.name)
+        .order_by(shortfall.desc(), User.username, Customer.name)
+        .limit(limit)
+    )
+    results = session.exec(query).all()
+    totals = results[0][6:] if results else (0.0, 0.0, 0.0)
+    return {
+        "rows": [
+            {
+                "user_name": username,
+                "customer_name": customer_name,
+                "due_count": due_count,
+                "expected": round(row_expected, 2),
+                "collected_on_schedule": round(row_on_schedule, 2),
+                "collected": round(row_collected, 2),
+                "shortfall": round(row_expected - row_on_schedule, 2),
+            }
+            for (
+                username,
+                customer_name,
+                due_count,
+                row_expected,
+                row_on_schedule,
+                row_collected,
+                *_,
+            ) in results
+        ],
+        "expected": round(totals[0], 2),
+        "collected_on_schedule": round(totals[1], 2),
+        "collected": round(totals[2], 2),
+    }
\ No newline at end of file
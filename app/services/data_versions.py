@@ -0,0 +1,85 @@
+import time
+import reflex as rx
+import sqlalchemy as sa
+from sqlmodel import select
+from app.db_models import DataVersion
+
+DATA_VERSION_CACHE_SECONDS = 10
+DATA_VERSION_SESSION_KEY = "data_versions"
+LEGACY_TRIGGER_OPERATIONS = ("insert", "update", "delete")
+_cached_versions: dict[str, tuple[int, float]] = {}
+_invalidations: dict[str, int] = {}
+
+
+def install_data_versions(conn, tables):
+    known = set(conn.execute(select(DataVersion.name)).scalars())
+    missing = sorted(set(tables) - known)
+    if missing:
+        conn.execute(
+            sa.insert(DataVersion), [{"name": name, "version": 0} for name in missing]
+        )
+    for table in sorted(tables):
+        if conn.dialect.name == "postgresql":
+            conn.execute(
+                sa.text(f"DROP TRIGGER IF EXISTS {table}_data_version ON {table}")
+            )
+            continue
+        for operation in LEGACY_TRIGGER_OPERATIONS:
+            conn.execute(
+                sa.text(f"DROP TRIGGER IF EXISTS {table}_{operation}_data_version")
+            )
+    if conn.dialect.name == "postgresql":
+        conn.execute(sa.text("DROP FUNCTION IF EXISTS bump_data_version()"))
+
+
+def _forget_committed(session):
+    _, tables = session.info.pop(DATA_VERSION_SESSION_KEY, (None, set()))
+    for table in tables:
+        _invalidations[table] = _invalidations.get(table, 0) + 1
+        _cached_versions.pop(table, None)
+
+
+def bump_data_versions(session, *models):
+    transaction, bumped = session.info.get(DATA_VERSION_SESSION_KEY, (None, set()))
+    if transaction is None or transaction is not session.get_transaction():
+        bumped = set()
+    tables = sorted({model.__tablename__ for model in models} - bumped)
+    if not tables:
+        return
+    session.execute(
+        sa.update(DataVersion)
+        .where(DataVersion.name.in_(tables))
+        .values(version=DataVersion.version + 1)
+    )
+    bumped.update(tables)
+    session.info[DATA_VERSION_SESSION_KEY] = (session.get_transaction(), bumped)
+    if not sa.event.contains(session, "after_commit", _forget_committed):
+        sa.event.listen(session, "after_commit", _forget_committed)
+
+
+def cached_data_version(tables) -> str | None:
+    now = time.monotonic()
+    versions = []
+    for table in tables:
+        cached = _cached_versions.get(table)
+        if cached is None or cached[1] < now:
+            return None
+        versions.append(str(cached[0]))
+    return ".".join(versions)
+
+
+def data_version(tables) -> str:
+    seen = {table: _invalidations.get(table, 0) for table in tables}
+    with rx.session() as session:
+        versions = dict(
+            session.exec(
+                select(DataVersion.name, DataVersion.version).where(
+                    DataVersion.name.in_(tables)
+                )
+            ).all()
+        )
+    expires_at = time.monotonic() + DATA_VERSION_CACHE_SECONDS
+    for table in tables:
+        if _invalidations.get(table, 0) == seen[table]:
+            _cached_versions[table] = (versions.get(table, 0), expires_at)
+    return ".".join(str(versions.get(table, 0)) for table in tables)
\ No newline at end of file
@@ -0,0 +1,304 @@
+import csv
+import io
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+import reflex as rx
+from sqlmodel import func, select
+from app.db_models import (
+    Branch,
+    CashClosing,
+    Customer,
+    FinancialPayment,
+    Product,
+    SaleListEntry,
+    Stock,
+    User,
+)
+from app.services.sales import MISSING_NAME
+from app.services.statements import STATEMENT_COLUMNS, statement_row, statement_query
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = ("csv", "xlsx")
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _sales_export(user: dict, params: dict):
+    query = select(
+        SaleListEntry.sale_id,
+        SaleListEntry.created_at,
+        SaleListEntry.customer_name,
+        SaleListEntry.user_username,
+        SaleListEntry.branch_name,
+        SaleListEntry.payment_method,
+        SaleListEntry.status,
+        SaleListEntry.total_amount,
+    ).order_by(SaleListEntry.created_at, SaleListEntry.sale_id)
+    if user["role"] != "admin":
+        query = query.where(SaleListEntry.user_id == user["id"])
+    return (
+        "id",
+        "date",
+        "customer",
+        "seller",
+        "branch",
+        "payment_method",
+        "status",
+        "total",
+    ), query
+
+
+def _stock_export(user: dict, params: dict):
+    query = (
+        select(
+            Product.name,
+            Product.category,
+            Branch.name,
+            Stock.quantity,
+            Stock.reorder_point,
+            Product.price,
+        )
+        .join(Product, Product.id == Stock.product_id)
+        .join(Branch, Branch.id == Stock.branch_id)
+        .order_by(Branch.name, Product.name)
+    )
+    if user["role"] != "admin":
+        query = query.where(Stock.branch_id == user["branch_id"])
+    return (
+        "product",
+        "category",
+        "branch",
+        "quantity",
+        "reorder_point",
+        "price",
+    ), query
+
+
+def _financial_plans_export(user: dict, params: dict):
+    query = (
+        select(
+            FinancialPayment.id,
+            FinancialPayment.created_at,
+            Customer.name,
+            User.username,
+            FinancialPayment.principal_amount,
+            FinancialPayment.interest_rate,
+            FinancialPayment.rate_basis,
+            FinancialPayment.total_amount,
+            FinancialPayment.installment_type,
+            FinancialPayment.num_installments,
+            FinancialPayment.paid_count,
+            FinancialPayment.amount_paid,
+            FinancialPayment.outstanding,
+            FinancialPayment.status,
+        )
+        .join(Customer, Customer.id == FinancialPayment.customer_id)
+        .join(User, User.id == FinancialPayment.user_id)
+        .order_by(FinancialPayment.created_at, FinancialPayment.id)
+    )
+    if user["role"] != "admin":
+        query = query.where(FinancialPayment.user_id == user["id"])
+    return (
+        "id",
+        "date",
+        "customer",
+        "collector",
+        "principal",
+        "interest_rate",
+        "rate_basis",
+        "total",
+        "frequency",
+        "installments",
+        "paid_installments",
+        "amount_paid",
+        "outstanding",
+        "status",
+    ), query
+
+
+def _closings_export(user: dict, params: dict):
+    query = (
+        select(
+            CashClosing.id,
+            CashClosing.created_at,
+            func.coalesce(User.username, MISSING_NAME),
+            func.coalesce(Branch.name, MISSING_NAME),
+            CashClosing.period_type,
+            CashClosing.start_date,
+            CashClosing.end_date,
+            CashClosing.total_collected,
+            CashClosing.status,
+            CashClosing.parent_id,
+        )
+        .outerjoin(User, User.id == CashClosing.user_id)
+        .outerjoin(Branch, Branch.id == CashClosing.branch_id)
+        .order_by(CashClosing.created_at, CashClosing.id)
+    )
+    if user["role"] != "admin":
+        query = query.where(CashClosing.user_id == user["id"])
+    return (
+        "id",
+        "date",
+        "collector",
+        "branch",
+        "period_type",
+        "start_date",
+        "end_date",
+        "total_collected",
+        "status",
+        "included_in",
+    ), query
+
+
+def _statement_export(user: dict, params: dict):
+    try:
+        customer_id = int(params.get("customer_id") or 0)
+    except ValueError:
+        raise ValueError("customer_id must be an integer.")
+    if user["role"] != "admin":
+        customer_id = (
+            select(Customer.id)
+            .where(Customer.id == customer_id, Customer.branch_id == user["branch_id"])
+            .scalar_subquery()
+        )
+    return STATEMENT_COLUMNS, statement_query(customer_id)
+
+
+EXPORT_DATASETS = {
+    "sales": _sales_export,
+    "stock": _stock_export,
+    "financial_plans": _financial_plans_export,
+    "closings": _closings_export,
+    "statement": _statement_export,
+}
+
+
+def _iter_rows(dataset: str, query):
+    with rx.session() as session:
+        result = session.execute(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        for rows in result.partitions():
+            if dataset == "statement":
+                yield [list(statement_row(row).values()) for row in rows]
+            else:
+                yield [
+                    [v.isoformat() if isinstance(v, datetime) else v for v in row]
+                    for row in rows
+                ]
+
+
+def stream_csv(dataset: str, columns: tuple, query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in _iter_rows(dataset, query):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _xlsx_column(index: int) -> str:
+    ref = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        ref = chr(65 + remainder) + ref
+    return ref
+
+
+def _xlsx_row(number: int, values, refs: list[str]) -> str:
+    cells = []
+    for ref, value in zip(refs, values):
+        if value is None:
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}{number}"><v>{value}</v></c>')
+        else:
+            cells.append(
+                f'<c r="{ref}{number}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+            )
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def stream_xlsx(dataset: str, columns: tuple, query):
+    sink = _ChunkSink()
+    refs = [_xlsx_column(i) for i in range(len(columns))]
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                (
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    "<sheetData>" + _xlsx_row(1, columns, refs)
+                ).encode()
+            )
+            number = 1
+            for rows in _iter_rows(dataset, query):
+                lines = []
+                for row in rows:
+                    number += 1
+                    lines.append(_xlsx_row(number, row, refs))
+                sheet.write("".join(lines).encode())
+                yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def export_stream(dataset: str, fmt: str, user: dict, params: dict):
+    columns, query = EXPORT_DATASETS[dataset](user, params)
+    if fmt == "xlsx":
+        return stream_xlsx(dataset, columns, query)
+    return stream_csv(dataset, columns, query)
\ No newline at end of file
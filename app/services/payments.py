@@ -0,0 +1,116 @@
+from datetime import datetime
+from sqlmodel import select
+from app.db_models import Receivable
+from app.services.receivables import (
+    AMOUNT_EPSILON,
+    FINANCIAL_SOURCE,
+    collect_receivables,
+    open_receivables,
+)
+
+
+def post_installment_payments(
+    session, postings: list[dict], user_id: int | None = None
+) -> list[dict]:
+    paid_at = datetime.utcnow()
+    results = [
+        {
+            "reference": posting["reference"],
+            "amount": round(posting["amount"], 2),
+            "applied": 0.0,
+            "installments_paid": 0,
+            "error": None,
+        }
+        for posting in postings
+    ]
+    scope = [Receivable.user_id == user_id] if user_id is not None else []
+    installment_ids = {p["installment_id"] for p in postings if p.get("installment_id")}
+    owners = {}
+    if installment_ids:
+        owners = dict(
+            session.exec(
+                select(Receivable.source_id, Receivable.customer_id).where(
+                    Receivable.source == FINANCIAL_SOURCE,
+                    Receivable.source_id.in_(installment_ids),
+                    *scope,
+                )
+            ).all()
+        )
+    customer_ids = set(owners.values()) | {
+        p["customer_id"] for p in postings if p.get("customer_id")
+    }
+    open_by_customer: dict[int, list[dict]] = {}
+    open_by_installment: dict[int, dict] = {}
+    for receivable in (
+        open_receivables(session, Receivable.customer_id.in_(customer_ids), *scope)
+        if customer_ids
+        else []
+    ):
+        receivable["amount"] = 0.0
+        open_by_customer.setdefault(receivable["customer_id"], []).append(receivable)
+        if receivable["source"] == FINANCIAL_SOURCE:
+            open_by_installment[receivable["source_id"]] = receivable
+    for posting, result in zip(postings, results):
+        if result["amount"] <= 0:
+            result["error"] = "Amount must be positive."
+            continue
+        installment_id = posting.get("installment_id")
+        if installment_id:
+            if installment_id not in owners:
+                result["error"] = "Installment not found."
+                continue
+            if installment_id not in open_by_installment:
+                result["error"] = "Installment is already paid."
+                continue
+            queue = [open_by_installment[installment_id]] + open_by_customer[
+                owners[installment_id]
+            ]
+        else:
+            queue = open_by_customer.get(posting.get("customer_id"), [])
+            if not queue:
+                result["error"] = "No open installments for customer."
+                continue
+        open_balance = round(
+            sum(
+                receivable["amount_due"]
+                - receivable["amount_paid"]
+                - receivable["amount"]
+                for receivable in {r["id"]: r for r in queue}.values()
+            ),
+            2,
+        )
+        if result["amount"] > open_balance + AMOUNT_EPSILON:
+            result["error"] = (
+                f"Amount exceeds open balance of {open_balance:.2f} "
+                f"by {result['amount'] - open_balance:.2f}."
+            )
+            continue
+        remaining = result["amount"]
+        for receivable in queue:
+            if remaining <= AMOUNT_EPSILON:
+                break
+            balance = round(
+                receivable["amount_due"]
+                - receivable["amount_paid"]
+                - receivable["amount"],
+                2,
+            )
+            if balance <= AMOUNT_EPSILON:
+                continue
+            applied = min(balance, remaining)
+            receivable["amount"] = round(receivable["amount"] + applied, 2)
+            remaining = round(remaining - applied, 2)
+            result["applied"] = round(result["applied"] + applied, 2)
+            if applied >= balance - AMOUNT_EPSILON:
+                result["installments_paid"] += 1
+    collect_receivables(
+        session,
+        [
+            receivable
+            for receivables in open_by_customer.values()
+            for receivable in receivables
+            if receivable["amount"] > 0
+        ],
+        paid_at,
+    )
+    return results
\ No newline at end of file
@@ -0,0 +1,168 @@
+import sqlalchemy as sa
+from sqlmodel import select
+from app.db_models import (
+    Branch,
+    BranchDict,
+    CashClosing,
+    CashClosingDict,
+    Customer,
+    CustomerDict,
+    Product,
+    ProductDict,
+    SaleDict,
+    SaleListEntry,
+    User,
+    UserDict,
+)
+from app.services.sales import MISSING_NAME
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def projection(shape: type, **columns):
+    if columns.keys() != shape.__annotations__.keys():
+        raise ValueError(f"Projection does not match {shape.__name__}.")
+    return select(*(column.label(key) for key, column in columns.items()))
+
+
+def project_rows(session, query) -> list[dict]:
+    result = session.execute(query)
+    keys = tuple(result.keys())
+    dates = [
+        index
+        for index, column in enumerate(query.selected_columns)
+        if isinstance(column.type, sa.DateTime)
+    ]
+    if not dates:
+        return [dict(zip(keys, row)) for row in result]
+    rows = []
+    for row in result:
+        values = list(row)
+        for index in dates:
+            values[index] = _iso(values[index])
+        rows.append(dict(zip(keys, values)))
+    return rows
+
+
+def branch_rows(session) -> list[BranchDict]:
+    return project_rows(
+        session,
+        projection(
+            BranchDict,
+            id=Branch.id,
+            name=Branch.name,
+            location=Branch.location,
+            created_at=Branch.created_at,
+        ).order_by(Branch.id),
+    )
+
+
+def user_rows(session) -> list[UserDict]:
+    rows = session.execute(
+        select(
+            User.id,
+            User.username,
+            User.role,
+            User.created_at,
+            Branch.id,
+            Branch.name,
+            Branch.location,
+            Branch.created_at,
+        )
+        .outerjoin(Branch, Branch.id == User.branch_id)
+        .order_by(User.id)
+    )
+    return [
+        {
+            "id": row[0],
+            "username": row[1],
+            "role": row[2],
+            "branch": {
+                "id": row[4],
+                "name": row[5],
+                "location": row[6],
+                "created_at": _iso(row[7]),
+            }
+            if row[4] is not None
+            else None,
+            "created_at": _iso(row[3]),
+        }
+        for row in rows
+    ]
+
+
+def customer_rows(session, branch_id: int | None = None) -> list[CustomerDict]:
+    query = projection(
+        CustomerDict,
+        id=Customer.id,
+        name=Customer.name,
+        phone=Customer.phone,
+        email=Customer.email,
+        address=Customer.address,
+        branch_id=Customer.branch_id,
+        credit_balance=Customer.credit_balance,
+        credit_limit=Customer.credit_limit,
+        created_at=Customer.created_at,
+        branch_name=sa.func.coalesce(Branch.name, MISSING_NAME),
+    ).outerjoin(Branch, Branch.id == Customer.branch_id)
+    if branch_id is not None:
+        query = query.where(Customer.branch_id == branch_id)
+    return project_rows(session, query.order_by(Customer.id))
+
+
+def product_rows(session) -> list[ProductDict]:
+    return project_rows(
+        session,
+        projection(
+            ProductDict,
+            id=Product.id,
+            name=Product.name,
+            description=Product.description,
+            category=Product.category,
+            price=Product.price,
+            reorder_point=Product.reorder_point,
+            created_at=Product.created_at,
+        ).order_by(Product.id),
+    )
+
+
+def sale_rows(session, user_id: int | None = None) -> list[SaleDict]:
+    query = projection(
+        SaleDict,
+        id=SaleListEntry.sale_id,
+        customer_name=SaleListEntry.customer_name,
+        user_username=SaleListEntry.user_username,
+        branch_name=SaleListEntry.branch_name,
+        total_amount=SaleListEntry.total_amount,
+        payment_method=SaleListEntry.payment_method,
+        status=SaleListEntry.status,
+        created_at=SaleListEntry.created_at,
+    )
+    if user_id is not None:
+        query = query.where(SaleListEntry.user_id == user_id)
+    return project_rows(session, query.order_by(SaleListEntry.created_at.desc()))
+
+
+def closing_rows(session, user_id: int | None = None) -> list[CashClosingDict]:
+    query = (
+        projection(
+            CashClosingDict,
+            id=CashClosing.id,
+            user_name=sa.func.coalesce(User.username, MISSING_NAME),
+            branch_name=sa.func.coalesce(Branch.name, MISSING_NAME),
+            period_type=CashClosing.period_type,
+            start_date=CashClosing.start_date,
+            end_date=CashClosing.end_date,
+            total_collected=CashClosing.total_collected,
+            status=CashClosing.status,
+            parent_id=CashClosing.parent_id,
+            created_at=CashClosing.created_at,
+        )
+        .outerjoin(User, User.id == CashClosing.user_id)
+        .outerjoin(Branch, Branch.id == CashClosing.branch_id)
+    )
+    if user_id is not None:
+        query = query.where(CashClosing.user_id == user_id)
+    return project_rows(session, query.order_by(CashClosing.created_at.desc()))
\ No newline at end of file
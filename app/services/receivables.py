@@ -0,0 +1,487 @@
+import reflex as rx
+import sqlalchemy as sa
+from datetime import datetime
+from sqlmodel import select
+from app.db_models import (
+    CashClosingDetail,
+    Customer,
+    FinancialInstallment,
+    FinancialPayment,
+    Installment,
+    JobCheckpoint,
+    Receivable,
+    ReceivablePayment,
+    Sale,
+    SaleListEntry,
+)
+from app.services.data_versions import bump_data_versions
+
+AMOUNT_EPSILON = 0.005
+OPEN_STATUSES = ("Pending", "Partial", "Overdue")
+NOT_DUE_STATUSES = ("Pending", "Partial")
+OVERDUE_SWEEP_BATCH_SIZE = 500
+OVERDUE_SWEEP_INTERVAL_SECONDS = 15 * 60
+SALE_SOURCE = "sale"
+FINANCIAL_SOURCE = "financial"
+PAYMENT_RECEIPT = "payment"
+LEGACY_RECEIPT = "receivable"
+RECEIPT_COLUMNS = [
+    "receivable_id",
+    "customer_id",
+    "user_id",
+    "branch_id",
+    "amount",
+    "paid_at",
+]
+CREDIT_BALANCE_JOB = "credit_balances"
+PLAN_TOTALS_JOB = "plan_totals"
+STALE_COLLECTION_ERROR = "Installments changed while posting. Please try again."
+
+
+def record_receivables(
+    session,
+    source: str,
+    installments: list,
+    customer_id: int,
+    user_id: int,
+    branch_id: int,
+    sale_id: int | None = None,
+    financial_payment_id: int | None = None,
+):
+    if not installments:
+        return
+    session.flush()
+    bump_data_versions(session, Receivable)
+    session.execute(
+        sa.insert(Receivable),
+        [
+            {
+                "source": source,
+                "source_id": installment.id,
+                "sale_id": sale_id,
+                "financial_payment_id": financial_payment_id,
+                "customer_id": customer_id,
+                "user_id": user_id,
+                "branch_id": branch_id,
+                "installment_number": getattr(
+                    installment, "installment_number", number
+                ),
+                "due_date": installment.due_date,
+                "amount_due": installment.amount_due,
+                "amount_paid": getattr(installment, "amount_paid", 0.0),
+                "status": installment.status,
+                "paid_at": installment.paid_at,
+            }
+            for number, installment in enumerate(installments, 1)
+        ],
+    )
+
+
+def plan_totals_update():
+    return (
+        sa.update(FinancialPayment)
+        .where(FinancialPayment.id == sa.bindparam("plan_id"))
+        .values(
+            paid_count=FinancialPayment.paid_count + sa.bindparam("paid_delta"),
+            amount_paid=FinancialPayment.amount_paid + sa.bindparam("amount_delta"),
+            outstanding=FinancialPayment.outstanding - sa.bindparam("amount_delta"),
+            status=sa.case(
+                (
+                    FinancialPayment.paid_count + sa.bindparam("paid_delta")
+                    >= FinancialPayment.num_installments,
+                    "Completed",
+                ),
+                else_=FinancialPayment.status,
+            ),
+        )
+    )
+
+
+def open_receivables(session, *conditions) -> list[dict]:
+    result = session.execute(
+        select(
+            Receivable.id,
+            Receivable.source,
+            Receivable.source_id,
+            Receivable.sale_id,
+            Receivable.financial_payment_id,
+            Receivable.customer_id,
+            Receivable.user_id,
+            Receivable.amount_due,
+            Receivable.amount_paid,
+            Receivable.status,
+            Receivable.paid_at,
+        )
+        .where(Receivable.status.in_(OPEN_STATUSES), *conditions)
+        .order_by(
+            Receivable.customer_id,
+            Receivable.due_date,
+            Receivable.installment_number,
+            Receivable.id,
+        )
+    )
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def record_receipts(session, receipts: list[dict]):
+    if not receipts:
+        return
+    session.connection().execute(
+        sa.insert(ReceivablePayment).from_select(
+            RECEIPT_COLUMNS,
+            select(
+                Receivable.id,
+                Receivable.customer_id,
+                Receivable.user_id,
+                Receivable.branch_id,
+                sa.bindparam("r_amount", type_=sa.Float),
+                sa.bindparam("r_paid_at", type_=sa.DateTime),
+            ).where(Receivable.id == sa.bindparam("r_id")),
+        ),
+        [
+            {
+                "r_id": receipt["id"],
+                "r_amount": receipt["amount"],
+                "r_paid_at": receipt["paid_at"],
+            }
+            for receipt in receipts
+        ],
+    )
+
+
+def settle_sales(session, sale_ids: set[int]):
+    if not sale_ids:
+        return
+    settled = list(
+        session.exec(
+            select(Sale.id).where(
+                Sale.id.in_(sale_ids),
+                ~sa.exists().where(
+                    Receivable.sale_id == Sale.id,
+                    Receivable.status.in_(OPEN_STATUSES),
+                ),
+            )
+        ).all()
+    )
+    if settled:
+        bump_data_versions(session, Sale)
+        session.execute(
+            sa.update(Sale).where(Sale.id.in_(settled)).values(status="Paid")
+        )
+        session.execute(
+            sa.update(SaleListEntry)
+            .where(SaleListEntry.sale_id.in_(settled))
+            .values(status="Paid")
+        )
+
+
+def collect_receivables(session, collections: list[dict], paid_at: datetime):
+    receipts = []
+    plan_deltas: dict[int, dict] = {}
+    sale_ids = set()
+    customer_payments: dict[int, float] = {}
+    for collection in collections:
+        amount = round(collection["amount"], 2)
+        if amount <= 0:
+            continue
+        amount_paid = round(collection["amount_paid"] + amount, 2)
+        is_paid = amount_paid >= collection["amount_due"] - AMOUNT_EPSILON
+        status = (
+            "Paid"
+            if is_paid
+            else ("Overdue" if collection["status"] == "Overdue" else "Partial")
+        )
+        first_paid_at = collection["paid_at"] or paid_at
+        updated = session.execute(
+            sa.update(Receivable)
+            .where(
+                Receivable.id == collection["id"],
+                Receivable.amount_paid == collection["amount_paid"],
+                Receivable.status.in_(OPEN_STATUSES),
+            )
+            .values(amount_paid=amount_paid, status=status, paid_at=first_paid_at)
+        ).rowcount
+        if not updated:
+            raise ValueError(STALE_COLLECTION_ERROR)
+        bump_data_versions(session, Receivable)
+        if collection["source"] == SALE_SOURCE:
+            session.execute(
+                sa.update(Installment)
+                .where(Installment.id == collection["source_id"])
+                .values(status=status, paid_at=first_paid_at)
+            )
+            if is_paid:
+                sale_ids.add(collection["sale_id"])
+        else:
+            session.execute(
+                sa.update(FinancialInstallment)
+                .where(FinancialInstallment.id == collection["source_id"])
+                .values(amount_paid=amount_paid, status=status, paid_at=first_paid_at)
+            )
+            delta = plan_deltas.setdefault(
+                collection["financial_payment_id"],
+                {
+                    "plan_id": collection["financial_payment_id"],
+                    "paid_delta": 0,
+                    "amount_delta": 0.0,
+                },
+            )
+            delta["paid_delta"] += 1 if is_paid else 0
+            delta["amount_delta"] = round(delta["amount_delta"] + amount, 2)
+        receipts.append({"id": collection["id"], "amount": amount, "paid_at": paid_at})
+        customer_payments[collection["customer_id"]] = round(
+            customer_payments.get(collection["customer_id"], 0.0) + amount, 2
+        )
+    record_receipts(session, receipts)
+    if plan_deltas:
+        session.connection().execute(plan_totals_update(), list(plan_deltas.values()))
+    settle_sales(session, sale_ids)
+    release_credit(session, customer_payments)
+
+
+def _missing(source: str, source_id):
+    return ~sa.exists().where(
+        Receivable.source == source, Receivable.source_id == source_id
+    )
+
+
+def backfill_receivables(session) -> int:
+    columns = [
+        "source",
+        "source_id",
+        "sale_id",
+        "financial_payment_id",
+        "customer_id",
+        "user_id",
+        "branch_id",
+        "installment_number",
+        "due_date",
+        "amount_due",
+        "amount_paid",
+        "status",
+        "paid_at",
+    ]
+    sale_rows = (
+        select(
+            sa.literal(SALE_SOURCE),
+            Installment.id,
+            Installment.sale_id,
+            sa.null(),
+            Sale.customer_id,
+            Sale.user_id,
+            Sale.branch_id,
+            sa.func.row_number().over(
+                partition_by=Installment.sale_id,
+                order_by=(Installment.due_date, Installment.id),
+            ),
+            Installment.due_date,
+            Installment.amount_due,
+            sa.case((Installment.status == "Paid", Installment.amount_due), else_=0.0),
+            Installment.status,
+            Installment.paid_at,
+        )
+        .join(Sale, Sale.id == Installment.sale_id)
+        .where(_missing(SALE_SOURCE, Installment.id))
+    )
+    financial_rows = (
+        select(
+            sa.literal(FINANCIAL_SOURCE),
+            FinancialInstallment.id,
+            sa.null(),
+            FinancialInstallment.payment_id,
+            FinancialPayment.customer_id,
+            FinancialPayment.user_id,
+            FinancialPayment.branch_id,
+            FinancialInstallment.installment_number,
+            FinancialInstallment.due_date,
+            FinancialInstallment.amount_due,
+            FinancialInstallment.amount_paid,
+            FinancialInstallment.status,
+            FinancialInstallment.paid_at,
+        )
+        .join(FinancialPayment, FinancialPayment.id == FinancialInstallment.payment_id)
+        .where(_missing(FINANCIAL_SOURCE, FinancialInstallment.id))
+    )
+    inserted = 0
+    for rows in (sale_rows, financial_rows):
+        inserted += session.execute(
+            sa.insert(Receivable).from_select(columns, rows)
+        ).rowcount
+    return inserted
+
+
+def backfill_receipts(session) -> int:
+    inserted = session.execute(
+        sa.insert(ReceivablePayment).from_select(
+            RECEIPT_COLUMNS,
+            select(
+                Receivable.id,
+                Receivable.customer_id,
+                Receivable.user_id,
+                Receivable.branch_id,
+                Receivable.amount_paid,
+                Receivable.paid_at,
+            ).where(
+                Receivable.amount_paid > 0,
+                Receivable.paid_at.is_not(None),
+                ~sa.exists().where(ReceivablePayment.receivable_id == Receivable.id),
+            ),
+        )
+    ).rowcount
+    receipt_id = (
+        select(sa.func.min(ReceivablePayment.id))
+        .where(ReceivablePayment.receivable_id == CashClosingDetail.payment_id)
+        .scalar_subquery()
+    )
+    session.execute(
+        sa.update(CashClosingDetail)
+        .where(
+            CashClosingDetail.source == LEGACY_RECEIPT,
+            sa.exists().where(
+                ReceivablePayment.receivable_id == CashClosingDetail.payment_id
+            ),
+        )
+        .values(source=PAYMENT_RECEIPT, payment_id=receipt_id)
+    )
+    return inserted
+
+
+def reserve_credit(session, customer_id: int, amount: float) -> bool:
+    bump_data_versions(session, Customer)
+    return bool(
+        session.execute(
+            sa.update(Customer)
+            .where(
+                Customer.id == customer_id,
+                sa.or_(
+                    Customer.credit_limit.is_(None),
+                    Customer.credit_balance + amount
+                    <= Customer.credit_limit + AMOUNT_EPSILON,
+                ),
+            )
+            .values(credit_balance=Customer.credit_balance + amount)
+        ).rowcount
+    )
+
+
+def release_credit(session, payments: dict[int, float]):
+    if not payments:
+        return
+    bump_data_versions(session, Customer)
+    session.connection().execute(
+        sa.update(Customer)
+        .where(Customer.id == sa.bindparam("c_id"))
+        .values(credit_balance=Customer.credit_balance - sa.bindparam("c_paid")),
+        [
+            {"c_id": customer_id, "c_paid": amount}
+            for customer_id, amount in payments.items()
+        ],
+    )
+
+
+def recompute_credit_balances(session):
+    outstanding = (
+        select(
+            sa.func.coalesce(
+                sa.func.sum(Receivable.amount_due - Receivable.amount_paid), 0.0
+            )
+        )
+        .where(
+            Receivable.customer_id == Customer.id,
+            Receivable.status.in_(OPEN_STATUSES),
+        )
+        .scalar_subquery()
+    )
+    session.execute(sa.update(Customer).values(credit_balance=outstanding))
+
+
+def recompute_plan_totals(session):
+    totals = (
+        select(
+            FinancialInstallment.payment_id,
+            sa.func.sum(
+                sa.case((FinancialInstallment.status == "Paid", 1), else_=0)
+            ).label("paid_count"),
+            sa.func.sum(FinancialInstallment.amount_paid).label("amount_paid"),
+            sa.func.sum(
+                FinancialInstallment.amount_due - FinancialInstallment.amount_paid
+            ).label("outstanding"),
+        )
+        .group_by(FinancialInstallment.payment_id)
+        .subquery()
+    )
+    session.execute(
+        sa.update(FinancialPayment)
+        .where(FinancialPayment.id == totals.c.payment_id)
+        .values(
+            paid_count=totals.c.paid_count,
+            amount_paid=totals.c.amount_paid,
+            outstanding=totals.c.outstanding,
+        )
+    )
+
+
+def sync_receivables_ledger() -> int:
+    with rx.session() as session:
+        inserted = backfill_receivables(session)
+        backfill_receipts(session)
+        if inserted:
+            bump_data_versions(session, Receivable)
+        if inserted or session.get(JobCheckpoint, CREDIT_BALANCE_JOB) is None:
+            recompute_credit_balances(session)
+            bump_data_versions(session, Customer)
+            session.merge(
+                JobCheckpoint(name=CREDIT_BALANCE_JOB, last_run_at=datetime.utcnow())
+            )
+        if session.get(JobCheckpoint, PLAN_TOTALS_JOB) is None:
+            recompute_plan_totals(session)
+            session.merge(
+                JobCheckpoint(name=PLAN_TOTALS_JOB, last_run_at=datetime.utcnow())
+            )
+        session.commit()
+    return inserted
+
+
+def _mark_overdue(session, model, ids: list[int]):
+    if ids:
+        session.execute(
+            sa.update(model)
+            .where(model.id.in_(ids), model.status.in_(NOT_DUE_STATUSES))
+            .values(status="Overdue")
+        )
+
+
+def sweep_overdue(session, now: datetime | None = None) -> int:
+    now = now or datetime.utcnow()
+    due = (
+        select(Receivable.id, Receivable.source, Receivable.source_id)
+        .where(Receivable.status.in_(NOT_DUE_STATUSES), Receivable.due_date < now)
+        .order_by(Receivable.id)
+        .limit(OVERDUE_SWEEP_BATCH_SIZE)
+    )
+    swept = 0
+    last_id = 0
+    while True:
+        rows = session.exec(due.where(Receivable.id > last_id)).all()
+        if not rows:
+            break
+        _mark_overdue(session, Receivable, [row[0] for row in rows])
+        bump_data_versions(session, Receivable)
+        _mark_overdue(
+            session, Installment, [row[2] for row in rows if row[1] == SALE_SOURCE]
+        )
+        _mark_overdue(
+            session,
+            FinancialInstallment,
+            [row[2] for row in rows if row[1] == FINANCIAL_SOURCE],
+        )
+        session.commit()
+        swept += len(rows)
+        last_id = rows[-1][0]
+    return swept
+
+
+def sweep_overdue_receivables() -> int:
+    with rx.session() as session:
+        return sweep_overdue(session)
\ No newline at end of file
@@ -0,0 +1,100 @@
+import reflex as rx
+from datetime import datetime, timedelta
+import numpy as np
+import sqlalchemy as sa
+from sqlmodel import select
+from app.db_models import Sale, SaleDetail, Stock, ReorderSuggestion
+
+VELOCITY_WINDOW_DAYS = 28
+LEAD_TIME_DAYS = 7
+TARGET_COVER_DAYS = 21
+REPLENISHMENT_INTERVAL_SECONDS = 6 * 60 * 60
+
+
+def compute_reorder_suggestions(session, now: datetime | None = None) -> list[dict]:
+    now = now or datetime.utcnow()
+    since = now - timedelta(days=VELOCITY_WINDOW_DAYS)
+    connection = session.connection()
+    stock_rows = connection.execute(
+        select(Stock.product_id, Stock.branch_id, Stock.quantity, Stock.reorder_point)
+    ).all()
+    sales_rows = connection.execute(
+        select(SaleDetail.product_id, Sale.branch_id, sa.func.sum(SaleDetail.quantity))
+        .join(Sale, Sale.id == SaleDetail.sale_id)
+        .where(Sale.created_at >= since, Sale.created_at < now)
+        .group_by(SaleDetail.product_id, Sale.branch_id)
+    ).all()
+    if not stock_rows and not sales_rows:
+        return []
+    stock = np.array([tuple(row) for row in stock_rows], dtype=np.int64).reshape(-1, 4)
+    sold = np.array([tuple(row) for row in sales_rows], dtype=np.int64).reshape(-1, 3)
+    product_ids = np.unique(np.concatenate([stock[:, 0], sold[:, 0]]))
+    branch_ids = np.unique(np.concatenate([stock[:, 1], sold[:, 1]]))
+    shape = (len(product_ids), len(branch_ids))
+    stock_cells = (
+        np.searchsorted(product_ids, stock[:, 0]),
+        np.searchsorted(branch_ids, stock[:, 1]),
+    )
+    sold_cells = (
+        np.searchsorted(product_ids, sold[:, 0]),
+        np.searchsorted(branch_ids, sold[:, 1]),
+    )
+    on_hand = np.zeros(shape)
+    on_hand[stock_cells] = stock[:, 2]
+    reorder_point = np.zeros(shape)
+    reorder_point[stock_cells] = stock[:, 3]
+    carried = np.zeros(shape, dtype=bool)
+    carried[stock_cells] = True
+    units_sold = np.zeros(shape)
+    np.add.at(units_sold, sold_cells, sold[:, 2])
+    velocity = units_sold / VELOCITY_WINDOW_DAYS
+    days_of_cover = np.divide(
+        on_hand, velocity, out=np.full(shape, np.inf), where=velocity > 0
+    )
+    target = np.maximum(
+        np.ceil(velocity * (LEAD_TIME_DAYS + TARGET_COVER_DAYS)), reorder_point
+    )
+    carried |= velocity > 0
+    deficit = np.where(carried, np.maximum(target - on_hand, 0), 0)
+    surplus = np.where(carried, np.maximum(on_hand - target, 0), 0)
+    rows = np.arange(shape[0])
+    donor = surplus.argmax(axis=1)
+    total_deficit = deficit.sum(axis=1)
+    share = np.divide(
+        np.minimum(surplus[rows, donor], total_deficit),
+        total_deficit,
+        out=np.zeros(shape[0]),
+        where=total_deficit > 0,
+    )
+    transfer = np.floor(deficit * share[:, None])
+    reorder = np.ceil(deficit - transfer)
+    suggestions = []
+    for p, b in zip(*np.nonzero((reorder > 0) | (transfer > 0))):
+        suggestions.append(
+            {
+                "product_id": int(product_ids[p]),
+                "branch_id": int(branch_ids[b]),
+                "on_hand": int(on_hand[p, b]),
+                "daily_velocity": round(float(velocity[p, b]), 3),
+                "days_of_cover": round(float(days_of_cover[p, b]), 1)
+                if np.isfinite(days_of_cover[p, b])
+                else None,
+                "reorder_quantity": int(reorder[p, b]),
+                "transfer_quantity": int(transfer[p, b]),
+                "transfer_from_branch_id": int(branch_ids[donor[p]])
+                if transfer[p, b] > 0
+                else None,
+                "computed_at": now,
+            }
+        )
+    return suggestions
+
+
+def refresh_reorder_suggestions() -> int:
+    with rx.session() as session:
+        suggestions = compute_reorder_suggestions(session)
+        session.execute(sa.delete(ReorderSuggestion))
+        if suggestions:
+            session.execute(sa.insert(ReorderSuggestion), suggestions)
+        session.commit()
+    return len(suggestions)
\ No newline at end of file
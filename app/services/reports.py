@@ -0,0 +1,231 @@
+import sqlalchemy as sa
+from datetime import datetime, timedelta
+from sqlmodel import select, func
+from app.db_models import Branch, Customer, Product, Receivable, Sale, Stock, User
+from app.services.receivables import OPEN_STATUSES
+from app.services.sales import CANCELLED_STATUS
+
+AGING_BUCKETS = {
+    "current": "Current",
+    "days_1_30": "1-30",
+    "days_31_60": "31-60",
+    "days_61_90": "61-90",
+    "days_over_90": "90+",
+}
+AGING_REFRESH_SECONDS = 60 * 60
+SALES_SUMMARY_GROUPS = ("day", "month", "branch", "seller", "payment_method")
+
+
+def aging_bounds(now: datetime) -> dict[str, tuple[datetime | None, datetime | None]]:
+    return {
+        "current": (now, None),
+        "days_1_30": (now - timedelta(days=30), now),
+        "days_31_60": (now - timedelta(days=60), now - timedelta(days=30)),
+        "days_61_90": (now - timedelta(days=90), now - timedelta(days=60)),
+        "days_over_90": (None, now - timedelta(days=90)),
+    }
+
+
+def due_between(lower: datetime | None, upper: datetime | None) -> list:
+    conditions = []
+    if lower is not None:
+        conditions.append(Receivable.due_date >= lower)
+    if upper is not None:
+        conditions.append(Receivable.due_date < upper)
+    return conditions
+
+
+def aging_rows(session, now: datetime, user_id: int | None = None) -> list[dict]:
+    outstanding = Receivable.amount_due - Receivable.amount_paid
+    buckets = [
+        sa.func.sum(
+            sa.case((sa.and_(*due_between(lower, upper)), outstanding), else_=0.0)
+        )
+        for lower, upper in aging_bounds(now).values()
+    ]
+    query = (
+        select(
+            Receivable.branch_id,
+            Branch.name,
+            Receivable.user_id,
+            User.username,
+            *buckets,
+            sa.func.sum(outstanding),
+        )
+        .join(Branch, Branch.id == Receivable.branch_id)
+        .join(User, User.id == Receivable.user_id)
+        .where(Receivable.status.in_(OPEN_STATUSES))
+        .group_by(Receivable.branch_id, Branch.name, Receivable.user_id, User.username)
+        .order_by(Branch.name, User.username)
+    )
+    if user_id is not None:
+        query = query.where(Receivable.user_id == user_id)
+    return [
+        {
+            "branch_id": row[0],
+            "branch_name": row[1],
+            "user_id": row[2],
+            "collector_name": row[3],
+            **{key: round(value, 2) for key, value in zip(AGING_BUCKETS, row[4:9])},
+            "total": round(row[9], 2),
+        }
+        for row in session.exec(query).all()
+    ]
+
+
+def kpis(session, user: dict) -> dict:
+    sales = select(
+        func.coalesce(func.sum(Sale.total_amount), 0.0), func.count(Sale.id)
+    ).where(Sale.status != CANCELLED_STATUS)
+    customers = select(func.count(Customer.id))
+    pending = select(func.count(Receivable.id)).where(
+        Receivable.status.in_(OPEN_STATUSES)
+    )
+    if user["role"] != "admin":
+        sales = sales.where(Sale.user_id == user["id"])
+        customers = customers.where(Customer.branch_id == user["branch_id"])
+        pending = pending.where(Receivable.user_id == user["id"])
+    total_revenue, total_sales = session.exec(sales).one()
+    return {
+        "total_revenue": round(total_revenue, 2),
+        "total_sales": total_sales,
+        "total_customers": session.exec(customers).one(),
+        "pending_installments": session.exec(pending).one(),
+    }
+
+
+def sales_summary(
+    session,
+    user: dict,
+    group_by: str = "day",
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[dict]:
+    key = {
+        "day": func.substr(sa.cast(Sale.created_at, sa.String), 1, 10),
+        "month": func.substr(sa.cast(Sale.created_at, sa.String), 1, 7),
+        "branch": Branch.name,
+        "seller": User.username,
+        "payment_method": Sale.payment_method,
+    }[group_by]
+    query = (
+        select(
+            key,
+            func.count(Sale.id),
+            func.sum(Sale.total_amount),
+            func.sum(sa.case((Sale.status == "Pending", Sale.total_amount), else_=0.0)),
+        )
+        .join(Branch, Branch.id == Sale.branch_id)
+        .join(User, User.id == Sale.user_id)
+        .where(Sale.status != CANCELLED_STATUS)
+        .group_by(key)
+        .order_by(key)
+    )
+    if user["role"] != "admin":
+        query = query.where(Sale.user_id == user["id"])
+    if start is not None:
+        query = query.where(Sale.created_at >= start)
+    if end is not None:
+        query = query.where(Sale.created_at < end)
+    return [
+        {
+            "key": row[0],
+            "sales": row[1],
+            "total": round(row[2], 2),
+            "on_credit": round(row[3], 2),
+        }
+        for row in session.exec(query).all()
+    ]
+
+
+def stock_levels(session, user: dict) -> list[dict]:
+    query = (
+        select(
+            Stock.product_id,
+            Product.name,
+            Product.category,
+            Stock.branch_id,
+            Branch.name,
+            Stock.quantity,
+            Stock.reorder_point,
+        )
+        .join(Product, Product.id == Stock.product_id)
+        .join(Branch, Branch.id == Stock.branch_id)
+        .order_by(Branch.name, Product.name)
+    )
+    if user["role"] != "admin":
+        query = query.where(Stock.branch_id == user["branch_id"])
+    return [
+        {
+            "product_id": row[0],
+            "product_name": row[1],
+            "category": row[2],
+            "branch_id": row[3],
+            "branch_name": row[4],
+            "quantity": row[5],
+            "reorder_point": row[6],
+            "is_low": row[5] < row[6],
+        }
+        for row in session.exec(query).all()
+    ]
+
+
+def _date_param(params: dict, name: str, days: int = 0) -> datetime | None:
+    value = params.get(name)
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d") + timedelta(days=days)
+
+
+def _kpis_report(session, user: dict, params: dict, now: datetime):
+    return kpis(session, user)
+
+
+def _sales_report(session, user: dict, params: dict, now: datetime):
+    group_by = params.get("group_by", "day")
+    if group_by not in SALES_SUMMARY_GROUPS:
+        raise ValueError(f"group_by must be one of {', '.join(SALES_SUMMARY_GROUPS)}.")
+    return sales_summary(
+        session,
+        user,
+        group_by=group_by,
+        start=_date_param(params, "start"),
+        end=_date_param(params, "end", days=1),
+    )
+
+
+def _stock_report(session, user: dict, params: dict, now: datetime):
+    return stock_levels(session, user)
+
+
+def _aging_report(session, user: dict, params: dict, now: datetime):
+    return {
+        "as_of": now.isoformat(),
+        "rows": aging_rows(
+            session, now, user_id=None if user["role"] == "admin" else user["id"]
+        ),
+    }
+
+
+REPORTS = {
+    "kpis": (
+        (Sale.__tablename__, Customer.__tablename__, Receivable.__tablename__),
+        _kpis_report,
+        None,
+    ),
+    "sales": (
+        (Sale.__tablename__, Branch.__tablename__, User.__tablename__),
+        _sales_report,
+        None,
+    ),
+    "stock": (
+        (Stock.__tablename__, Product.__tablename__, Branch.__tablename__),
+        _stock_report,
+        None,
+    ),
+    "aging": (
+        (Receivable.__tablename__, Branch.__tablename__, User.__tablename__),
+        _aging_report,
+        AGING_REFRESH_SECONDS,
+    ),
+}
\ No newline at end of file
@@ -0,0 +1,472 @@
+import reflex as rx
+import sqlalchemy as sa
+from datetime import datetime, timedelta, timezone
+from sqlmodel import select
+from app.db_models import (
+    Branch,
+    Customer,
+    Installment,
+    Product,
+    Receivable,
+    Sale,
+    SaleDetail,
+    SaleListEntry,
+    Stock,
+    User,
+)
+from app.services.data_versions import bump_data_versions
+from app.services.receivables import (
+    AMOUNT_EPSILON,
+    OPEN_STATUSES,
+    SALE_SOURCE,
+    record_receivables,
+    release_credit,
+    reserve_credit,
+)
+
+PAYMENT_METHODS = ("cash", "card", "weekly", "monthly")
+CREDIT_METHODS = ("weekly", "monthly")
+SALES_BATCH_CHUNK_SIZE = 100
+SALES_BATCH_MAX_SIZE = 5000
+SALES_BATCH_MAX_AGE_DAYS = 7
+SALES_BATCH_CLOCK_SKEW_SECONDS = 5 * 60
+MISSING_NAME = "N/A"
+CANCELLED_STATUS = "Cancelled"
+SALE_LIST_NAMES = {
+    Customer: ("customer_id", "customer_name"),
+    User: ("user_id", "user_username"),
+    Branch: ("branch_id", "branch_name"),
+}
+
+
+def record_sale_list_entries(session, condition) -> int:
+    rows = (
+        select(
+            Sale.id,
+            Sale.customer_id,
+            Sale.user_id,
+            Sale.branch_id,
+            sa.func.coalesce(Customer.name, MISSING_NAME),
+            sa.func.coalesce(User.username, MISSING_NAME),
+            sa.func.coalesce(Branch.name, MISSING_NAME),
+            Sale.total_amount,
+            Sale.payment_method,
+            Sale.status,
+            Sale.created_at,
+        )
+        .outerjoin(Customer, Customer.id == Sale.customer_id)
+        .outerjoin(User, User.id == Sale.user_id)
+        .outerjoin(Branch, Branch.id == Sale.branch_id)
+        .where(condition)
+    )
+    return session.execute(
+        sa.insert(SaleListEntry).from_select(
+            [
+                "sale_id",
+                "customer_id",
+                "user_id",
+                "branch_id",
+                "customer_name",
+                "user_username",
+                "branch_name",
+                "total_amount",
+                "payment_method",
+                "status",
+                "created_at",
+            ],
+            rows,
+        )
+    ).rowcount
+
+
+def sync_sales_list() -> int:
+    with rx.session() as session:
+        inserted = record_sale_list_entries(
+            session, ~sa.exists().where(SaleListEntry.sale_id == Sale.id)
+        )
+        session.commit()
+    return inserted
+
+
+def update_sale_list_names(session, model, record_id: int, name: str | None = None):
+    key, column = SALE_LIST_NAMES[model]
+    session.execute(
+        sa.update(SaleListEntry)
+        .where(getattr(SaleListEntry, key) == record_id)
+        .values({column: name or MISSING_NAME})
+    )
+
+
+def write_sale(
+    session,
+    customer_id: int,
+    user_id: int,
+    branch_id: int,
+    lines: list[dict],
+    payment_method: str,
+    num_installments: int = 0,
+    created_at: datetime | None = None,
+    external_id: str | None = None,
+) -> Sale:
+    created_at = created_at or datetime.utcnow()
+    bump_data_versions(session, Sale, Stock)
+    for line in lines:
+        taken = session.execute(
+            sa.update(Stock)
+            .where(
+                Stock.product_id == line["product_id"],
+                Stock.branch_id == branch_id,
+                Stock.quantity >= line["quantity"],
+            )
+            .values(quantity=Stock.quantity - line["quantity"])
+        ).rowcount
+        if not taken:
+            raise ValueError(
+                f"Not enough stock for {line.get('product_name') or line['product_id']}."
+            )
+    total = sum(line["quantity"] * line["unit_price"] for line in lines)
+    sale = Sale(
+        customer_id=customer_id,
+        user_id=user_id,
+        branch_id=branch_id,
+        total_amount=total,
+        payment_method=payment_method,
+        status="Paid" if payment_method not in CREDIT_METHODS else "Pending",
+        created_at=created_at,
+        external_id=external_id,
+    )
+    session.add(sale)
+    session.flush()
+    session.add_all(
+        [
+            SaleDetail(
+                sale_id=sale.id,
+                product_id=line["product_id"],
+                quantity=line["quantity"],
+                unit_price=line["unit_price"],
+                subtotal=line["quantity"] * line["unit_price"],
+            )
+            for line in lines
+        ]
+    )
+    if payment_method in CREDIT_METHODS:
+        step = timedelta(weeks=1) if payment_method == "weekly" else timedelta(days=30)
+        installments = [
+            Installment(
+                sale_id=sale.id,
+                due_date=created_at + step * (i + 1),
+                amount_due=total / num_installments,
+                status="Pending",
+            )
+            for i in range(num_installments)
+        ]
+        session.add_all(installments)
+        if not reserve_credit(
+            session,
+            customer_id,
+            round(sum(i.amount_due for i in installments), 2),
+        ):
+            raise ValueError("This sale exceeds the customer's credit limit.")
+        record_receivables(
+            session,
+            SALE_SOURCE,
+            installments,
+            customer_id=customer_id,
+            user_id=user_id,
+            branch_id=branch_id,
+            sale_id=sale.id,
+        )
+    record_sale_list_entries(session, Sale.id == sale.id)
+    return sale
+
+
+def cancel_sale(session, sale_id: int):
+    sale = session.get(Sale, sale_id)
+    if sale is None:
+        raise ValueError("Sale not found.")
+    if sale.status == CANCELLED_STATUS:
+        raise ValueError("Sale is already cancelled.")
+    if sale.payment_method not in CREDIT_METHODS:
+        raise ValueError("Only credit sales can be cancelled.")
+    collected = session.exec(
+        select(sa.func.count(Receivable.id)).where(
+            Receivable.sale_id == sale_id, Receivable.amount_paid > 0
+        )
+    ).one()
+    if collected:
+        raise ValueError("Sale has collected installments and cannot be cancelled.")
+    bump_data_versions(session, Sale, Stock, Receivable)
+    if not session.execute(
+        sa.update(Sale)
+        .where(Sale.id == sale_id, Sale.status != CANCELLED_STATUS)
+        .values(status=CANCELLED_STATUS)
+    ).rowcount:
+        raise ValueError("Sale is already cancelled.")
+    exposure = session.exec(
+        select(
+            sa.func.coalesce(
+                sa.func.sum(Receivable.amount_due - Receivable.amount_paid), 0.0
+            )
+        ).where(Receivable.sale_id == sale_id, Receivable.status.in_(OPEN_STATUSES))
+    ).one()
+    session.execute(
+        sa.update(Receivable)
+        .where(Receivable.sale_id == sale_id, Receivable.status.in_(OPEN_STATUSES))
+        .values(status=CANCELLED_STATUS)
+    )
+    session.execute(
+        sa.update(Installment)
+        .where(Installment.sale_id == sale_id, Installment.status.in_(OPEN_STATUSES))
+        .values(status=CANCELLED_STATUS)
+    )
+    for product_id, quantity in session.exec(
+        select(SaleDetail.product_id, SaleDetail.quantity).where(
+            SaleDetail.sale_id == sale_id
+        )
+    ).all():
+        session.execute(
+            sa.update(Stock)
+            .where(Stock.product_id == product_id, Stock.branch_id == sale.branch_id)
+            .values(quantity=Stock.quantity + quantity)
+        )
+    session.execute(
+        sa.update(SaleListEntry)
+        .where(SaleListEntry.sale_id == sale_id)
+        .values(status=CANCELLED_STATUS)
+    )
+    release_credit(session, {sale.customer_id: round(exposure, 2)})
+
+
+def _utc_naive(value: str) -> datetime:
+    created_at = datetime.fromisoformat(value)
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+def _batch_entry(entry, user: dict, now: datetime) -> tuple[dict | None, str | None]:
+    if not isinstance(entry, dict):
+        return None, "Sale must be an object."
+    key = entry.get("idempotency_key")
+    if not isinstance(key, str) or not key.strip():
+        return None, "Missing idempotency_key."
+    payment_method = entry.get("payment_method", "cash")
+    if payment_method not in PAYMENT_METHODS:
+        return None, "Unknown payment_method."
+    try:
+        num_installments = int(entry.get("num_installments") or 0)
+        customer_id = int(entry["customer_id"])
+        branch_id = (
+            int(entry.get("branch_id") or user["branch_id"])
+            if user["role"] == "admin"
+            else user["branch_id"]
+        )
+        created_at = (
+            _utc_naive(entry["created_at"]) if entry.get("created_at") else None
+        )
+        lines = [
+            {
+                "product_id": int(line["product_id"]),
+                "quantity": int(line["quantity"]),
+                "unit_price": float(line["unit_price"])
+                if line.get("unit_price") is not None
+                else None,
+            }
+            for line in entry.get("lines") or []
+        ]
+    except (KeyError, TypeError, ValueError):
+        return None, "Malformed sale."
+    if not branch_id:
+        return None, "User is not associated with a branch."
+    if not lines or any(line["quantity"] <= 0 for line in lines):
+        return None, "Sale needs lines with positive quantities."
+    if payment_method in CREDIT_METHODS and num_installments <= 0:
+        return None, "Credit sales need num_installments."
+    if created_at is not None:
+        if created_at > now + timedelta(seconds=SALES_BATCH_CLOCK_SKEW_SECONDS):
+            return None, "created_at is in the future."
+        if created_at < now - timedelta(days=SALES_BATCH_MAX_AGE_DAYS):
+            return None, f"created_at is more than {SALES_BATCH_MAX_AGE_DAYS} days old."
+    return {
+        "key": key.strip(),
+        "customer_id": customer_id,
+        "branch_id": branch_id,
+        "payment_method": payment_method,
+        "num_installments": num_installments,
+        "created_at": created_at,
+        "lines": lines,
+    }, None
+
+
+def ingest_sales(session, entries: list, user: dict) -> list[dict]:
+    results = []
+    sales = []
+    now = datetime.utcnow()
+    for entry in entries:
+        sale, error = _batch_entry(entry, user, now)
+        results.append(
+            {
+                "idempotency_key": sale["key"]
+                if sale
+                else (
+                    entry.get("idempotency_key") if isinstance(entry, dict) else None
+                ),
+                "status": "rejected" if error else "pending",
+                "sale_id": None,
+                "error": error,
+            }
+        )
+        sales.append(sale)
+    keys = [sale["key"] for sale in sales if sale]
+    product_ids = {
+        line["product_id"] for sale in sales if sale for line in sale["lines"]
+    }
+    customer_ids = {sale["customer_id"] for sale in sales if sale}
+    branch_ids = {sale["branch_id"] for sale in sales if sale}
+    existing = dict(
+        session.exec(
+            select(Sale.external_id, Sale.id).where(Sale.external_id.in_(keys))
+        ).all()
+    )
+    products = {
+        row[0]: row
+        for row in session.exec(
+            select(Product.id, Product.name, Product.price).where(
+                Product.id.in_(product_ids)
+            )
+        ).all()
+    }
+    customers = {
+        row[0]: row
+        for row in session.exec(
+            select(
+                Customer.id,
+                Customer.branch_id,
+                Customer.credit_balance,
+                Customer.credit_limit,
+            ).where(Customer.id.in_(customer_ids))
+        ).all()
+    }
+    stock = {
+        (row[0], row[1]): row[2]
+        for row in session.exec(
+            select(Stock.product_id, Stock.branch_id, Stock.quantity).where(
+                Stock.product_id.in_(product_ids), Stock.branch_id.in_(branch_ids)
+            )
+        ).all()
+    }
+    exposure = {customer_id: row[2] for customer_id, row in customers.items()}
+    seen = set()
+    accepted = []
+    for index, (sale, result) in enumerate(zip(sales, results)):
+        if sale is None:
+            continue
+        if sale["key"] in existing:
+            result.update(status="duplicate", sale_id=existing[sale["key"]])
+            continue
+        if sale["key"] in seen:
+            result.update(
+                status="rejected", error="Duplicate idempotency_key in batch."
+            )
+            continue
+        seen.add(sale["key"])
+        customer = customers.get(sale["customer_id"])
+        if customer is None or (
+            user["role"] != "admin" and customer[1] != user["branch_id"]
+        ):
+            result.update(status="rejected", error="Unknown customer.")
+            continue
+        missing = [
+            line["product_id"]
+            for line in sale["lines"]
+            if line["product_id"] not in products
+        ]
+        if missing:
+            result.update(status="rejected", error=f"Unknown product {missing[0]}.")
+            continue
+        mismatched = [
+            line["product_id"]
+            for line in sale["lines"]
+            if line["unit_price"] is not None
+            and abs(line["unit_price"] - products[line["product_id"]][2])
+            > AMOUNT_EPSILON
+        ]
+        if mismatched:
+            result.update(
+                status="rejected",
+                error=f"Price mismatch for {products[mismatched[0]][1]}.",
+            )
+            continue
+        demand: dict[int, int] = {}
+        for line in sale["lines"]:
+            product = products[line["product_id"]]
+            line["product_name"] = product[1]
+            line["unit_price"] = product[2]
+            demand[line["product_id"]] = (
+                demand.get(line["product_id"], 0) + line["quantity"]
+            )
+        short = [
+            product_id
+            for product_id, quantity in demand.items()
+            if stock.get((product_id, sale["branch_id"]), 0) < quantity
+        ]
+        if short:
+            result.update(
+                status="rejected",
+                error=f"Not enough stock for {products[short[0]][1]}.",
+            )
+            continue
+        if sale["payment_method"] in CREDIT_METHODS:
+            amount = sum(
+                line["quantity"] * line["unit_price"] for line in sale["lines"]
+            )
+            limit = customer[3]
+            if (
+                limit is not None
+                and exposure[sale["customer_id"]] + amount > limit + AMOUNT_EPSILON
+            ):
+                result.update(
+                    status="rejected",
+                    error="This sale exceeds the customer's credit limit.",
+                )
+                continue
+            exposure[sale["customer_id"]] += amount
+        for product_id, quantity in demand.items():
+            stock[(product_id, sale["branch_id"])] -= quantity
+        accepted.append(index)
+    for start in range(0, len(accepted), SALES_BATCH_CHUNK_SIZE):
+        chunk = accepted[start : start + SALES_BATCH_CHUNK_SIZE]
+        while chunk:
+            written = {}
+            failed = None
+            for index in chunk:
+                sale = sales[index]
+                try:
+                    written[index] = write_sale(
+                        session,
+                        customer_id=sale["customer_id"],
+                        user_id=user["id"],
+                        branch_id=sale["branch_id"],
+                        lines=sale["lines"],
+                        payment_method=sale["payment_method"],
+                        num_installments=sale["num_installments"],
+                        created_at=sale["created_at"],
+                        external_id=sale["key"],
+                    ).id
+                except (ValueError, sa.exc.IntegrityError) as error:
+                    failed = index
+                    results[index].update(
+                        status="rejected",
+                        error=str(error)
+                        if isinstance(error, ValueError)
+                        else "Sale was already uploaded.",
+                    )
+                    break
+            if failed is None:
+                session.commit()
+                for index, sale_id in written.items():
+                    results[index].update(status="created", sale_id=sale_id)
+                break
+            session.rollback()
+            chunk = [index for index in chunk if index != failed]
+    return results
\ No newline at end of file
@@ -0,0 +1,18 @@
+import asyncio
+import logging
+from collections.abc import Callable
+
+
+async def _run_every(job: Callable[[], object], interval_seconds: int):
+    while True:
+        try:
+            await asyncio.to_thread(job)
+        except Exception as e:
+            logging.exception(f"Scheduled job {job.__name__} failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+async def run_scheduled_jobs(jobs: list[tuple[Callable[[], object], int]]):
+    await asyncio.gather(
+        *(_run_every(job, interval_seconds) for job, interval_seconds in jobs)
+    )
\ No newline at end of file
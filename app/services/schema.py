@@ -0,0 +1,125 @@
+import sqlalchemy as sa
+from sqlmodel import SQLModel, select
+from app.db_models import (
+    CashClosing,
+    CashClosingDetail,
+    Customer,
+    FinancialPayment,
+    JobCheckpoint,
+    Product,
+    Sale,
+    Stock,
+)
+from app.services.data_versions import install_data_versions
+from app.services.reports import REPORTS
+
+SCHEMA_COLUMNS = (
+    (Customer.__table__.c.credit_limit, None, None),
+    (Product.__table__.c.reorder_point, "10", None),
+    (
+        Stock.__table__.c.reorder_point,
+        "10",
+        sa.update(Stock)
+        .where(sa.exists().where(Product.id == Stock.product_id))
+        .values(
+            reorder_point=select(Product.reorder_point)
+            .where(Product.id == Stock.product_id)
+            .scalar_subquery()
+        ),
+    ),
+    (Sale.__table__.c.external_id, None, None),
+    (FinancialPayment.__table__.c.amortization_method, "'flat'", None),
+    (
+        FinancialPayment.__table__.c.rate_basis,
+        "'term'",
+        sa.update(FinancialPayment)
+        .where(sa.exists().where(JobCheckpoint.name == "annual_interest_rates"))
+        .values(rate_basis="annual"),
+    ),
+    (FinancialPayment.__table__.c.paid_count, "0", None),
+    (FinancialPayment.__table__.c.amount_paid, "0", None),
+    (FinancialPayment.__table__.c.outstanding, "0", None),
+    (CashClosing.__table__.c.parent_id, None, None),
+    (
+        CashClosingDetail.__table__.c.source,
+        "''",
+        sa.update(CashClosingDetail).values(
+            source=sa.case(
+                (CashClosingDetail.payment_type.startswith("Direct Sale"), "sale"),
+                else_="receivable",
+            )
+        ),
+    ),
+)
+STOCK_UNIQUE_INDEX = "ix_stock_product_branch"
+
+
+def _add_column(conn, column, default: str | None):
+    ddl = f"ALTER TABLE {column.table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+    if default is not None:
+        ddl += f" NOT NULL DEFAULT {default}"
+    for foreign_key in column.foreign_keys:
+        ddl += (
+            f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+        )
+    conn.execute(sa.text(ddl))
+
+
+def _merge_duplicate_stock(conn):
+    stock = Stock.__table__
+    duplicate = stock.alias()
+    first_ids = (
+        select(sa.func.min(stock.c.id))
+        .group_by(stock.c.product_id, stock.c.branch_id)
+        .having(sa.func.count() > 1)
+    )
+    conn.execute(
+        sa.update(stock)
+        .where(stock.c.id.in_(first_ids))
+        .values(
+            quantity=select(sa.func.sum(duplicate.c.quantity))
+            .where(
+                duplicate.c.product_id == stock.c.product_id,
+                duplicate.c.branch_id == stock.c.branch_id,
+            )
+            .scalar_subquery()
+        )
+    )
+    return conn.execute(
+        sa.delete(stock).where(
+            stock.c.id.not_in(
+                select(sa.func.min(stock.c.id)).group_by(
+                    stock.c.product_id, stock.c.branch_id
+                )
+            )
+        )
+    ).rowcount
+
+
+def upgrade_schema(engine) -> list[str]:
+    added = []
+    with engine.begin() as conn:
+        inspector = sa.inspect(conn)
+        existing = {
+            table: {column["name"] for column in inspector.get_columns(table)}
+            for table in inspector.get_table_names()
+        }
+        for column, default, fill in SCHEMA_COLUMNS:
+            if column.name in existing.get(column.table.name, {column.name}):
+                continue
+            _add_column(conn, column, default)
+            if fill is not None:
+                conn.execute(fill)
+            added.append(f"{column.table.name}.{column.name}")
+        stock_indexes = {
+            index["name"] for index in inspector.get_indexes(Stock.__tablename__)
+        }
+        if STOCK_UNIQUE_INDEX not in stock_indexes and _merge_duplicate_stock(conn):
+            added.append("stock.merged_duplicates")
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(sa.schema.CreateIndex(index, if_not_exists=True))
+        install_data_versions(
+            conn, {table for tables, *_ in REPORTS.values() for table in tables}
+        )
+    return added
\ No newline at end of file
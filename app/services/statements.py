@@ -0,0 +1,107 @@
+import sqlalchemy as sa
+from sqlmodel import select
+from app.db_models import FinancialPayment, Receivable, ReceivablePayment, Sale
+from app.services.cash_closing import DIRECT_SALE_METHODS
+from app.services.receivables import SALE_SOURCE
+from app.services.sales import CANCELLED_STATUS
+
+STATEMENT_CHUNK_SIZE = 500
+STATEMENT_COLUMNS = ("date", "description", "charge", "credit", "balance")
+CHARGE_ENTRY = 0
+CREDIT_ENTRY = 1
+
+
+def statement_query(customer_id: int):
+    sales = select(
+        Sale.created_at.label("occurred_at"),
+        sa.literal(CHARGE_ENTRY).label("entry_order"),
+        sa.literal("Sale").label("entry_type"),
+        Sale.id.label("reference"),
+        sa.null().label("installment_number"),
+        Sale.total_amount.label("charge"),
+        sa.literal(0.0).label("credit"),
+        Sale.id.label("entry_id"),
+    ).where(Sale.customer_id == customer_id, Sale.status != CANCELLED_STATUS)
+    direct_payments = select(
+        Sale.created_at,
+        sa.literal(CREDIT_ENTRY),
+        sa.literal("Sale Payment"),
+        Sale.id,
+        sa.null(),
+        sa.literal(0.0),
+        Sale.total_amount,
+        Sale.id,
+    ).where(
+        Sale.customer_id == customer_id,
+        Sale.payment_method.in_(DIRECT_SALE_METHODS),
+    )
+    plans = select(
+        FinancialPayment.created_at,
+        sa.literal(CHARGE_ENTRY),
+        sa.literal("Credit Plan"),
+        FinancialPayment.id,
+        sa.null(),
+        FinancialPayment.total_amount,
+        sa.literal(0.0),
+        FinancialPayment.id,
+    ).where(FinancialPayment.customer_id == customer_id)
+    installment_payments = (
+        select(
+            ReceivablePayment.paid_at,
+            sa.literal(CREDIT_ENTRY),
+            sa.case(
+                (Receivable.source == SALE_SOURCE, "Sale Installment Payment"),
+                else_="Plan Installment Payment",
+            ),
+            sa.func.coalesce(Receivable.sale_id, Receivable.financial_payment_id),
+            Receivable.installment_number,
+            sa.literal(0.0),
+            ReceivablePayment.amount,
+            ReceivablePayment.id,
+        )
+        .join(Receivable, Receivable.id == ReceivablePayment.receivable_id)
+        .where(ReceivablePayment.customer_id == customer_id)
+    )
+    entries = sa.union_all(
+        sales, direct_payments, plans, installment_payments
+    ).subquery("entries")
+    order = (
+        entries.c.occurred_at,
+        entries.c.entry_order,
+        entries.c.entry_type,
+        entries.c.reference,
+        entries.c.entry_id,
+    )
+    return select(
+        entries.c.occurred_at,
+        entries.c.entry_type,
+        entries.c.reference,
+        entries.c.installment_number,
+        entries.c.charge,
+        entries.c.credit,
+        sa.func.sum(entries.c.charge - entries.c.credit).over(
+            order_by=order, rows=(None, 0)
+        ),
+    ).order_by(*order)
+
+
+def statement_row(row) -> dict:
+    occurred_at, entry_type, reference, number, charge, credit, balance = row
+    description = f"{entry_type} #{reference}"
+    if number:
+        description += f" (installment {number})"
+    return {
+        "date": occurred_at.isoformat(),
+        "description": description,
+        "charge": round(charge, 2),
+        "credit": round(credit, 2),
+        "balance": round(balance, 2),
+    }
+
+
+def iter_statement(session, customer_id: int, chunk_size: int = STATEMENT_CHUNK_SIZE):
+    result = session.execute(
+        statement_query(customer_id).execution_options(yield_per=chunk_size)
+    )
+    for rows in result.partitions():
+        yield [statement_row(row) for row in rows]
\ No newline at end of file
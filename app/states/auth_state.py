@@ -2,8 +2,10 @@ import reflex as rx
 from typing import Literal, cast, TypedDict
 from sqlmodel import select
 from app.db_models import User, Branch, UserDict, BranchDict
+from app.services.data_versions import bump_data_versions
+from app.services.projections import branch_rows, user_rows
+from app.services.sales import update_sale_list_names
 import bcrypt
-import sqlalchemy as sa
 
 
 class CurrentUser(TypedDict):
@@ -103,17 +105,9 @@ class AuthState(rx.State):
     @rx.event
     async def load_all_data(self):
         with rx.session() as session:
-            branches = session.exec(select(Branch)).all()
-            self.all_branches = [b.dict() for b in branches]
-        if self.current_user and self.current_user["role"] == "admin":
-            users = session.exec(
-                select(User).options(sa.orm.selectinload(User.branch))
-            ).all()
-            self.all_users = []
-            for u in users:
-                user_dict = u.dict()
-                user_dict["branch"] = u.branch.dict() if u.branch else None
-                self.all_users.append(user_dict)
+            self.all_branches = branch_rows(session)
+            if self.current_user and self.current_user["role"] == "admin":
+                self.all_users = user_rows(session)
 
     @rx.event(background=True)
     async def add_branch(self):
@@ -135,6 +129,7 @@ class AuthState(rx.State):
                     name=self.new_branch_name, location=self.new_branch_location
                 )
                 session.add(new_branch)
+                bump_data_versions(session, Branch)
                 session.commit()
                 self.new_branch_name = ""
                 self.new_branch_location = ""
@@ -153,6 +148,8 @@ class AuthState(rx.State):
                         )
                         return
                     session.delete(branch_to_delete)
+                    update_sale_list_names(session, Branch, branch_id)
+                    bump_data_versions(session, Branch)
                     session.commit()
         yield AuthState.load_all_data()
         yield rx.toast.success("Branch deleted.", duration=3000)
@@ -164,6 +161,8 @@ class AuthState(rx.State):
                 user_to_delete = session.get(User, user_id)
                 if user_to_delete and user_to_delete.id != self.current_user["id"]:
                     session.delete(user_to_delete)
+                    update_sale_list_names(session, User, user_id)
+                    bump_data_versions(session, User)
                     session.commit()
                 else:
                     yield rx.toast.error(
@@ -203,6 +202,7 @@ class AuthState(rx.State):
                     branch_id=branch_id,
                 )
                 session.add(new_user)
+                bump_data_versions(session, User)
                 session.commit()
         yield AuthState.load_all_data()
         yield rx.toast.success(f"User '{username}' created successfully.")
\ No newline at end of file
@@ -1,20 +1,34 @@
+import asyncio
 import reflex as rx
 from typing import TypedDict
-from sqlmodel import select, and_, or_, func
+from sqlmodel import and_, func
 from app.db_models import (
-    CashClosing,
     CashClosingDetail,
-    Sale,
-    FinancialPayment,
-    FinancialInstallment,
-    Customer,
     User,
     Branch,
     CashClosingDict,
     CollectedPaymentDict,
+    ClosingTypeTotalDict,
+    ClosingCustomerTotalDict,
+    ComposedClosingDict,
+    BranchClosingDict,
+    ReconciliationRowDict,
 )
 from datetime import datetime, timedelta
 import sqlalchemy as sa
+from app.services.projections import closing_rows
+from app.services.cash_closing import (
+    close_period,
+    closing_preview,
+    consolidated_preview,
+    merge_customer_totals,
+    merge_type_totals,
+    receipt_rows,
+    receipts_subquery,
+    reconciliation_rows,
+)
+
+RECEIPTS_PAGE_SIZE = 50
 
 
 class CashClosingState(rx.State):
@@ -22,7 +36,24 @@ class CashClosingState(rx.State):
     start_date: str = ""
     end_date: str = ""
     collected_payments: list[CollectedPaymentDict] = []
+    type_totals: list[ClosingTypeTotalDict] = []
+    customer_totals: list[ClosingCustomerTotalDict] = []
+    receipt_count: int = 0
+    receipts_page: int = 0
+    receipts_has_next: bool = False
+    receipts_type_filter: str = ""
+    closing_branch_id: str = ""
+    composed_closings: list[ComposedClosingDict] = []
+    composed_total: float = 0.0
+    remainder_total: float = 0.0
     total_collected: float = 0.0
+    consolidated: bool = False
+    branch_breakdown: list[BranchClosingDict] = []
+    _branch_children: dict[int, list[int]] = {}
+    reconciliation: list[ReconciliationRowDict] = []
+    reconciliation_expected: float = 0.0
+    reconciliation_on_schedule: float = 0.0
+    reconciliation_collected: float = 0.0
     closings_history: list[CashClosingDict] = []
 
     @rx.event
@@ -47,69 +78,136 @@ class CashClosingState(rx.State):
         self._set_default_dates()
         return CashClosingState.fetch_collected_payments
 
+    def _period_bounds(self) -> tuple[datetime, datetime]:
+        start = datetime.strptime(self.start_date, "%Y-%m-%d")
+        end = datetime.strptime(self.end_date, "%Y-%m-%d") + timedelta(days=1)
+        return start, end
+
+    async def _scope(self) -> dict | None:
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user or not self.start_date or (not self.end_date):
+            return None
+        if not auth_state.is_admin:
+            return {"user_id": auth_state.current_user["id"], "branch_id": None}
+        return {
+            "user_id": None,
+            "branch_id": int(self.closing_branch_id)
+            if self.closing_branch_id
+            else None,
+        }
+
+    async def _receipts(self):
+        scope = await self._scope()
+        if scope is None:
+            return None
+        start, end = self._period_bounds()
+        return receipts_subquery(start, end, **scope)
+
     @rx.event
     async def fetch_collected_payments(self):
         from app.states.auth_state import AuthState
 
         auth_state = await self.get_state(AuthState)
-        if not auth_state.current_user or not self.start_date or (not self.end_date):
+        scope = await self._scope()
+        if scope is None:
             return
-        start = datetime.strptime(self.start_date, "%Y-%m-%d")
-        end = datetime.strptime(self.end_date, "%Y-%m-%d") + timedelta(days=1)
-        with rx.session() as session:
-            payments_query = (
-                select(FinancialInstallment)
-                .options(
-                    sa.orm.selectinload(FinancialInstallment.payment).selectinload(
-                        FinancialPayment.customer
-                    )
-                )
-                .where(
-                    FinancialInstallment.paid_at >= start,
-                    FinancialInstallment.paid_at < end,
-                    FinancialInstallment.status == "Paid",
-                )
+        start, end = self._period_bounds()
+        closer_id = auth_state.current_user["id"]
+        self.consolidated = auth_state.is_admin and (not self.closing_branch_id)
+        if self.consolidated:
+            previews = await asyncio.to_thread(
+                consolidated_preview, start, end, closer_id
             )
-            sales_query = (
-                select(Sale)
-                .options(sa.orm.selectinload(Sale.customer))
-                .where(
-                    Sale.created_at >= start,
-                    Sale.created_at < end,
-                    or_(Sale.payment_method == "cash", Sale.payment_method == "card"),
-                )
+            self.branch_breakdown = [
+                {
+                    "branch_id": p["branch_id"],
+                    "branch_name": p["branch_name"],
+                    "receipt_count": p["receipt_count"],
+                    "closings_count": p["closings_count"],
+                    "remainder_total": p["remainder_total"],
+                    "composed_total": p["composed_total"],
+                    "total": p["total"],
+                }
+                for p in previews
+            ]
+            self._branch_children = {
+                p["branch_id"]: [c["id"] for c in p["composed_closings"]]
+                for p in previews
+            }
+        else:
+            with rx.session() as session:
+                previews = [closing_preview(session, start, end, closer_id, **scope)]
+            self.branch_breakdown = []
+            self._branch_children = {}
+        self.composed_closings = [c for p in previews for c in p["composed_closings"]]
+        self.type_totals = merge_type_totals(previews)
+        self.customer_totals = merge_customer_totals(previews)
+        self.receipt_count = sum(t["count"] for t in self.type_totals)
+        self.remainder_total = round(sum(t["amount"] for t in self.type_totals), 2)
+        self.composed_total = round(
+            sum(c["total_collected"] for c in self.composed_closings), 2
+        )
+        self.total_collected = round(self.remainder_total + self.composed_total, 2)
+        self.receipts_type_filter = ""
+        self.receipts_page = 0
+        yield CashClosingState.load_receipts_page
+        yield CashClosingState.load_reconciliation
+
+    @rx.event
+    async def load_reconciliation(self):
+        scope = await self._scope()
+        if scope is None:
+            return
+        start, end = self._period_bounds()
+        with rx.session() as session:
+            report = reconciliation_rows(session, start, end, **scope)
+        self.reconciliation = report["rows"]
+        self.reconciliation_expected = report["expected"]
+        self.reconciliation_on_schedule = report["collected_on_schedule"]
+        self.reconciliation_collected = report["collected"]
+
+    @rx.event
+    def set_closing_branch(self, branch_id: str):
+        self.closing_branch_id = branch_id
+        return CashClosingState.fetch_collected_payments
+
+    @rx.event
+    async def load_receipts_page(self):
+        receipts = await self._receipts()
+        if receipts is None:
+            return
+        with rx.session() as session:
+            page = receipt_rows(
+                session,
+                receipts,
+                offset=self.receipts_page * RECEIPTS_PAGE_SIZE,
+                limit=RECEIPTS_PAGE_SIZE + 1,
+                payment_type=self.receipts_type_filter,
             )
-            if not auth_state.is_admin:
-                payments_query = payments_query.join(FinancialPayment).where(
-                    FinancialPayment.user_id == auth_state.current_user["id"]
-                )
-                sales_query = sales_query.where(
-                    Sale.user_id == auth_state.current_user["id"]
-                )
-            financial_payments = session.exec(payments_query).all()
-            cash_sales = session.exec(sales_query).all()
-            self.collected_payments = []
-            for fp in financial_payments:
-                self.collected_payments.append(
-                    {
-                        "customer_name": fp.payment.customer.name
-                        if fp.payment.customer
-                        else "N/A",
-                        "payment_type": "Credit Payment",
-                        "amount": fp.amount_paid,
-                        "paid_at": fp.paid_at.isoformat(),
-                    }
-                )
-            for sale in cash_sales:
-                self.collected_payments.append(
-                    {
-                        "customer_name": sale.customer.name if sale.customer else "N/A",
-                        "payment_type": f"Direct Sale ({sale.payment_method.capitalize()})",
-                        "amount": sale.total_amount,
-                        "paid_at": sale.created_at.isoformat(),
-                    }
-                )
-            self.total_collected = sum((p["amount"] for p in self.collected_payments))
+        self.receipts_has_next = len(page) > RECEIPTS_PAGE_SIZE
+        self.collected_payments = page[:RECEIPTS_PAGE_SIZE]
+
+    @rx.event
+    def filter_receipts_by_type(self, payment_type: str):
+        self.receipts_type_filter = (
+            "" if self.receipts_type_filter == payment_type else payment_type
+        )
+        self.receipts_page = 0
+        return CashClosingState.load_receipts_page
+
+    @rx.event
+    def next_receipts_page(self):
+        if self.receipts_has_next:
+            self.receipts_page += 1
+            return CashClosingState.load_receipts_page
+
+    @rx.event
+    def previous_receipts_page(self):
+        if self.receipts_page > 0:
+            self.receipts_page -= 1
+            return CashClosingState.load_receipts_page
 
     @rx.event(background=True)
     async def perform_cash_closing(self):
@@ -117,29 +215,79 @@ class CashClosingState(rx.State):
             from app.states.auth_state import AuthState
 
             auth_state = await self.get_state(AuthState)
-            if not auth_state.current_user or not self.collected_payments:
+            scope = await self._scope()
+            if scope is None or not (self.receipt_count or self.composed_closings):
                 yield rx.toast.error("No payments to close.")
                 return
-            start = datetime.strptime(self.start_date, "%Y-%m-%d")
-            end = datetime.strptime(self.end_date, "%Y-%m-%d")
-            with rx.session() as session:
-                new_closing = CashClosing(
-                    user_id=auth_state.current_user["id"],
-                    branch_id=auth_state.current_user["branch_id"],
-                    period_type=self.period_type,
-                    start_date=start,
-                    end_date=end,
-                    total_collected=self.total_collected,
-                    status="Closed",
+            start, end = self._period_bounds()
+            if self.consolidated:
+                targets = [
+                    (b["branch_id"], self._branch_children.get(b["branch_id"], []))
+                    for b in self.branch_breakdown
+                    if b["receipt_count"] or b["closings_count"]
+                ]
+            else:
+                branch_id = (
+                    int(self.closing_branch_id)
+                    if auth_state.is_admin and self.closing_branch_id
+                    else auth_state.current_user["branch_id"]
                 )
-                session.add(new_closing)
-                session.flush()
+                targets = [(branch_id, [c["id"] for c in self.composed_closings])]
+            count = 0
+            total = 0.0
+            child_count = 0
+            with rx.session() as session:
+                for branch_id, child_ids in targets:
+                    receipts = receipts_subquery(
+                        start,
+                        end,
+                        **(
+                            {**scope, "branch_id": branch_id}
+                            if self.consolidated
+                            else scope
+                        ),
+                    )
+                    try:
+                        closed = close_period(
+                            session,
+                            user_id=auth_state.current_user["id"],
+                            branch_id=branch_id,
+                            period_type=self.period_type,
+                            start=start,
+                            end_date=end - timedelta(days=1),
+                            receipts=receipts,
+                            child_ids=child_ids,
+                        )
+                    except sa.exc.IntegrityError:
+                        session.rollback()
+                        yield rx.toast.error(
+                            "Some of these payments were just closed elsewhere. Refresh and try again."
+                        )
+                        return
+                    if closed is None:
+                        session.rollback()
+                        yield rx.toast.error(
+                            "Some of the included closings were just rolled up elsewhere. Refresh and try again."
+                        )
+                        return
+                    if not closed[0] and not child_ids:
+                        session.rollback()
+                        yield rx.toast.error(
+                            "All payments in this period are already closed."
+                        )
+                        return
+                    count += closed[0]
+                    total = round(total + closed[1], 2)
+                    child_count += len(child_ids)
                 session.commit()
-                self.collected_payments = []
-                self.total_collected = 0.0
+        yield CashClosingState.fetch_collected_payments
         yield CashClosingState.load_closings_history
         yield rx.toast.success(
-            f"{self.period_type.capitalize()} cash closing completed!"
+            f"{self.period_type.capitalize()} cash closing completed: ${total:.2f} "
+            f"({len(targets)} branches, {child_count} closings, {count} new payments)."
+            if self.consolidated
+            else f"{self.period_type.capitalize()} cash closing completed: ${total:.2f} "
+            f"({child_count} closings, {count} new payments)."
         )
 
     @rx.event
@@ -150,27 +298,7 @@ class CashClosingState(rx.State):
         if not auth_state.current_user:
             return
         with rx.session() as session:
-            query = select(CashClosing).options(
-                sa.orm.selectinload(CashClosing.user),
-                sa.orm.selectinload(CashClosing.branch),
-            )
-            if not auth_state.is_admin:
-                query = query.where(
-                    CashClosing.user_id == auth_state.current_user["id"]
-                )
-            closings = session.exec(query.order_by(CashClosing.created_at.desc())).all()
-            self.closings_history = []
-            for c in closings:
-                self.closings_history.append(
-                    {
-                        "id": c.id,
-                        "user_name": c.user.username if c.user else "N/A",
-                        "branch_name": c.branch.name if c.branch else "N/A",
-                        "period_type": c.period_type,
-                        "start_date": c.start_date.isoformat(),
-                        "end_date": c.end_date.isoformat(),
-                        "total_collected": c.total_collected,
-                        "status": c.status,
-                        "created_at": c.created_at.isoformat(),
-                    }
-                )
\ No newline at end of file
+            self.closings_history = closing_rows(
+                session,
+                user_id=None if auth_state.is_admin else auth_state.current_user["id"],
+            )
\ No newline at end of file
@@ -1,6 +1,9 @@
 import reflex as rx
-from sqlmodel import select
-from app.db_models import Customer, CustomerDict
+from app.db_models import Customer, CustomerDict, StatementRowDict
+from app.services.data_versions import bump_data_versions
+from app.services.statements import iter_statement
+from app.services.projections import customer_rows
+from app.services.sales import update_sale_list_names
 import sqlalchemy as sa
 
 
@@ -11,6 +14,11 @@ class CustomerState(rx.State):
     new_customer_phone: str = ""
     new_customer_email: str = ""
     new_customer_address: str = ""
+    statement_customer_id: int | None = None
+    statement_customer_name: str = ""
+    statement_rows: list[StatementRowDict] = []
+    statement_balance: float = 0.0
+    statement_loading: bool = False
 
     @rx.var
     def filtered_customers(self) -> list[CustomerDict]:
@@ -32,16 +40,12 @@ class CustomerState(rx.State):
         if not auth_state or not auth_state.current_user:
             return
         with rx.session() as session:
-            query = select(Customer).options(sa.orm.selectinload(Customer.branch))
-            if auth_state.current_user["role"] != "admin":
-                query = query.where(
-                    Customer.branch_id == auth_state.current_user["branch_id"]
-                )
-            all_customers = session.exec(query).all()
-            self.customers = [
-                {**c.dict(), "branch_name": c.branch.name if c.branch else "N/A"}
-                for c in all_customers
-            ]
+            self.customers = customer_rows(
+                session,
+                branch_id=None
+                if auth_state.current_user["role"] == "admin"
+                else auth_state.current_user["branch_id"],
+            )
 
     @rx.event(background=True)
     async def add_customer(self, form_data: dict):
@@ -58,6 +62,15 @@ class CustomerState(rx.State):
             if not branch_id_to_assign:
                 yield rx.toast.error("Cannot add customer without a branch assignment.")
                 return
+            try:
+                credit_limit = (
+                    float(form_data["credit_limit"])
+                    if form_data.get("credit_limit")
+                    else None
+                )
+            except ValueError:
+                yield rx.toast.error("Credit limit must be a number.")
+                return
             with rx.session() as session:
                 new_customer = Customer(
                     name=form_data["name"],
@@ -65,8 +78,10 @@ class CustomerState(rx.State):
                     email=form_data.get("email"),
                     address=form_data.get("address"),
                     branch_id=branch_id_to_assign,
+                    credit_limit=credit_limit,
                 )
                 session.add(new_customer)
+                bump_data_versions(session, Customer)
                 session.commit()
                 self.new_customer_name = ""
                 self.new_customer_phone = ""
@@ -75,6 +90,33 @@ class CustomerState(rx.State):
         yield CustomerState.load_customers
         yield rx.toast.success("Customer added successfully!")
 
+    @rx.event(background=True)
+    async def update_credit_limit(self, customer_id: int, value: str):
+        async with self:
+            from app.states.auth_state import AuthState
+
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.is_admin:
+                return
+            try:
+                credit_limit = float(value) if value.strip() else None
+            except ValueError:
+                yield rx.toast.error("Credit limit must be a number.")
+                return
+            with rx.session() as session:
+                session.execute(
+                    sa.update(Customer)
+                    .where(Customer.id == customer_id)
+                    .values(credit_limit=credit_limit)
+                )
+                bump_data_versions(session, Customer)
+                session.commit()
+            for customer in self.customers:
+                if customer["id"] == customer_id:
+                    customer["credit_limit"] = credit_limit
+                    break
+        yield rx.toast.success("Credit limit updated.")
+
     @rx.event(background=True)
     async def delete_customer(self, customer_id: int):
         async with self:
@@ -82,6 +124,54 @@ class CustomerState(rx.State):
                 customer = session.get(Customer, customer_id)
                 if customer:
                     session.delete(customer)
+                    update_sale_list_names(session, Customer, customer_id)
+                    bump_data_versions(session, Customer)
                     session.commit()
         yield CustomerState.load_customers
-        yield rx.toast.info(f"Customer deleted.")
\ No newline at end of file
+        yield rx.toast.info(f"Customer deleted.")
+
+    @rx.event(background=True)
+    async def open_statement(self, customer_id: int):
+        async with self:
+            from app.states.auth_state import AuthState
+
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.current_user:
+                return
+            if self.statement_customer_id == customer_id:
+                self.statement_customer_id = None
+                self.statement_rows = []
+                self.statement_loading = False
+                return
+            with rx.session() as session:
+                customer = session.get(Customer, customer_id)
+            if customer is None:
+                return
+            if (
+                not auth_state.is_admin
+                and customer.branch_id != auth_state.current_user["branch_id"]
+            ):
+                yield rx.toast.error("Customer belongs to another branch.")
+                return
+            self.statement_customer_id = customer_id
+            self.statement_customer_name = customer.name
+            self.statement_rows = []
+            self.statement_balance = 0.0
+            self.statement_loading = True
+        with rx.session() as session:
+            for chunk in iter_statement(session, customer_id):
+                async with self:
+                    if self.statement_customer_id != customer_id:
+                        return
+                    self.statement_rows.extend(chunk)
+                    self.statement_balance = chunk[-1]["balance"]
+        async with self:
+            self.statement_loading = False
+
+    @rx.event
+    def close_statement(self):
+        self.statement_customer_id = None
+        self.statement_customer_name = ""
+        self.statement_rows = []
+        self.statement_balance = 0.0
+        self.statement_loading = False
\ No newline at end of file
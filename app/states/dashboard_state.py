@@ -1,6 +1,5 @@
 import reflex as rx
-from sqlmodel import select, func
-from app.db_models import Sale, Customer, Installment, User
+from app.services.reports import kpis
 from typing import TypedDict
 
 
@@ -33,52 +32,8 @@ class DashboardState(rx.State):
         if not auth_state.current_user:
             return
         with rx.session() as session:
-            if auth_state.is_admin:
-                total_revenue = (
-                    session.exec(select(func.sum(Sale.total_amount))).one_or_none() or 0
-                )
-                total_sales = session.exec(select(func.count(Sale.id))).one()
-                total_customers = session.exec(select(func.count(Customer.id))).one()
-                pending_installments = session.exec(
-                    select(func.count(Installment.id)).where(
-                        Installment.status == "Pending"
-                    )
-                ).one()
-                self.admin_metrics = {
-                    "total_revenue": round(total_revenue, 2),
-                    "total_sales": total_sales,
-                    "total_customers": total_customers,
-                    "pending_installments": pending_installments,
-                }
-            else:
-                user_id = auth_state.current_user["id"]
-                branch_id = auth_state.current_user["branch_id"]
-                total_revenue = (
-                    session.exec(
-                        select(func.sum(Sale.total_amount)).where(
-                            Sale.user_id == user_id
-                        )
-                    ).one_or_none()
-                    or 0
-                )
-                total_sales = session.exec(
-                    select(func.count(Sale.id)).where(Sale.user_id == user_id)
-                ).one()
-                total_customers = session.exec(
-                    select(func.count(Customer.id)).where(
-                        Customer.branch_id == branch_id
-                    )
-                ).one()
-                sales_by_user = select(Sale.id).where(Sale.user_id == user_id)
-                pending_installments = session.exec(
-                    select(func.count(Installment.id)).where(
-                        Installment.sale_id.in_(sales_by_user),
-                        Installment.status == "Pending",
-                    )
-                ).one()
-                self.seller_metrics = {
-                    "total_revenue": round(total_revenue, 2),
-                    "total_sales": total_sales,
-                    "total_customers": total_customers,
-                    "pending_installments": pending_installments,
-                }
\ No newline at end of file
+            metrics = kpis(session, auth_state.current_user)
+        if auth_state.is_admin:
+            self.admin_metrics = metrics
+        else:
+            self.seller_metrics = metrics
\ No newline at end of file
@@ -0,0 +1,27 @@
+import reflex as rx
+from urllib.parse import urlencode
+from app.services.access_tokens import (
+    SECRET_KEY_ERROR,
+    issue_download_ticket,
+    tokens_enabled,
+)
+
+
+class ExportState(rx.State):
+    @rx.event
+    async def export(self, dataset: str, fmt: str, customer_id: int | None = None):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user:
+            return rx.toast.error("Please log in to export.")
+        if not tokens_enabled():
+            return rx.toast.error(SECRET_KEY_ERROR)
+        params = {
+            "format": fmt,
+            "download": issue_download_ticket(auth_state.current_user),
+        }
+        if customer_id is not None:
+            params["customer_id"] = customer_id
+        api_url = rx.config.get_config().api_url.rstrip("/")
+        return rx.redirect(f"{api_url}/api/exports/{dataset}?{urlencode(params)}")
\ No newline at end of file
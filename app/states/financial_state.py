@@ -5,33 +5,118 @@ from app.db_models import (
     FinancialPayment,
     FinancialInstallment,
     Customer,
+    Receivable,
     FinancialPaymentDict,
     FinancialInstallmentDict,
+    PaymentPostingResultDict,
+    AmortizationRowDict,
+)
+from app.services.amortization import (
+    amortization_schedule,
+    annual_rate,
+    installment_payment,
+    payoff_amount,
+)
+from app.services.payments import post_installment_payments
+from app.services.receivables import (
+    FINANCIAL_SOURCE,
+    collect_receivables,
+    open_receivables,
+    record_receivables,
+    reserve_credit,
 )
 from datetime import datetime, timedelta
 import sqlalchemy as sa
 
+PAYMENTS_PAGE_SIZE = 20
+INSTALLMENTS_CACHE_SIZE = 8
+
 
 class FinancialState(rx.State):
     financial_payments: list[FinancialPaymentDict] = []
+    payments_page: int = 0
+    payments_total: int = 0
     selected_payment_installments: list[FinancialInstallmentDict] = []
+    _installments_cache: dict[int, list[FinancialInstallmentDict]] = {}
     selected_customer_id: str = ""
     principal_amount: float = 0.0
     interest_rate: float = 0.0
     installment_type: str = "monthly"
+    amortization_method: str = "flat"
     num_installments: int = 12
+    reschedule_installments: int = 6
     show_installments_for_payment_id: int | None = None
+    batch_postings_text: str = ""
+    batch_posting_results: list[PaymentPostingResultDict] = []
+
+    @rx.var
+    def installment_amount(self) -> float:
+        return installment_payment(
+            self.principal_amount,
+            self.interest_rate,
+            self.num_installments,
+            self.amortization_method,
+            self.installment_type,
+        )
 
     @rx.var
     def total_amount(self) -> float:
-        interest = self.principal_amount * (self.interest_rate / 100)
-        return self.principal_amount + interest
+        return round(self.installment_amount * max(self.num_installments, 0), 2)
 
     @rx.var
-    def installment_amount(self) -> float:
-        if self.num_installments > 0:
-            return self.total_amount / self.num_installments
-        return 0.0
+    def plan_preview(self) -> list[AmortizationRowDict]:
+        return amortization_schedule(
+            self.principal_amount,
+            self.interest_rate,
+            self.num_installments,
+            self.amortization_method,
+            self.installment_type,
+        )
+
+    def _selected_plan(self) -> FinancialPaymentDict | None:
+        for plan in self.financial_payments:
+            if plan["id"] == self.show_installments_for_payment_id:
+                return plan
+        return None
+
+    @rx.var
+    def early_payoff_amount(self) -> float:
+        plan = self._selected_plan()
+        if not plan:
+            return 0.0
+        return payoff_amount(
+            plan["principal_amount"],
+            plan["interest_rate"],
+            plan["num_installments"],
+            plan["amortization_method"],
+            plan["installment_type"],
+            plan["paid_count"],
+            sum(
+                installment["amount_paid"]
+                for installment in self.selected_payment_installments
+                if installment["status"] != "Paid"
+            ),
+        )
+
+    @rx.var
+    def rescheduled_installment_amount(self) -> float:
+        plan = self._selected_plan()
+        if not plan:
+            return 0.0
+        return round(
+            installment_payment(
+                self.early_payoff_amount,
+                plan["interest_rate"],
+                self.reschedule_installments,
+                plan["amortization_method"],
+                plan["installment_type"],
+            ),
+            2,
+        )
+
+    @rx.var
+    def payments_page_count(self) -> int:
+        return max(1, -(-self.payments_total // PAYMENTS_PAGE_SIZE))
 
     @rx.event
     async def load_financial_payments(self):
@@ -42,47 +127,88 @@ class FinancialState(rx.State):
             return
         with rx.session() as session:
             query = select(FinancialPayment).options(
-                sa.orm.selectinload(FinancialPayment.customer),
-                sa.orm.selectinload(FinancialPayment.installments),
+                sa.orm.selectinload(FinancialPayment.customer)
             )
+            count_query = select(sa.func.count(FinancialPayment.id))
             if not auth_state.is_admin:
                 query = query.where(
                     FinancialPayment.user_id == auth_state.current_user["id"]
                 )
+                count_query = count_query.where(
+                    FinancialPayment.user_id == auth_state.current_user["id"]
+                )
+            self.payments_total = session.exec(count_query).one()
+            self.payments_page = min(self.payments_page, self.payments_page_count - 1)
             payments = session.exec(
-                query.order_by(FinancialPayment.created_at.desc())
+                query.order_by(
+                    FinancialPayment.created_at.desc(), FinancialPayment.id.desc()
+                )
+                .limit(PAYMENTS_PAGE_SIZE)
+                .offset(self.payments_page * PAYMENTS_PAGE_SIZE)
             ).all()
-            self.financial_payments = []
-            for p in payments:
-                installments_dict = []
-                for i in p.installments:
-                    installments_dict.append(
-                        {
-                            "id": i.id,
-                            "payment_id": i.payment_id,
-                            "installment_number": i.installment_number,
-                            "due_date": i.due_date.isoformat(),
-                            "amount_due": i.amount_due,
-                            "amount_paid": i.amount_paid,
-                            "status": i.status,
-                            "paid_at": i.paid_at.isoformat() if i.paid_at else None,
-                        }
-                    )
-                self.financial_payments.append(
+            self.financial_payments = [
+                {
+                    "id": p.id,
+                    "customer_name": p.customer.name if p.customer else "N/A",
+                    "principal_amount": p.principal_amount,
+                    "interest_rate": annual_rate(
+                        p.interest_rate,
+                        p.rate_basis,
+                        p.num_installments,
+                        p.installment_type,
+                    ),
+                    "total_amount": p.total_amount,
+                    "installment_type": p.installment_type,
+                    "amortization_method": p.amortization_method,
+                    "num_installments": p.num_installments,
+                    "installment_amount": p.installment_amount,
+                    "paid_count": p.paid_count,
+                    "amount_paid": p.amount_paid,
+                    "outstanding": p.outstanding,
+                    "status": p.status,
+                    "created_at": p.created_at.isoformat(),
+                }
+                for p in payments
+            ]
+
+    @rx.event
+    def next_payments_page(self):
+        if self.payments_page + 1 < self.payments_page_count:
+            self.payments_page += 1
+            return FinancialState.load_financial_payments
+
+    @rx.event
+    def previous_payments_page(self):
+        if self.payments_page > 0:
+            self.payments_page -= 1
+            return FinancialState.load_financial_payments
+
+    def _fetch_installments(self, payment_id: int) -> list[FinancialInstallmentDict]:
+        cached = self._installments_cache.pop(payment_id, None)
+        if cached is None:
+            with rx.session() as session:
+                installments = session.exec(
+                    select(FinancialInstallment)
+                    .where(FinancialInstallment.payment_id == payment_id)
+                    .order_by(FinancialInstallment.installment_number)
+                ).all()
+                cached = [
                     {
-                        "id": p.id,
-                        "customer_name": p.customer.name if p.customer else "N/A",
-                        "principal_amount": p.principal_amount,
-                        "interest_rate": p.interest_rate,
-                        "total_amount": p.total_amount,
-                        "installment_type": p.installment_type,
-                        "num_installments": p.num_installments,
-                        "installment_amount": p.installment_amount,
-                        "status": p.status,
-                        "created_at": p.created_at.isoformat(),
-                        "installments": installments_dict,
+                        "id": i.id,
+                        "payment_id": i.payment_id,
+                        "installment_number": i.installment_number,
+                        "due_date": i.due_date.isoformat(),
+                        "amount_due": i.amount_due,
+                        "amount_paid": i.amount_paid,
+                        "status": i.status,
+                        "paid_at": i.paid_at.isoformat() if i.paid_at else None,
                     }
-                )
+                    for i in installments
+                ]
+        self._installments_cache[payment_id] = cached
+        while len(self._installments_cache) > INSTALLMENTS_CACHE_SIZE:
+            self._installments_cache.pop(next(iter(self._installments_cache)))
+        return cached
 
     @rx.event(background=True)
     async def create_financial_payment(self):
@@ -103,6 +229,13 @@ class FinancialState(rx.State):
                 yield rx.toast.error("User is not associated with a branch.")
                 return
             with rx.session() as session:
+                if not reserve_credit(
+                    session, int(self.selected_customer_id), self.total_amount
+                ):
+                    yield rx.toast.error(
+                        "This plan exceeds the customer's credit limit."
+                    )
+                    return
                 new_payment = FinancialPayment(
                     customer_id=int(self.selected_customer_id),
                     user_id=auth_state.current_user["id"],
@@ -111,14 +244,18 @@ class FinancialState(rx.State):
                     interest_rate=self.interest_rate,
                     total_amount=self.total_amount,
                     installment_type=self.installment_type,
+                    amortization_method=self.amortization_method,
                     num_installments=self.num_installments,
                     installment_amount=self.installment_amount,
+                    outstanding=self.total_amount,
                     status="Active",
                 )
                 session.add(new_payment)
                 session.flush()
                 today = datetime.utcnow()
-                for i in range(self.num_installments):
+                installments = []
+                scheduled = 0.0
+                for i, row in enumerate(self.plan_preview):
                     if self.installment_type == "weekly":
                         due_date = today + timedelta(weeks=i + 1)
                     else:
@@ -127,14 +264,28 @@ class FinancialState(rx.State):
                         payment_id=new_payment.id,
                         installment_number=i + 1,
                         due_date=due_date,
-                        amount_due=self.installment_amount,
+                        amount_due=row["payment"]
+                        if i + 1 < self.num_installments
+                        else round(self.total_amount - scheduled, 2),
                     )
+                    scheduled += row["payment"]
                     session.add(installment)
+                    installments.append(installment)
+                record_receivables(
+                    session,
+                    FINANCIAL_SOURCE,
+                    installments,
+                    customer_id=new_payment.customer_id,
+                    user_id=new_payment.user_id,
+                    branch_id=new_payment.branch_id,
+                    financial_payment_id=new_payment.id,
+                )
                 session.commit()
                 self.selected_customer_id = ""
                 self.principal_amount = 0.0
                 self.interest_rate = 0.0
                 self.num_installments = 12
+                self.amortization_method = "flat"
         yield FinancialState.load_financial_payments
         yield rx.toast.success("Financial payment plan created!")
 
@@ -145,30 +296,143 @@ class FinancialState(rx.State):
             self.selected_payment_installments = []
         else:
             self.show_installments_for_payment_id = payment_id
-            for payment in self.financial_payments:
-                if payment["id"] == payment_id:
-                    self.selected_payment_installments = payment["installments"]
-                    break
+            self.selected_payment_installments = self._fetch_installments(payment_id)
+
+    def _patch_plan(self, payment_id: int, **values):
+        for plan in self.financial_payments:
+            if plan["id"] == payment_id:
+                plan.update(values)
+                break
 
     @rx.event(background=True)
     async def mark_installment_paid(self, installment_id: int):
         async with self:
             with rx.session() as session:
                 installment = session.get(FinancialInstallment, installment_id)
-                if installment:
-                    installment.status = "Paid"
-                    installment.amount_paid = installment.amount_due
-                    installment.paid_at = datetime.utcnow()
-                    session.add(installment)
-                    payment = session.get(FinancialPayment, installment.payment_id)
-                    if payment:
-                        all_paid = all(
-                            (inst.status == "Paid" for inst in payment.installments)
-                        )
-                        if all_paid:
-                            payment.status = "Completed"
-                            session.add(payment)
-                    session.commit()
+                if not installment:
+                    yield rx.toast.error("Installment not found.")
+                    return
+                payment_id = installment.payment_id
+                collections = open_receivables(
+                    session,
+                    Receivable.source == FINANCIAL_SOURCE,
+                    Receivable.source_id == installment_id,
+                )
+                if not collections:
+                    yield rx.toast.error("Installment is already paid.")
+                    return
+                for collection in collections:
+                    collection["amount"] = (
+                        collection["amount_due"] - collection["amount_paid"]
+                    )
+                try:
+                    collect_receivables(session, collections, datetime.utcnow())
+                except ValueError as e:
+                    session.rollback()
+                    yield rx.toast.error(str(e))
+                    return
+                paid_count, amount_paid, outstanding, status = session.exec(
+                    select(
+                        FinancialPayment.paid_count,
+                        FinancialPayment.amount_paid,
+                        FinancialPayment.outstanding,
+                        FinancialPayment.status,
+                    ).where(FinancialPayment.id == payment_id)
+                ).one()
+                session.commit()
+            self._patch_plan(
+                payment_id,
+                paid_count=paid_count,
+                amount_paid=amount_paid,
+                outstanding=outstanding,
+                status=status,
+            )
+            self._installments_cache.pop(payment_id, None)
+            if self.show_installments_for_payment_id == payment_id:
+                self.selected_payment_installments = self._fetch_installments(
+                    payment_id
+                )
+        yield rx.toast.success("Installment marked as paid.")
+
+    def _parse_batch_postings(self, session) -> tuple[list[dict], list[str]]:
+        postings, errors, names = [], [], set()
+        for number, line in enumerate(self.batch_postings_text.splitlines(), 1):
+            if not line.strip():
+                continue
+            reference, _, amount = line.rpartition(",")
+            reference = reference.strip()
+            try:
+                amount = float(amount)
+            except ValueError:
+                errors.append(f"Line {number}: invalid amount.")
+                continue
+            if not reference:
+                errors.append(f"Line {number}: missing installment or customer.")
+                continue
+            posting = {"reference": reference, "amount": amount}
+            if reference.startswith("#"):
+                if not reference[1:].isdigit():
+                    errors.append(f"Line {number}: invalid installment id.")
+                    continue
+                posting["installment_id"] = int(reference[1:])
+            else:
+                names.add(reference)
+            postings.append(posting)
+        customers: dict[str, list[int]] = {}
+        if names:
+            for customer_id, name in session.exec(
+                select(Customer.id, Customer.name).where(Customer.name.in_(names))
+            ).all():
+                customers.setdefault(name, []).append(customer_id)
+        for posting in postings:
+            if "installment_id" in posting:
+                continue
+            matches = customers.get(posting["reference"], [])
+            if len(matches) == 1:
+                posting["customer_id"] = matches[0]
+            else:
+                posting["customer_id"] = None
+        return postings, errors
+
+    @rx.event(background=True)
+    async def post_payment_batch(self):
+        async with self:
+            from app.states.auth_state import AuthState
+
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.current_user:
+                return
+            with rx.session() as session:
+                postings, errors = self._parse_batch_postings(session)
+                if errors:
+                    yield rx.toast.error(" ".join(errors))
+                    return
+                if not postings:
+                    yield rx.toast.error("Enter at least one payment.")
+                    return
+                try:
+                    results = post_installment_payments(
+                        session,
+                        postings,
+                        user_id=None
+                        if auth_state.is_admin
+                        else auth_state.current_user["id"],
+                    )
+                except ValueError as e:
+                    session.rollback()
+                    yield rx.toast.error(str(e))
+                    return
+                for posting, result in zip(postings, results):
+                    if "customer_id" in posting and posting["customer_id"] is None:
+                        result["error"] = "Unknown or ambiguous customer."
+                session.commit()
+            self.batch_posting_results = results
+            self._installments_cache.clear()
+            if self.show_installments_for_payment_id is not None:
+                self.selected_payment_installments = self._fetch_installments(
+                    self.show_installments_for_payment_id
+                )
+            applied = sum(r["applied"] for r in results)
+            self.batch_postings_text = ""
         yield FinancialState.load_financial_payments
-        yield FinancialState.toggle_installments_view(installment.payment_id)
-        yield rx.toast.success("Installment marked as paid.")
\ No newline at end of file
+        yield rx.toast.success(f"Posted ${applied:.2f} from {len(results)} postings.")
\ No newline at end of file
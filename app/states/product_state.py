@@ -1,43 +1,397 @@
 import reflex as rx
+from typing import TypedDict
 from sqlmodel import select, and_
-from app.db_models import Product, Stock, Branch, ProductDict, StockDict
+from app.db_models import (
+    Product,
+    Stock,
+    Branch,
+    ReorderSuggestion,
+    ProductDict,
+    ReorderSuggestionDict,
+    StockMatrixRowDict,
+    LowStockDict,
+    StockCountResultDict,
+)
 import sqlalchemy as sa
+from app.services.data_versions import bump_data_versions
+from app.services.projections import product_rows
+import asyncio
+import csv
+import io
 import logging
 
+CATALOG_PAGE_SIZE = 25
+STOCK_MATRIX_PAGE_SIZE = 25
+LOW_STOCK_FEED_SIZE = 20
+REORDER_SUGGESTIONS_SIZE = 20
+STOCK_COUNT_UPLOAD_ID = "stock_count_upload"
+STOCK_COUNT_CHUNK_SIZE = 1000
+stock_count_metadata = sa.MetaData()
+stock_count_staging = sa.Table(
+    "stock_count_staging",
+    stock_count_metadata,
+    sa.Column("product_name", sa.String, nullable=False),
+    sa.Column("branch_name", sa.String, nullable=False),
+    sa.Column("counted", sa.Integer, nullable=False),
+    sa.Column("product_id", sa.Integer),
+    sa.Column("branch_id", sa.Integer),
+    prefixes=["TEMPORARY"],
+)
+stock_count_totals = sa.Table(
+    "stock_count_totals",
+    stock_count_metadata,
+    sa.Column("product_id", sa.Integer, primary_key=True),
+    sa.Column("branch_id", sa.Integer, primary_key=True),
+    sa.Column("counted", sa.Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+class CatalogCursor(TypedDict):
+    name: str
+    id: int
+
 
 class ProductState(rx.State):
     products: list[ProductDict] = []
-    stocks: list[StockDict] = []
+    product_categories: list[str] = []
+    catalog_products: list[ProductDict] = []
+    catalog_search: str = ""
+    catalog_category: str = ""
+    catalog_in_stock_only: bool = False
+    catalog_cursors: list[CatalogCursor] = []
+    catalog_has_next: bool = False
+    stock_matrix_branches: list[str] = []
+    stock_matrix_rows: list[StockMatrixRowDict] = []
+    stock_matrix_category: str = ""
+    stock_matrix_page: int = 0
+    stock_matrix_total: int = 0
     new_product_name: str = ""
     new_product_description: str = ""
     new_product_category: str = ""
     new_product_price: str = ""
+    new_product_reorder_point: str = "10"
     selected_product_id: str = ""
     selected_branch_id: str = ""
     stock_quantity: int = 0
+    stock_reorder_point: str = ""
     transfer_from_branch_id: str = ""
     transfer_to_branch_id: str = ""
     transfer_product_id: str = ""
     transfer_quantity: int = 1
+    stock_count_result: StockCountResultDict | None = None
+    low_stock_items: list[LowStockDict] = []
+    low_stock_count: int = 0
+    reorder_suggestions: list[ReorderSuggestionDict] = []
+    reorder_suggestions_computed_at: str = ""
+
+    @rx.var
+    def stock_matrix_page_count(self) -> int:
+        return max(1, -(-self.stock_matrix_total // STOCK_MATRIX_PAGE_SIZE))
 
     @rx.event
     async def load_products_and_stock(self):
         with rx.session() as session:
-            all_products = session.exec(select(Product)).all()
-            self.products = [p.dict() for p in all_products]
-            stock_query = select(Stock).options(
-                sa.orm.selectinload(Stock.product), sa.orm.selectinload(Stock.branch)
+            self.products = product_rows(session)
+        yield ProductState.load_stock_matrix
+        yield ProductState.load_low_stock
+
+    def _load_product_categories(self, session) -> list[str]:
+        return [
+            c
+            for c in session.exec(
+                select(Product.category).distinct().order_by(Product.category)
+            ).all()
+            if c
+        ]
+
+    @rx.event
+    async def load_catalog(self):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user:
+            return
+        with rx.session() as session:
+            self.product_categories = self._load_product_categories(session)
+            query = select(Product)
+            if self.catalog_search:
+                prefix = self.catalog_search.lower()
+                name = sa.func.lower(Product.name)
+                query = query.where(
+                    name >= prefix, name < prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                )
+            if self.catalog_category:
+                query = query.where(Product.category == self.catalog_category)
+            if self.catalog_in_stock_only:
+                in_stock = sa.exists().where(
+                    Stock.product_id == Product.id, Stock.quantity > 0
+                )
+                if auth_state.current_user["branch_id"]:
+                    in_stock = in_stock.where(
+                        Stock.branch_id == auth_state.current_user["branch_id"]
+                    )
+                query = query.where(in_stock)
+            if self.catalog_cursors:
+                cursor = self.catalog_cursors[-1]
+                query = query.where(
+                    sa.tuple_(Product.name, Product.id)
+                    > sa.tuple_(cursor["name"], cursor["id"])
+                )
+            page = session.exec(
+                query.order_by(Product.name, Product.id).limit(CATALOG_PAGE_SIZE + 1)
+            ).all()
+            self.catalog_has_next = len(page) > CATALOG_PAGE_SIZE
+            self.catalog_products = [p.dict() for p in page[:CATALOG_PAGE_SIZE]]
+
+    @rx.event
+    def set_catalog_search(self, search: str):
+        self.catalog_search = search.strip()
+        self.catalog_cursors = []
+        return ProductState.load_catalog
+
+    @rx.event
+    def set_catalog_category(self, category: str):
+        self.catalog_category = category
+        self.catalog_cursors = []
+        return ProductState.load_catalog
+
+    @rx.event
+    def set_catalog_in_stock_only(self, in_stock_only: bool):
+        self.catalog_in_stock_only = in_stock_only
+        self.catalog_cursors = []
+        return ProductState.load_catalog
+
+    @rx.event
+    def next_catalog_page(self):
+        if self.catalog_has_next and self.catalog_products:
+            last = self.catalog_products[-1]
+            self.catalog_cursors.append({"name": last["name"], "id": last["id"]})
+            return ProductState.load_catalog
+
+    @rx.event
+    def previous_catalog_page(self):
+        if self.catalog_cursors:
+            self.catalog_cursors.pop()
+            return ProductState.load_catalog
+
+    @rx.event
+    async def load_reorder_suggestions(self):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user:
+            return
+        source_branch = sa.orm.aliased(Branch)
+        with rx.session() as session:
+            query = (
+                select(
+                    Product.name,
+                    Branch.name,
+                    ReorderSuggestion.on_hand,
+                    ReorderSuggestion.daily_velocity,
+                    ReorderSuggestion.days_of_cover,
+                    ReorderSuggestion.reorder_quantity,
+                    ReorderSuggestion.transfer_quantity,
+                    source_branch.name,
+                    ReorderSuggestion.computed_at,
+                )
+                .join(Product, Product.id == ReorderSuggestion.product_id)
+                .join(Branch, Branch.id == ReorderSuggestion.branch_id)
+                .outerjoin(
+                    source_branch,
+                    source_branch.id == ReorderSuggestion.transfer_from_branch_id,
+                )
+            )
+            if not auth_state.is_admin:
+                query = query.where(
+                    ReorderSuggestion.branch_id == auth_state.current_user["branch_id"]
+                )
+            rows = session.exec(
+                query.order_by(
+                    ReorderSuggestion.days_of_cover.is_(None),
+                    ReorderSuggestion.days_of_cover,
+                    ReorderSuggestion.reorder_quantity.desc(),
+                ).limit(REORDER_SUGGESTIONS_SIZE)
+            ).all()
+            self.reorder_suggestions = [
+                {
+                    "product_name": row[0],
+                    "branch_name": row[1],
+                    "on_hand": row[2],
+                    "daily_velocity": row[3],
+                    "days_of_cover": row[4],
+                    "reorder_quantity": row[5],
+                    "transfer_quantity": row[6],
+                    "transfer_from_branch_name": row[7],
+                }
+                for row in rows
+            ]
+            self.reorder_suggestions_computed_at = (
+                rows[0][8].isoformat() if rows else ""
+            )
+
+    @rx.event(background=True)
+    async def recompute_reorder_suggestions(self):
+        from app.services.replenishment import refresh_reorder_suggestions
+
+        count = await asyncio.to_thread(refresh_reorder_suggestions)
+        yield ProductState.load_reorder_suggestions
+        yield rx.toast.success(f"{count} reorder suggestions computed.")
+
+    def _default_reorder_point(self, session, product_id: int) -> int:
+        return (
+            session.exec(
+                select(Product.reorder_point).where(Product.id == product_id)
+            ).first()
+            or 0
+        )
+
+    @rx.event
+    async def load_low_stock(self):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user:
+            return
+        is_low = Stock.quantity < Stock.reorder_point
+        with rx.session() as session:
+            count_query = select(sa.func.count(Stock.id)).where(is_low)
+            feed_query = (
+                select(
+                    Stock.id,
+                    Product.name,
+                    Branch.name,
+                    Stock.quantity,
+                    Stock.reorder_point,
+                )
+                .join(Product, Product.id == Stock.product_id)
+                .join(Branch, Branch.id == Stock.branch_id)
+                .where(is_low)
+            )
+            if not auth_state.is_admin:
+                branch_id = auth_state.current_user["branch_id"]
+                count_query = count_query.where(Stock.branch_id == branch_id)
+                feed_query = feed_query.where(Stock.branch_id == branch_id)
+            self.low_stock_count = session.exec(count_query).one()
+            self.low_stock_items = [
+                {
+                    "stock_id": stock_id,
+                    "product_name": product_name,
+                    "branch_name": branch_name,
+                    "quantity": quantity,
+                    "reorder_point": reorder_point,
+                }
+                for stock_id, product_name, branch_name, quantity, reorder_point in session.exec(
+                    feed_query.order_by(
+                        Stock.quantity - Stock.reorder_point, Stock.id
+                    ).limit(LOW_STOCK_FEED_SIZE)
+                ).all()
+            ]
+
+    @rx.event
+    async def load_stock_matrix(self):
+        with rx.session() as session:
+            branches = session.exec(
+                select(Branch.id, Branch.name).order_by(Branch.name)
+            ).all()
+            self.product_categories = self._load_product_categories(session)
+            product_filter = (
+                Product.category == self.stock_matrix_category
+                if self.stock_matrix_category
+                else sa.true()
+            )
+            self.stock_matrix_total = session.exec(
+                select(sa.func.count(Product.id)).where(product_filter)
+            ).one()
+            self.stock_matrix_page = min(
+                self.stock_matrix_page, self.stock_matrix_page_count - 1
+            )
+            page_products = (
+                select(Product.id, Product.name, Product.category)
+                .where(product_filter)
+                .order_by(Product.name, Product.id)
+                .limit(STOCK_MATRIX_PAGE_SIZE)
+                .offset(self.stock_matrix_page * STOCK_MATRIX_PAGE_SIZE)
+                .subquery()
+            )
+            branch_columns = []
+            for branch_id, _ in branches:
+                branch_columns.append(
+                    sa.func.coalesce(
+                        sa.func.sum(
+                            sa.case(
+                                (Stock.branch_id == branch_id, Stock.quantity), else_=0
+                            )
+                        ),
+                        0,
+                    )
+                )
+                branch_columns.append(
+                    sa.func.coalesce(
+                        sa.func.max(
+                            sa.case(
+                                (
+                                    and_(
+                                        Stock.branch_id == branch_id,
+                                        Stock.quantity < Stock.reorder_point,
+                                    ),
+                                    1,
+                                ),
+                                else_=0,
+                            )
+                        ),
+                        0,
+                    )
+                )
+            matrix_query = (
+                select(
+                    page_products.c.id,
+                    page_products.c.name,
+                    page_products.c.category,
+                    sa.func.coalesce(sa.func.sum(Stock.quantity), 0),
+                    *branch_columns,
+                )
+                .select_from(page_products)
+                .outerjoin(Stock, Stock.product_id == page_products.c.id)
+                .group_by(
+                    page_products.c.id, page_products.c.name, page_products.c.category
+                )
+                .order_by(page_products.c.name, page_products.c.id)
             )
-            all_stocks = session.exec(stock_query).all()
-            self.stocks = [
+            self.stock_matrix_branches = [name for _, name in branches]
+            self.stock_matrix_rows = [
                 {
-                    **s.dict(),
-                    "product_name": s.product.name if s.product else "N/A",
-                    "branch_name": s.branch.name if s.branch else "N/A",
+                    "product_id": row[0],
+                    "product_name": row[1],
+                    "category": row[2],
+                    "total": row[3],
+                    "cells": [
+                        {"quantity": quantity, "is_low": bool(is_low)}
+                        for quantity, is_low in zip(row[4::2], row[5::2])
+                    ],
                 }
-                for s in all_stocks
+                for row in session.exec(matrix_query).all()
             ]
 
+    @rx.event
+    def set_stock_matrix_category(self, category: str):
+        self.stock_matrix_category = category
+        self.stock_matrix_page = 0
+        return ProductState.load_stock_matrix
+
+    @rx.event
+    def next_stock_matrix_page(self):
+        if self.stock_matrix_page + 1 < self.stock_matrix_page_count:
+            self.stock_matrix_page += 1
+            return ProductState.load_stock_matrix
+
+    @rx.event
+    def previous_stock_matrix_page(self):
+        if self.stock_matrix_page > 0:
+            self.stock_matrix_page -= 1
+            return ProductState.load_stock_matrix
+
     @rx.event(background=True)
     async def add_product(self):
         async with self:
@@ -52,20 +406,31 @@ class ProductState(rx.State):
                 logging.exception(f"Error: {e}")
                 yield rx.toast.error("Invalid price.")
                 return
+            try:
+                reorder_point = int(self.new_product_reorder_point or 0)
+                if reorder_point < 0:
+                    raise ValueError("Reorder point cannot be negative")
+            except ValueError as e:
+                logging.exception(f"Error: {e}")
+                yield rx.toast.error("Invalid reorder point.")
+                return
             with rx.session() as session:
                 new_product = Product(
                     name=self.new_product_name,
                     description=self.new_product_description,
                     category=self.new_product_category,
                     price=price,
+                    reorder_point=reorder_point,
                 )
                 session.add(new_product)
+                bump_data_versions(session, Product)
                 session.commit()
                 self.new_product_name = ""
                 self.new_product_description = ""
                 self.new_product_category = ""
                 self.new_product_price = ""
-        yield ProductState.load_products_and_stock
+                self.new_product_reorder_point = "10"
+        yield ProductState.load_catalog
         yield rx.toast.success("Product added successfully!")
 
     @rx.event(background=True)
@@ -83,19 +448,36 @@ class ProductState(rx.State):
                 product = session.get(Product, product_id)
                 if product:
                     session.delete(product)
+                    bump_data_versions(session, Product)
                     session.commit()
-        yield ProductState.load_products_and_stock
+        yield ProductState.load_catalog
         yield rx.toast.info("Product deleted.")
 
     @rx.event(background=True)
     async def update_stock(self):
         async with self:
+            from app.states.auth_state import AuthState
+
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.is_admin:
+                yield rx.toast.error("Only admins can update stock.")
+                return
             if not self.selected_product_id or not self.selected_branch_id:
                 yield rx.toast.error("Please select a product and a branch.")
                 return
             product_id = int(self.selected_product_id)
             branch_id = int(self.selected_branch_id)
             quantity = int(self.stock_quantity)
+            reorder_point = None
+            if self.stock_reorder_point:
+                try:
+                    reorder_point = int(self.stock_reorder_point)
+                    if reorder_point < 0:
+                        raise ValueError("Reorder point cannot be negative")
+                except ValueError as e:
+                    logging.exception(f"Error: {e}")
+                    yield rx.toast.error("Invalid reorder point.")
+                    return
             with rx.session() as session:
                 stock_record = session.exec(
                     select(Stock).where(
@@ -108,9 +490,15 @@ class ProductState(rx.State):
                     stock_record.quantity = quantity
                 else:
                     stock_record = Stock(
-                        product_id=product_id, branch_id=branch_id, quantity=quantity
+                        product_id=product_id,
+                        branch_id=branch_id,
+                        quantity=quantity,
+                        reorder_point=self._default_reorder_point(session, product_id),
                     )
+                if reorder_point is not None:
+                    stock_record.reorder_point = reorder_point
                 session.add(stock_record)
+                bump_data_versions(session, Stock)
                 session.commit()
         yield ProductState.load_products_and_stock
         yield rx.toast.success("Stock updated.")
@@ -118,6 +506,12 @@ class ProductState(rx.State):
     @rx.event(background=True)
     async def perform_stock_transfer(self):
         async with self:
+            from app.states.auth_state import AuthState
+
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.is_admin:
+                yield rx.toast.error("Only admins can transfer stock.")
+                return
             from_branch_id = int(self.transfer_from_branch_id)
             to_branch_id = int(self.transfer_to_branch_id)
             product_id = int(self.transfer_product_id)
@@ -152,11 +546,157 @@ class ProductState(rx.State):
                 ).first()
                 if not to_stock:
                     to_stock = Stock(
-                        branch_id=to_branch_id, product_id=product_id, quantity=0
+                        branch_id=to_branch_id,
+                        product_id=product_id,
+                        quantity=0,
+                        reorder_point=self._default_reorder_point(session, product_id),
                     )
                     session.add(to_stock)
                 from_stock.quantity -= quantity_to_transfer
                 to_stock.quantity += quantity_to_transfer
+                bump_data_versions(session, Stock)
                 session.commit()
         yield ProductState.load_products_and_stock
-        yield rx.toast.success("Stock transfer completed!")
\ No newline at end of file
+        yield rx.toast.success("Stock transfer completed!")
+
+    def _stage_stock_count(self, connection, upload_file) -> tuple[int, int]:
+        reader = csv.reader(
+            io.TextIOWrapper(upload_file.file, encoding="utf-8-sig", newline="")
+        )
+        staged = 0
+        malformed = 0
+        batch = []
+        for line_number, row in enumerate(reader):
+            if not row:
+                continue
+            if len(row) < 3 or not row[0].strip() or not row[1].strip():
+                malformed += 1
+                continue
+            try:
+                counted = int(row[2].strip())
+            except ValueError:
+                if line_number > 0:
+                    malformed += 1
+                continue
+            if counted < 0:
+                malformed += 1
+                continue
+            batch.append(
+                {
+                    "product_name": row[0].strip(),
+                    "branch_name": row[1].strip(),
+                    "counted": counted,
+                }
+            )
+            if len(batch) >= STOCK_COUNT_CHUNK_SIZE:
+                connection.execute(stock_count_staging.insert(), batch)
+                staged += len(batch)
+                batch = []
+        if batch:
+            connection.execute(stock_count_staging.insert(), batch)
+            staged += len(batch)
+        return (staged, malformed)
+
+    def _apply_stock_count(self, connection) -> tuple[int, int, int]:
+        staging = stock_count_staging
+        totals = stock_count_totals
+        connection.execute(
+            staging.update().values(
+                product_id=sa.select(sa.func.min(Product.id))
+                .where(Product.name == staging.c.product_name)
+                .scalar_subquery(),
+                branch_id=sa.select(Branch.id)
+                .where(Branch.name == staging.c.branch_name)
+                .scalar_subquery(),
+            )
+        )
+        unmatched = connection.execute(
+            sa.select(sa.func.count()).where(
+                sa.or_(staging.c.product_id.is_(None), staging.c.branch_id.is_(None))
+            )
+        ).scalar_one()
+        connection.execute(
+            totals.insert().from_select(
+                ["product_id", "branch_id", "counted"],
+                sa.select(
+                    staging.c.product_id,
+                    staging.c.branch_id,
+                    sa.func.sum(staging.c.counted),
+                )
+                .where(
+                    staging.c.product_id.is_not(None), staging.c.branch_id.is_not(None)
+                )
+                .group_by(staging.c.product_id, staging.c.branch_id),
+            )
+        )
+        matches_stock = and_(
+            Stock.product_id == totals.c.product_id,
+            Stock.branch_id == totals.c.branch_id,
+        )
+        variance = totals.c.counted - sa.func.coalesce(Stock.quantity, 0)
+        adjusted, net_variance = connection.execute(
+            sa.select(
+                sa.func.count(),
+                sa.func.coalesce(sa.func.sum(variance), 0),
+            )
+            .select_from(totals)
+            .outerjoin(Stock, matches_stock)
+            .where(sa.or_(Stock.id.is_(None), variance != 0))
+        ).one()
+        counted_quantity = (
+            sa.select(totals.c.counted).where(matches_stock).scalar_subquery()
+        )
+        connection.execute(
+            sa.update(Stock)
+            .where(sa.exists().where(matches_stock, totals.c.counted != Stock.quantity))
+            .values(quantity=counted_quantity)
+        )
+        connection.execute(
+            sa.insert(Stock).from_select(
+                ["product_id", "branch_id", "quantity", "reorder_point"],
+                sa.select(
+                    totals.c.product_id,
+                    totals.c.branch_id,
+                    totals.c.counted,
+                    Product.reorder_point,
+                )
+                .join(Product, Product.id == totals.c.product_id)
+                .where(~sa.exists().where(matches_stock)),
+            )
+        )
+        return (adjusted, unmatched, net_variance)
+
+    @rx.event
+    async def handle_stock_count_upload(self, files: list[rx.UploadFile]):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.is_admin:
+            yield rx.toast.error("Only admins can import stock counts.")
+            return
+        if not files:
+            yield rx.toast.error("Please select a stock count CSV file.")
+            return
+        with rx.session() as session:
+            connection = session.connection()
+            stock_count_metadata.drop_all(connection, checkfirst=True)
+            stock_count_metadata.create_all(connection)
+            rows_read = 0
+            malformed = 0
+            for upload_file in files:
+                staged, skipped = self._stage_stock_count(connection, upload_file)
+                rows_read += staged
+                malformed += skipped
+            adjusted, unmatched, net_variance = self._apply_stock_count(connection)
+            stock_count_metadata.drop_all(connection)
+            bump_data_versions(session, Stock)
+            session.commit()
+        self.stock_count_result = {
+            "rows_read": rows_read + malformed,
+            "rows_applied": adjusted,
+            "rows_unmatched": unmatched + malformed,
+            "net_variance": net_variance,
+        }
+        yield rx.clear_selected_files(STOCK_COUNT_UPLOAD_ID)
+        yield ProductState.load_products_and_stock
+        yield rx.toast.success(f"Stock count applied: {adjusted} adjustments.")
\ No newline at end of file
@@ -0,0 +1,177 @@
+import reflex as rx
+from sqlmodel import select
+from app.db_models import (
+    FinancialPayment,
+    Receivable,
+    Customer,
+    AgingRowDict,
+    AgingItemDict,
+    CashInWeekDict,
+)
+from app.services.amortization import annual_rate, project_cash_in
+from app.services.receivables import OPEN_STATUSES
+from app.services.reports import AGING_BUCKETS, aging_bounds, aging_rows, due_between
+from datetime import datetime, timedelta
+
+AGING_ITEMS_PAGE_SIZE = 50
+CASH_IN_WEEKS = 12
+
+
+class ReceivablesState(rx.State):
+    aging_rows: list[AgingRowDict] = []
+    aging_as_of: str = ""
+    aging_branch_id: int | None = None
+    aging_user_id: int | None = None
+    aging_bucket: str = ""
+    aging_items: list[AgingItemDict] = []
+    aging_items_page: int = 0
+    aging_items_has_next: bool = False
+    cash_in_projection: list[CashInWeekDict] = []
+
+    @rx.var
+    def aging_totals(self) -> dict[str, float]:
+        return {
+            key: round(sum(row[key] for row in self.aging_rows), 2)
+            for key in [*AGING_BUCKETS, "total"]
+        }
+
+    @rx.var
+    def aging_bucket_label(self) -> str:
+        return AGING_BUCKETS.get(self.aging_bucket, "")
+
+    @rx.event
+    async def load_aging_report(self):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user:
+            return
+        now = datetime.utcnow()
+        with rx.session() as session:
+            self.aging_rows = aging_rows(
+                session,
+                now,
+                user_id=None if auth_state.is_admin else auth_state.current_user["id"],
+            )
+        self.aging_as_of = now.isoformat()
+        if self.aging_bucket:
+            self._load_aging_items()
+
+    def _load_aging_items(self):
+        now = datetime.fromisoformat(self.aging_as_of)
+        lower, upper = aging_bounds(now)[self.aging_bucket]
+        query = (
+            select(Receivable, Customer.name)
+            .join(Customer, Customer.id == Receivable.customer_id)
+            .where(
+                Receivable.status.in_(OPEN_STATUSES),
+                Receivable.branch_id == self.aging_branch_id,
+                Receivable.user_id == self.aging_user_id,
+                *due_between(lower, upper),
+            )
+            .order_by(Receivable.due_date, Receivable.id)
+            .offset(self.aging_items_page * AGING_ITEMS_PAGE_SIZE)
+            .limit(AGING_ITEMS_PAGE_SIZE + 1)
+        )
+        with rx.session() as session:
+            rows = session.exec(query).all()
+        self.aging_items_has_next = len(rows) > AGING_ITEMS_PAGE_SIZE
+        self.aging_items = [
+            {
+                "id": receivable.id,
+                "customer_name": customer_name,
+                "source": receivable.source,
+                "installment_number": receivable.installment_number,
+                "due_date": receivable.due_date.isoformat(),
+                "days_past_due": max(0, (now - receivable.due_date).days),
+                "outstanding": round(receivable.amount_due - receivable.amount_paid, 2),
+                "status": receivable.status,
+            }
+            for receivable, customer_name in rows[:AGING_ITEMS_PAGE_SIZE]
+        ]
+
+    @rx.event
+    async def drill_down(self, branch_id: int, user_id: int, bucket: str):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user or (
+            not auth_state.is_admin and user_id != auth_state.current_user["id"]
+        ):
+            return
+        if (self.aging_branch_id, self.aging_user_id, self.aging_bucket) == (
+            branch_id,
+            user_id,
+            bucket,
+        ):
+            return ReceivablesState.close_drill_down
+        self.aging_branch_id = branch_id
+        self.aging_user_id = user_id
+        self.aging_bucket = bucket
+        self.aging_items_page = 0
+        self._load_aging_items()
+
+    @rx.event
+    def close_drill_down(self):
+        self.aging_branch_id = None
+        self.aging_user_id = None
+        self.aging_bucket = ""
+        self.aging_items = []
+        self.aging_items_page = 0
+        self.aging_items_has_next = False
+
+    @rx.event
+    def next_aging_items_page(self):
+        if self.aging_items_has_next:
+            self.aging_items_page += 1
+            self._load_aging_items()
+
+    @rx.event
+    def previous_aging_items_page(self):
+        if self.aging_items_page > 0:
+            self.aging_items_page -= 1
+            self._load_aging_items()
+
+    @rx.event
+    async def load_cash_in_projection(self):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user:
+            return
+        query = select(
+            FinancialPayment.principal_amount,
+            FinancialPayment.interest_rate,
+            FinancialPayment.num_installments,
+            FinancialPayment.amortization_method,
+            FinancialPayment.installment_type,
+            FinancialPayment.created_at,
+            FinancialPayment.paid_count,
+            FinancialPayment.rate_basis,
+        ).where(FinancialPayment.status == "Active")
+        if not auth_state.is_admin:
+            query = query.where(
+                FinancialPayment.user_id == auth_state.current_user["id"]
+            )
+        with rx.session() as session:
+            rows = session.connection().execute(query).all()
+        plans = [
+            (
+                principal,
+                annual_rate(rate, basis, periods, frequency),
+                periods,
+                method,
+                frequency,
+                created,
+                paid,
+            )
+            for principal, rate, periods, method, frequency, created, paid, basis in rows
+        ]
+        now = datetime.utcnow()
+        self.cash_in_projection = [
+            {
+                "week_start": (now + timedelta(weeks=week)).date().isoformat(),
+                "expected": expected,
+            }
+            for week, expected in enumerate(project_cash_in(plans, now, CASH_IN_WEEKS))
+        ]
\ No newline at end of file
@@ -1,20 +1,15 @@
 import reflex as rx
 from typing import TypedDict, Any
-from sqlmodel import select, and_
 from app.db_models import (
-    Sale,
-    SaleDetail,
     Product,
-    Stock,
     Customer,
     User,
     Branch,
     SaleDict,
-    Installment,
 )
-from datetime import datetime, timedelta
-import sqlalchemy as sa
 import logging
+from app.services.sales import cancel_sale, write_sale
+from app.services.projections import sale_rows
 
 
 class CartItem(TypedDict):
@@ -54,27 +49,10 @@ class SalesState(rx.State):
         if not auth_state.current_user:
             return
         with rx.session() as session:
-            query = select(Sale).options(
-                sa.orm.selectinload(Sale.customer),
-                sa.orm.selectinload(Sale.user),
-                sa.orm.selectinload(Sale.branch),
+            self.sales = sale_rows(
+                session,
+                user_id=None if auth_state.is_admin else auth_state.current_user["id"],
             )
-            if not auth_state.is_admin:
-                query = query.where(Sale.user_id == auth_state.current_user["id"])
-            all_sales = session.exec(query.order_by(Sale.created_at.desc())).all()
-            self.sales = [
-                {
-                    "id": s.id,
-                    "customer_name": s.customer.name if s.customer else "N/A",
-                    "user_username": s.user.username if s.user else "N/A",
-                    "branch_name": s.branch.name if s.branch else "N/A",
-                    "total_amount": s.total_amount,
-                    "payment_method": s.payment_method,
-                    "status": s.status,
-                    "created_at": s.created_at.isoformat(),
-                }
-                for s in all_sales
-            ]
 
     @rx.event
     def add_to_cart(self):
@@ -123,69 +101,51 @@ class SalesState(rx.State):
                 yield rx.toast.error("User is not associated with a branch.")
                 return
             with rx.session() as session:
-                for item in self.cart:
-                    stock = session.exec(
-                        select(Stock).where(
-                            and_(
-                                Stock.product_id == item["product_id"],
-                                Stock.branch_id == branch_id,
-                            )
-                        )
-                    ).first()
-                    if not stock or stock.quantity < item["quantity"]:
-                        yield rx.toast.error(
-                            f"Not enough stock for {item['product_name']}."
-                        )
-                        return
-                sale_status = (
-                    "Paid" if self.payment_method in ["cash", "card"] else "Pending"
-                )
-                new_sale = Sale(
-                    customer_id=int(self.selected_customer_id),
-                    user_id=auth_state.current_user["id"],
-                    branch_id=branch_id,
-                    total_amount=self.cart_total,
-                    payment_method=self.payment_method,
-                    status=sale_status,
-                )
-                session.add(new_sale)
-                session.flush()
-                for item in self.cart:
-                    sale_detail = SaleDetail(
-                        sale_id=new_sale.id,
-                        product_id=item["product_id"],
-                        quantity=item["quantity"],
-                        unit_price=item["price"],
-                        subtotal=item["subtotal"],
+                try:
+                    write_sale(
+                        session,
+                        customer_id=int(self.selected_customer_id),
+                        user_id=auth_state.current_user["id"],
+                        branch_id=branch_id,
+                        lines=[
+                            {
+                                "product_id": item["product_id"],
+                                "product_name": item["product_name"],
+                                "quantity": item["quantity"],
+                                "unit_price": item["price"],
+                            }
+                            for item in self.cart
+                        ],
+                        payment_method=self.payment_method,
+                        num_installments=self.num_installments,
                     )
-                    session.add(sale_detail)
-                    stock = session.exec(
-                        select(Stock).where(
-                            and_(
-                                Stock.product_id == item["product_id"],
-                                Stock.branch_id == branch_id,
-                            )
-                        )
-                    ).first()
-                    stock.quantity -= item["quantity"]
-                    session.add(stock)
-                if self.payment_method in ["weekly", "monthly"]:
-                    today = datetime.utcnow()
-                    for i in range(self.num_installments):
-                        if self.payment_method == "weekly":
-                            due_date = today + timedelta(weeks=i + 1)
-                        else:
-                            due_date = today + timedelta(days=30 * (i + 1))
-                        installment = Installment(
-                            sale_id=new_sale.id,
-                            due_date=due_date,
-                            amount_due=self.installment_amount,
-                            status="Pending",
-                        )
-                        session.add(installment)
+                except ValueError as e:
+                    session.rollback()
+                    yield rx.toast.error(str(e))
+                    return
                 session.commit()
             self.cart = []
             self.selected_customer_id = ""
             self.payment_method = "cash"
         yield SalesState.load_sales
-        yield rx.toast.success("Sale created successfully!")
\ No newline at end of file
+        yield rx.toast.success("Sale created successfully!")
+
+    @rx.event(background=True)
+    async def cancel_credit_sale(self, sale_id: int):
+        async with self:
+            from app.states.auth_state import AuthState
+
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.is_admin:
+                yield rx.toast.error("Only admins can cancel sales.")
+                return
+            with rx.session() as session:
+                try:
+                    cancel_sale(session, sale_id)
+                except ValueError as e:
+                    session.rollback()
+                    yield rx.toast.error(str(e))
+                    return
+                session.commit()
+        yield SalesState.load_sales
+        yield rx.toast.success("Sale cancelled.")
\ No newline at end of file
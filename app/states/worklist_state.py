@@ -0,0 +1,178 @@
+import reflex as rx
+from typing import TypedDict
+from sqlmodel import func, select, and_, or_
+from app.db_models import Receivable, Customer, WorklistItemDict
+from app.services.receivables import (
+    OPEN_STATUSES,
+    collect_receivables,
+    open_receivables,
+)
+from datetime import datetime, timedelta
+
+WORKLIST_PAGE_SIZE = 25
+
+
+class WorklistCursor(TypedDict):
+    due_date: str
+    outstanding: float
+    id: int
+
+
+class WorklistState(rx.State):
+    items: list[WorklistItemDict] = []
+    branch_filter: str = ""
+    collector_filter: str = ""
+    cursors: list[WorklistCursor] = []
+    has_next: bool = False
+    total_due: float = 0.0
+    _last_key: WorklistCursor | None = None
+
+    @rx.event
+    async def load_worklist(self):
+        from app.states.auth_state import AuthState
+
+        auth_state = await self.get_state(AuthState)
+        if not auth_state.current_user:
+            return
+        now = datetime.utcnow()
+        end_of_today = datetime(now.year, now.month, now.day) + timedelta(days=1)
+        outstanding = Receivable.amount_due - Receivable.amount_paid
+        conditions = [
+            Receivable.due_date < end_of_today,
+            Receivable.status.in_(OPEN_STATUSES),
+        ]
+        if not auth_state.is_admin:
+            conditions.append(Receivable.user_id == auth_state.current_user["id"])
+        else:
+            if self.collector_filter:
+                conditions.append(Receivable.user_id == int(self.collector_filter))
+            if self.branch_filter:
+                conditions.append(Receivable.branch_id == int(self.branch_filter))
+        query = (
+            select(
+                Receivable.id,
+                Receivable.due_date,
+                outstanding,
+                Receivable.status,
+                Customer.name,
+                Customer.phone,
+                Customer.address,
+            )
+            .join(Customer, Customer.id == Receivable.customer_id)
+            .where(*conditions)
+        )
+        if self.cursors:
+            cursor = self.cursors[-1]
+            due_date = datetime.fromisoformat(cursor["due_date"])
+            query = query.where(
+                or_(
+                    Receivable.due_date > due_date,
+                    and_(
+                        Receivable.due_date == due_date,
+                        or_(
+                            outstanding < cursor["outstanding"],
+                            and_(
+                                outstanding == cursor["outstanding"],
+                                Receivable.id > cursor["id"],
+                            ),
+                        ),
+                    ),
+                )
+            )
+        with rx.session() as session:
+            rows = session.exec(
+                query.order_by(
+                    Receivable.due_date, outstanding.desc(), Receivable.id
+                ).limit(WORKLIST_PAGE_SIZE + 1)
+            ).all()
+            total_due = session.exec(
+                select(func.coalesce(func.sum(outstanding), 0.0)).where(*conditions)
+            ).one()
+        self.has_next = len(rows) > WORKLIST_PAGE_SIZE
+        rows = rows[:WORKLIST_PAGE_SIZE]
+        self.items = [
+            {
+                "id": row[0],
+                "customer_name": row[4],
+                "phone": row[5],
+                "address": row[6],
+                "due_date": row[1].date().isoformat(),
+                "days_overdue": max(0, (now - row[1]).days),
+                "outstanding": round(row[2], 2),
+                "status": row[3],
+            }
+            for row in rows
+        ]
+        self._last_key = (
+            {
+                "due_date": rows[-1][1].isoformat(),
+                "outstanding": rows[-1][2],
+                "id": rows[-1][0],
+            }
+            if rows
+            else None
+        )
+        self.total_due = round(total_due, 2)
+
+    @rx.event(background=True)
+    async def collect_item(self, receivable_id: int):
+        async with self:
+            from app.states.auth_state import AuthState
+
+            auth_state = await self.get_state(AuthState)
+            if not auth_state.current_user:
+                return
+            scope = (
+                []
+                if auth_state.is_admin
+                else [Receivable.user_id == auth_state.current_user["id"]]
+            )
+            with rx.session() as session:
+                collections = open_receivables(
+                    session, Receivable.id == receivable_id, *scope
+                )
+                if not collections:
+                    yield rx.toast.error("Installment is already paid.")
+                    return
+                for collection in collections:
+                    collection["amount"] = (
+                        collection["amount_due"] - collection["amount_paid"]
+                    )
+                try:
+                    collect_receivables(session, collections, datetime.utcnow())
+                except ValueError as e:
+                    session.rollback()
+                    yield rx.toast.error(str(e))
+                    return
+                session.commit()
+        yield WorklistState.load_worklist
+        yield rx.toast.success("Installment collected.")
+
+    @rx.event
+    def set_branch_filter(self, branch_id: str):
+        self.branch_filter = branch_id
+        self.cursors = []
+        return WorklistState.load_worklist
+
+    @rx.event
+    def set_collector_filter(self, user_id: str):
+        self.collector_filter = user_id
+        self.cursors = []
+        return WorklistState.load_worklist
+
+    @rx.event
+    def refresh_worklist(self):
+        self.cursors = []
+        return WorklistState.load_worklist
+
+    @rx.event
+    def next_page(self):
+        if self.has_next and self._last_key:
+            self.cursors.append(self._last_key)
+            return WorklistState.load_worklist
+
+    @rx.event
+    def previous_page(self):
+        if self.cursors:
+            self.cursors.pop()
+            return WorklistState.load_worklist
\ No newline at end of file
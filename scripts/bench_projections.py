@@ -0,0 +1,246 @@
+import argparse
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import sqlalchemy as sa
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, SQLModel, create_engine, select
+from app.db_models import (
+    Branch,
+    CashClosing,
+    Customer,
+    Product,
+    Sale,
+    SaleListEntry,
+    User,
+)
+from app.services import projections
+from app.services.sales import MISSING_NAME, record_sale_list_entries
+
+BRANCHES = 10
+USERS = 50
+EPOCH = datetime(2025, 1, 1)
+
+
+def seed(engine, rows: int):
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(
+            sa.insert(Branch),
+            [
+                {"name": f"branch {i}", "location": "main st", "created_at": EPOCH}
+                for i in range(BRANCHES)
+            ],
+        )
+        session.execute(
+            sa.insert(User),
+            [
+                {
+                    "username": f"user{i}",
+                    "password_hash": "x",
+                    "role": "seller",
+                    "branch_id": i % BRANCHES + 1,
+                    "created_at": EPOCH,
+                }
+                for i in range(USERS)
+            ],
+        )
+        session.execute(
+            sa.insert(Customer),
+            [
+                {
+                    "name": f"customer {i}",
+                    "phone": "555-0100",
+                    "email": f"c{i}@example.com",
+                    "address": "main st",
+                    "branch_id": i % BRANCHES + 1,
+                    "credit_balance": 0.0,
+                    "created_at": EPOCH + timedelta(seconds=i),
+                }
+                for i in range(rows)
+            ],
+        )
+        session.execute(
+            sa.insert(Product),
+            [
+                {
+                    "name": f"product {i}",
+                    "description": "bench",
+                    "category": f"category {i % 20}",
+                    "price": 1.5,
+                    "reorder_point": 10,
+                    "created_at": EPOCH,
+                }
+                for i in range(rows)
+            ],
+        )
+        session.execute(
+            sa.insert(Sale),
+            [
+                {
+                    "customer_id": random.randint(1, rows),
+                    "user_id": random.randint(1, USERS),
+                    "branch_id": random.randint(1, BRANCHES),
+                    "total_amount": 10.0,
+                    "payment_method": "cash",
+                    "status": "Paid",
+                    "created_at": EPOCH + timedelta(seconds=i),
+                }
+                for i in range(rows)
+            ],
+        )
+        session.execute(
+            sa.insert(CashClosing),
+            [
+                {
+                    "user_id": random.randint(1, USERS),
+                    "branch_id": random.randint(1, BRANCHES),
+                    "period_type": "weekly",
+                    "start_date": EPOCH,
+                    "end_date": EPOCH,
+                    "total_collected": 1.0,
+                    "status": "Closed",
+                    "created_at": EPOCH + timedelta(seconds=i),
+                }
+                for i in range(rows)
+            ],
+        )
+        record_sale_list_entries(session, sa.true())
+        session.commit()
+
+
+def _iso(row: dict) -> dict:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row.items()
+    }
+
+
+def orm_customers(session) -> list[dict]:
+    return [
+        _iso(
+            {
+                **customer.model_dump(),
+                "branch_name": customer.branch.name
+                if customer.branch
+                else MISSING_NAME,
+            }
+        )
+        for customer in session.exec(
+            select(Customer)
+            .options(selectinload(Customer.branch))
+            .order_by(Customer.id)
+        ).all()
+    ]
+
+
+def orm_products(session) -> list[dict]:
+    return [
+        _iso(product.model_dump())
+        for product in session.exec(select(Product).order_by(Product.id)).all()
+    ]
+
+
+def orm_sales(session) -> list[dict]:
+    return [
+        {
+            "id": entry.sale_id,
+            "customer_name": entry.customer_name,
+            "user_username": entry.user_username,
+            "branch_name": entry.branch_name,
+            "total_amount": entry.total_amount,
+            "payment_method": entry.payment_method,
+            "status": entry.status,
+            "created_at": entry.created_at.isoformat(),
+        }
+        for entry in session.exec(
+            select(SaleListEntry).order_by(SaleListEntry.created_at.desc())
+        ).all()
+    ]
+
+
+def orm_closings(session) -> list[dict]:
+    return [
+        {
+            "id": closing.id,
+            "user_name": closing.user.username if closing.user else MISSING_NAME,
+            "branch_name": closing.branch.name if closing.branch else MISSING_NAME,
+            "period_type": closing.period_type,
+            "start_date": closing.start_date.isoformat(),
+            "end_date": closing.end_date.isoformat(),
+            "total_collected": closing.total_collected,
+            "status": closing.status,
+            "parent_id": closing.parent_id,
+            "created_at": closing.created_at.isoformat(),
+        }
+        for closing in session.exec(
+            select(CashClosing)
+            .options(selectinload(CashClosing.user), selectinload(CashClosing.branch))
+            .order_by(CashClosing.created_at.desc())
+        ).all()
+    ]
+
+
+LOADERS = (
+    ("customers", orm_customers, projections.customer_rows),
+    ("products", orm_products, projections.product_rows),
+    ("sales", orm_sales, projections.sale_rows),
+    ("closings", orm_closings, projections.closing_rows),
+)
+
+
+def measure(engine, loader) -> tuple[list[dict], float, int]:
+    gc.collect()
+    with Session(engine) as session:
+        started = time.process_time()
+        rows = loader(session)
+        cpu = time.process_time() - started
+    del rows
+    gc.collect()
+    tracemalloc.start()
+    with Session(engine) as session:
+        rows = loader(session)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, cpu, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare ORM list loaders with column projections."
+    )
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db")
+        seed(engine, args.rows)
+        print(
+            f"{'list':10} {'rows':>7} {'same':>5} "
+            f"{'orm us/row':>11} {'orm B/row':>10} "
+            f"{'proj us/row':>12} {'proj B/row':>11} {'cpu':>6} {'mem':>6}"
+        )
+        for name, orm_loader, projection_loader in LOADERS:
+            orm_rows, orm_cpu, orm_peak = measure(engine, orm_loader)
+            rows, cpu, peak = measure(engine, projection_loader)
+            count = max(len(rows), 1)
+            print(
+                f"{name:10} {len(rows):>7} {str(orm_rows == rows):>5} "
+                f"{orm_cpu / count * 1e6:>11.1f} {orm_peak / count:>10.0f} "
+                f"{cpu / count * 1e6:>12.1f} {peak / count:>11.0f} "
+                f"{(cpu / orm_cpu - 1) * 100:>+5.0f}% {(peak / orm_peak - 1) * 100:>+5.0f}%"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
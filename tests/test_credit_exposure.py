@@ -0,0 +1,94 @@
+import pytest
+import sqlalchemy as sa
+from sqlmodel import Session, SQLModel, select
+from app.db_models import (
+    Branch,
+    Customer,
+    Installment,
+    Product,
+    Receivable,
+    Sale,
+    Stock,
+    User,
+)
+from app.services.payments import post_installment_payments
+from app.services.sales import cancel_sale, write_sale
+
+
+@pytest.fixture
+def session():
+    engine = sa.create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Branch(id=1, name="Main"))
+        session.add(User(id=1, username="seller", password_hash="x", branch_id=1))
+        session.add(Customer(id=1, name="Ann", branch_id=1, credit_limit=1000))
+        session.add(Product(id=1, name="Sofa", price=200))
+        session.add(Stock(product_id=1, branch_id=1, quantity=10))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def credit_sale(session) -> Sale:
+    sale = write_sale(
+        session,
+        customer_id=1,
+        user_id=1,
+        branch_id=1,
+        lines=[{"product_id": 1, "quantity": 4, "unit_price": 200}],
+        payment_method="weekly",
+        num_installments=4,
+    )
+    session.commit()
+    return sale
+
+
+def credit_balance(session) -> float:
+    session.expire_all()
+    return session.get(Customer, 1).credit_balance
+
+
+def test_collecting_sale_installments_releases_credit(session):
+    sale = credit_sale(session)
+    assert credit_balance(session) == 800
+    with pytest.raises(ValueError):
+        credit_sale(session)
+    session.rollback()
+    results = post_installment_payments(
+        session,
+        [
+            {"reference": "Ann", "customer_id": 1, "amount": 200},
+            {"reference": "Ann", "customer_id": 1, "amount": 600},
+        ],
+    )
+    session.commit()
+    assert [result["error"] for result in results] == [None, None]
+    assert credit_balance(session) == 0
+    assert session.get(Sale, sale.id).status == "Paid"
+    assert set(session.exec(select(Installment.status)).all()) == {"Paid"}
+    assert set(session.exec(select(Receivable.status)).all()) == {"Paid"}
+    credit_sale(session)
+    assert credit_balance(session) == 800
+
+
+def test_cancelling_a_credit_sale_releases_credit(session):
+    sale = credit_sale(session)
+    cancel_sale(session, sale.id)
+    session.commit()
+    assert credit_balance(session) == 0
+    assert session.get(Sale, sale.id).status == "Cancelled"
+    assert session.exec(select(Stock.quantity)).one() == 10
+    with pytest.raises(ValueError):
+        cancel_sale(session, sale.id)
+
+
+def test_collected_sales_cannot_be_cancelled(session):
+    sale = credit_sale(session)
+    post_installment_payments(
+        session, [{"reference": "Ann", "customer_id": 1, "amount": 50}]
+    )
+    session.commit()
+    with pytest.raises(ValueError):
+        cancel_sale(session, sale.id)
+    assert credit_balance(session) == 750
\ No newline at end of file